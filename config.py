@@ -4,6 +4,7 @@ NikolayCo SmartZill v2.0 - Yapılandırma Modülü
 import os
 import json
 from pathlib import Path
+from typing import Optional
 
 # Temel dizinler
 BASE_DIR = Path(__file__).parent.resolve()
@@ -20,6 +21,10 @@ SYSTEM_DIR = SOUNDS_DIR / "system"
 CONFIG_FILE = DATA_DIR / "config.json"
 SCHEDULE_FILE = DATA_DIR / "schedule.json"
 SPECIAL_DAYS_FILE = DATA_DIR / "special_days.json"
+OVERRIDES_FILE = DATA_DIR / "overrides.json"
+
+# Varsayılan bölge (eski tek programlı kurulum); programı SCHEDULE_FILE'da durur
+DEFAULT_ZONE_ID = "default"
 
 # Web sunucu ayarları
 WEB_HOST = "0.0.0.0"
@@ -60,6 +65,32 @@ DEFAULT_CONFIG = {
         "country": "TR",
         "skip_on_holidays": True
     },
+    "scheduler": {
+        # Kaçırılan olaylar için tolerans (saniye); null = her zaman çal
+        "grace_seconds": {
+            "bell": 120,
+            "announcement": 60,
+            "music": None
+        }
+    },
+    # Ses karıştırıcı: anons altında müzik seviyesi (%) ve geçiş süreleri (saniye)
+    "mixer": {
+        "duck_level": 20,
+        "duck_seconds": 0.5,
+        "fade_in_seconds": 1.5,
+        "fade_out_seconds": 3.0
+    },
+    # Ek bölgeler: [{"id": "atolye", "name": "Atölye", "output": "hw:1,0"}]
+    # Varsayılan bölge her zaman vardır ve listede yer almaz
+    "zones": [],
+    # Aktif/yedek çalışma: iki kurulum paylaşımlı depolamadaki aynı kira dosyasını kullanır
+    # (node_id boşsa bilgisayar adı; aynı makinede iki kurulum için farklı verilmeli)
+    "ha": {
+        "enabled": False,
+        "node_id": "",
+        "lease_file": "",
+        "lease_seconds": 2.0
+    },
     "startup": {
         "auto_start": True,
         "open_browser": True,
@@ -98,6 +129,21 @@ def load_config() -> dict:
     return DEFAULT_CONFIG.copy()
 
 
+def load_site_config(data_dir: Path) -> dict:
+    """Kiracı dizinindeki yapılandırmayı okur (yoksa varsayılan, dosya oluşturulmaz)"""
+    config = {}
+    config_file = Path(data_dir) / CONFIG_FILE.name
+    if config_file.exists():
+        try:
+            with open(config_file, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        except Exception:
+            pass
+    for key, value in DEFAULT_CONFIG.items():
+        config.setdefault(key, value)
+    return config
+
+
 def save_config(config: dict):
     """Yapılandırmayı kaydeder"""
     ensure_directories()
@@ -105,26 +151,134 @@ def save_config(config: dict):
         json.dump(config, f, ensure_ascii=False, indent=2)
 
 
-def load_schedule() -> list:
-    """Haftalık programı yükler"""
-    ensure_directories()
+def get_schedule_file(zone_id: Optional[str] = None, data_dir: Optional[Path] = None) -> Path:
+    """
+    Bölgenin program dosyası (varsayılan bölge eski dosyayı kullanır)
+    data_dir verilirse (kiracı dizini) dosya o dizinde aranır
+    """
+    if data_dir is None:
+        if not zone_id or zone_id == DEFAULT_ZONE_ID:
+            return SCHEDULE_FILE
+        return DATA_DIR / f"schedule_{zone_id}.json"
+    if not zone_id or zone_id == DEFAULT_ZONE_ID:
+        return Path(data_dir) / SCHEDULE_FILE.name
+    return Path(data_dir) / f"schedule_{zone_id}.json"
+
+
+def get_schedule_journal_file(zone_id: Optional[str] = None, data_dir: Optional[Path] = None) -> Path:
+    """Bölgenin program değişiklik günlüğü (son kayıttan sonraki değişiklikler)"""
+    return get_schedule_file(zone_id, data_dir).with_suffix(".journal")
+
+
+def get_fired_ledger_file(zone_id: Optional[str] = None, data_dir: Optional[Path] = None) -> Path:
+    """Bölgenin tetiklenme defteri (yeniden başlatmada aynı olay tekrar çalmasın)"""
+    return get_schedule_file(zone_id, data_dir).with_suffix(".fired")
+
+
+def _ensure_schedule_dir(data_dir: Optional[Path] = None):
+    if data_dir is None:
+        ensure_directories()
+    else:
+        Path(data_dir).mkdir(parents=True, exist_ok=True)
+
+
+def load_schedule(zone_id: Optional[str] = None, data_dir: Optional[Path] = None) -> list:
+    """Haftalık programı yükler (kayıtlı program + değişiklik günlüğü)"""
+    _ensure_schedule_dir(data_dir)
     
-    if SCHEDULE_FILE.exists():
+    schedule = None
+    schedule_file = get_schedule_file(zone_id, data_dir)
+    if schedule_file.exists():
         try:
-            with open(SCHEDULE_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+            with open(schedule_file, "r", encoding="utf-8") as f:
+                schedule = json.load(f)
         except Exception:
             pass
     
-    # Varsayılan boş program
-    return get_default_schedule()
+    if schedule is None:
+        # Varsayılan boş program
+        schedule = get_default_schedule()
+    
+    for record in _read_schedule_journal(zone_id, data_dir):
+        schedule = apply_schedule_record(schedule, record)
+    return schedule
 
 
-def save_schedule(schedule: list):
-    """Haftalık programı kaydeder"""
-    ensure_directories()
-    with open(SCHEDULE_FILE, "w", encoding="utf-8") as f:
+def _read_schedule_journal(zone_id: Optional[str] = None, data_dir: Optional[Path] = None) -> list:
+    """Günlük kayıtlarını okur; yarım yazılmış (bozuk) satırlar atlanır"""
+    journal_file = get_schedule_journal_file(zone_id, data_dir)
+    if not journal_file.exists():
+        return []
+    
+    records = []
+    with open(journal_file, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def apply_schedule_record(schedule: list, record: dict) -> list:
+    """
+    Tek bir günlük kaydını programa uygular
+    Kayıtlar tekrar uygulanabilir (aynı kayıt iki kez uygulansa da sonuç değişmez)
+    """
+    op = record.get("op")
+    if op == "replace":
+        return record.get("schedule", [])
+    
+    day_of_week = record.get("day")
+    day = next((d for d in schedule if d.get("dayOfWeek") == day_of_week), None)
+    
+    if op == "update_day":
+        if day is None:
+            schedule.append(record.get("data", {}))
+        else:
+            schedule[schedule.index(day)] = record.get("data", {})
+    elif op in ("add_activity", "add_activities") and day is not None:
+        added = record.get("activities") or [record.get("activity", {})]
+        ids = {a.get("id") for a in added if a.get("id")}
+        activities = [a for a in day.get("activities", []) if a.get("id") not in ids]
+        activities.extend(added)
+        activities.sort(key=lambda x: x.get("startTime", ""))
+        day["activities"] = activities
+    elif op == "remove_activity" and day is not None:
+        day["activities"] = [a for a in day.get("activities", []) if a.get("id") != record.get("id")]
+    return schedule
+
+
+def append_schedule_journal(records: list, zone_id: Optional[str] = None,
+                            data_dir: Optional[Path] = None) -> int:
+    """Kayıtları günlüğün sonuna ekler, günlüğün yeni boyutunu (bayt) döndürür"""
+    _ensure_schedule_dir(data_dir)
+    journal_file = get_schedule_journal_file(zone_id, data_dir)
+    with open(journal_file, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+
+def save_schedule(schedule: list, zone_id: Optional[str] = None, data_dir: Optional[Path] = None):
+    """
+    Haftalık programı kaydeder ve değişiklik günlüğünü sıfırlar
+    Geçici dosyaya yazılıp yerine taşınır; yazım yarıda kesilirse eski program bozulmaz
+    """
+    _ensure_schedule_dir(data_dir)
+    schedule_file = get_schedule_file(zone_id, data_dir)
+    tmp_file = schedule_file.with_suffix(".json.tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
         json.dump(schedule, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, schedule_file)
+    
+    journal_file = get_schedule_journal_file(zone_id, data_dir)
+    if journal_file.exists():
+        journal_file.unlink()
 
 
 def get_default_schedule() -> list:
@@ -53,28 +53,40 @@ import sys
 # Proje kök dizinini path'e ekle
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import load_config, save_config, BELLS_DIR, ANNOUNCEMENTS_DIR, MUSIC_DIR
+from core.program import program_renderer, STEP_BELL, STEP_GAP, STEP_ANNOUNCEMENT
+from core.vlc_runtime import get_instance, PlayerPool, media_cache
+from core.mixer import mixer
+from core.audio_queue import AudioQueue, KIND_MUSIC
 import random
+from collections import deque
+
+# Hazırlama sırasında oynatmanın başlaması için en fazla beklenen süre (saniye)
+PREROLL_TIMEOUT = 0.5
+# Hazırlanmış player kullanılmazsa bu süre sonra bırakılır (saniye)
+PREPARED_TTL = 60
+# Bitiş olayı kaçarsa bekleyenlerin kanal durumunu yeniden kontrol etme aralığı (saniye)
+COMPLETION_CHECK_INTERVAL = 1.0
 
 
 class AudioChannel:
     """Tek bir ses kanalı"""
     
-    def __init__(self, name: str, volume: int = 100):
+    def __init__(self, name: str, volume: int = 100, output: Optional[str] = None,
+                 media_cache=None):
         self.name = name
+        # Ses çıkış cihazı (None = sistem varsayılanı); bölgeler ayrı çıkışa yönlendirilir
+        self.output = output
         # Varsayılan hacim yapılandırmasına sadık kalınır. Windows için özel "otomatik artış" kaldırıldı.
         self.volume = max(0, min(100, volume))
+        # Karıştırıcı kazancı (0.0-1.0): kısma ve geçişlerde ses seviyesiyle çarpılır
+        self.gain = 1.0
         self.player: Optional[vlc.MediaPlayer] = None
-        # Windows'ta extra ses seçenekleri
-        try:
-            if platform.system() == "Windows":
-                # Windows'ta ALSA seçenekleri yok; yalnızca sessiz modu kullan
-                self.instance = vlc.Instance("--quiet")
-            else:
-                self.instance = vlc.Instance("--no-xlib", "--quiet")
-        except Exception as e:
-            # VLC instance oluşturulamadığında None ata ve hata mesajı yaz
-            print(f"[{self.name}] Uyarı: VLC instance oluşturulamadı: {e}")
-            self.instance = None
+        # Süreç genelinde tek libVLC instance (oluşturulamadıysa None)
+        self.instance = get_instance()
+        # Yeniden kullanılan player'lar; bitiş olayı player oluşturulurken bir kez bağlanır
+        self.pool = PlayerPool(self.name, self._on_track_end, on_error=self._on_track_error)
+        # Tekrar tekrar çalınan dosyalar için Media önbelleği (None = her çalmada açılır)
+        self.media_cache = media_cache
         self.is_paused = False
         self.current_source: Optional[str] = None
         
@@ -86,11 +98,129 @@ class AudioChannel:
         
         # Thread safety
         self.lock = threading.RLock()
+        
+        # Son çalmanın bitişi: bitiş/hata olayında veya stop'ta işaretlenir (boşta işaretli)
+        self.finished = threading.Event()
+        self.finished.set()
+        
+        # Önceden hazırlanmış player: (kaynak, player, hazırlanma anı)
+        self.prepared: Optional[tuple] = None
+        # Başlama gecikmesi örnekleri (saniye)
+        self.latencies = {"warm": deque(maxlen=100), "cold": deque(maxlen=100)}
 
 
         
+    def _new_player(self, media) -> "vlc.MediaPlayer":
+        """
+        Havuzdan player alır; medya, çıkış ve ses seviyesi ayarlanır (bitiş olayı havuzda bağlı)
+        Çağıranın media referansı devralınır: player kendi referansını aldıktan sonra bırakılır
+        """
+        try:
+            player = self.pool.acquire()
+            if player is None:
+                raise RuntimeError("VLC player oluşturulamadı")
+            player.set_media(media)
+        finally:
+            media.release()
+        player.audio_set_mute(False)
+        if self.output:
+            try:
+                player.audio_output_device_set(None, self.output)
+            except Exception as e:
+                print(f"[{self.name}] Uyarı: çıkış cihazı ayarlanamadı ({self.output}): {e}")
+        
+        self._apply_volume(player)
+        return player
+    
+    def _open_media(self, source: str):
+        """
+        Yerel dosyanın Media nesnesi: önbellekte varsa oradan, yoksa yeni açılır (dosya yoksa None)
+        Dönen referans çağıranındır; _new_player'a verilince orada bırakılır
+        """
+        if self.media_cache:
+            media = self.media_cache.get(source)
+            if media is not None:
+                return media
+        if not os.path.exists(source):
+            return None
+        return self.instance.media_new_path(source)
+    
+    def _apply_volume(self, player):
+        """Kanal ses seviyesini (karıştırıcı kazancıyla) player'a uygular"""
+        volume = self.volume * self.gain
+        # Windows'ta ses seviyesi 0-255 arasında çalıştığı için 0-100 aralığını map et
+        if platform.system() == "Windows":
+            adjusted_volume = int((volume / 100) * 255)
+            adjusted_volume = max(0, min(255, adjusted_volume))
+            player.audio_set_volume(adjusted_volume)
+        else:
+            player.audio_set_volume(int(round(volume)))
+    
+    def prepare(self, source: str) -> bool:
+        """
+        Yaklaşan zil/anons için medyayı önceden açar:
+        sessizde kısa süre oynatıp duraklatır, başa sarar; play() anında sadece devam ettirilir
+        """
+        if not self.instance or not source:
+            return False
+        
+        with self.lock:
+            if self.prepared and self.prepared[0] == source:
+                return True
+        
+        try:
+            media = self._open_media(source)
+            if media is None:
+                return False
+            player = self._new_player(media)
+            player.audio_set_mute(True)
+            player.play()
+            deadline = time.monotonic() + PREROLL_TIMEOUT
+            while time.monotonic() < deadline and player.get_state() != vlc.State.Playing:
+                time.sleep(0.01)
+            player.set_pause(1)
+            player.set_time(0)
+            player.audio_set_mute(False)
+        except Exception as e:
+            print(f"[{self.name}] Hazırlama hatası: {e}")
+            return False
+        
+        with self.lock:
+            self._release_prepared()
+            self.prepared = (source, player, time.monotonic())
+        return True
+    
+    def _take_prepared(self, source: str):
+        """Kaynak için hazırlanmış player varsa devralır (süresi geçmişse bırakır)"""
+        if not self.prepared:
+            return None
+        prepared_source, player, prepared_at = self.prepared
+        if time.monotonic() - prepared_at > PREPARED_TTL:
+            self._release_prepared()
+            return None
+        if prepared_source != source:
+            return None
+        self.prepared = None
+        return player
+    
+    def _release_prepared(self):
+        """Kullanılmayan hazır player'ı bırakır"""
+        if self.prepared:
+            self.pool.release(self.prepared[1])
+            self.prepared = None
+    
+    def _wait_started(self, requested_at: float, warm: bool):
+        """Oynatma başlayana kadar bekler (en fazla 0.25 sn) ve başlama gecikmesini kaydeder"""
+        deadline = requested_at + 0.25
+        while time.monotonic() < deadline:
+            if self.is_playing():
+                self.latencies["warm" if warm else "cold"].append(time.monotonic() - requested_at)
+                return
+            time.sleep(0.005)
+    
     def play(self, source: str, is_stream: bool = False, is_playlist_track: bool = False) -> bool:
         """Ses kaynağını oynatır"""
+        requested_at = time.monotonic()
         with self.lock:
             try:
                 # Eğer VLC instance oluşturulmamışsa oynatma desteklenmiyor
@@ -110,48 +240,67 @@ class AudioChannel:
                     print(f"[{self.name}] Geçersiz ses kaynağı: {source!r}")
                     return False
 
-                if is_stream:
-                    media = self.instance.media_new(source)
-                else:
-                    if not os.path.exists(source):
-                        print(f"[{self.name}] Dosya bulunamadı: {source}")
-                        return False
-                    media = self.instance.media_new_path(source)
-                
-                self.player = self.instance.media_player_new()
-                self.player.set_media(media)
-                
-                # Windows'ta ses seviyesi 0-255 arasında çalıştığı için 0-100 aralığını map et
-                if platform.system() == "Windows":
-                    adjusted_volume = int((self.volume / 100) * 255)
-                    adjusted_volume = max(0, min(255, adjusted_volume))
-                    self.player.audio_set_volume(adjusted_volume)
+                # Önceden hazırlanmış player varsa sadece devam ettir
+                prepared = None if is_stream else self._take_prepared(source)
+                if prepared:
+                    self.player = prepared
+                    self._apply_volume(self.player)
+                    self.finished = threading.Event()
+                    self.player.set_pause(0)
                 else:
-                    self.player.audio_set_volume(self.volume)
+                    if is_stream:
+                        media = self.instance.media_new(source)
+                    else:
+                        media = self._open_media(source)
+                        if media is None:
+                            print(f"[{self.name}] Dosya bulunamadı: {source}")
+                            return False
+                    
+                    self.player = self._new_player(media)
+                    self.finished = threading.Event()
+                    self.player.play()
                 
-                # Parça bitiş olayını dinle
-                try:
-                    event_manager = self.player.event_manager()
-                    event_manager.event_attach(vlc.EventType.MediaPlayerEndReached, self._on_track_end)
-                except Exception as e:
-                    # Event attach hatası oyun içinde test harness'larından veya mock'lardan kaynaklanabilir
-                    print(f"[{self.name}] Uyarı: event_attach başarısız: {e}")
-
-                # Not: MediaPlayerEncounteredError event'ine bağlanmak test harness'ını
-                # etkileyebildiği için bu projede doğrudan event'e bağlanmıyoruz.
-                # Hata tespiti için AudioEngine seviyesinde kontrol/monitor thread'i kullanılacak.
-
-                self.player.play()
                 self.current_source = source
                 self.is_paused = False
                 
-                # Oynatma başlamasını bekle (biraz daha uzun bekle, testlerde kararlılık için)
-                time.sleep(0.25)
+                # Oynatma başlamasını bekle (testlerde kararlılık için üst sınır 0.25 sn)
+                self._wait_started(requested_at, warm=prepared is not None)
                 return True
                 
             except Exception as e:
                 print(f"[{self.name}] Oynatma hatası: {e}")
+                self.finished.set()
                 return False
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Mevcut çalma bitene kadar bekler (bitiş/hata olayı veya stop ile uyanır)
+        Süre dolarsa False döner; olay kaçarsa kanal durumu aralıklarla kontrol edilir
+        """
+        finished = self.finished
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # Yeni bir çalma başladıysa beklenen çalma bitmiştir
+            if finished.is_set() or finished is not self.finished or not self.is_playing():
+                return True
+            remaining = COMPLETION_CHECK_INTERVAL
+            if deadline is not None:
+                remaining = min(remaining, deadline - time.monotonic())
+                if remaining <= 0:
+                    return False
+            finished.wait(remaining)
+    
+    def get_latency_stats(self) -> dict:
+        """Başlama gecikmesi özeti (hazırlanmış / soğuk başlatma)"""
+        stats = {}
+        for mode, samples in self.latencies.items():
+            values = list(samples)
+            stats[mode] = {
+                "count": len(values),
+                "avg_ms": round(sum(values) / len(values) * 1000, 1) if values else None,
+                "max_ms": round(max(values) * 1000, 1) if values else None
+            }
+        return stats
             
             
     def play_playlist(self, files: list, shuffle: bool = False) -> bool:
@@ -173,10 +322,16 @@ class AudioChannel:
 
     def _on_track_end(self, event):
         """Parça bittiğinde"""
+        self.finished.set()
         if self.is_playlist_mode and self.playlist:
             # Thread içinde bir sonraki parçayı tetikle
             threading.Thread(target=self._play_next, daemon=True).start()
 
+    
+    def _on_track_error(self, event):
+        """Oynatma hatası: bekleyenler uyandırılır"""
+        print(f"[{self.name}] Oynatma hatası (VLC): {self.current_source}")
+        self.finished.set()
             
     def _play_next(self):
         """Sıradaki parçayı oynat"""
@@ -222,14 +377,12 @@ class AudioChannel:
             self.playlist = []
             
         if self.player:
-            try:
-                self.player.stop()
-                self.player.release()
-            except:
-                pass
+            # Player serbest bırakılmaz, sonraki çalma için havuza döner
+            self.pool.release(self.player)
             self.player = None
         self.is_paused = False
         self.current_source = None
+        self.finished.set()
 
     def stop(self, stop_playlist: bool = True):
         """Oynatmayı durdurur"""
@@ -254,14 +407,14 @@ class AudioChannel:
         """Ses seviyesini ayarlar (0-100)"""
         self.volume = max(0, min(100, volume))
         if self.player:
-            # Windows'ta ses seviyesi 0-255 aralığına map edilir; minimum zorlama kaldırıldı
-            if platform.system() == "Windows":
-                adjusted_volume = int((self.volume / 100) * 255)
-                adjusted_volume = max(0, min(255, adjusted_volume))
-                self.player.audio_set_volume(adjusted_volume)
-            else:
-                # Linux/Mac: 0-100 aralığında, doğru şekilde çalışıyor
-                self.player.audio_set_volume(self.volume)
+            self._apply_volume(self.player)
+    
+    def set_gain(self, gain: float):
+        """Karıştırıcı kazancını ayarlar (0.0-1.0)"""
+        self.gain = max(0.0, min(1.0, gain))
+        player = self.player
+        if player:
+            self._apply_volume(player)
     
     def is_playing(self) -> bool:
         """Oynatma durumunu kontrol eder"""
@@ -293,24 +446,40 @@ class AudioEngine:
     3. music (mola müziği) - Otomatik mola müziği
     """
     
-    def __init__(self):
+    def __init__(self, zone_id: Optional[str] = None, output: Optional[str] = None):
         self.lock = threading.Lock()
+        # Bölge motorları ses seviyelerini config'deki bölge kaydında tutar
+        self.zone_id = zone_id
+        self.output = output
         
         # Yapılandırmayı yükle
         config = load_config()
-        volumes = config.get("volumes", {})
+        volumes = dict(config.get("volumes", {}))
+        volumes.update(self._get_zone_config(config).get("volumes", {}))
+        self.mixer_settings = dict(config.get("mixer", {}))
         
         # Kanalları oluştur
+        prefix = f"{zone_id}:" if zone_id else ""
         self.channels = {
-            "bell": AudioChannel("bell", volumes.get("bell", 100)),
-            "announcement": AudioChannel("announcement", volumes.get("announcement", 80)),
-            "music": AudioChannel("music", volumes.get("music", 60)),
+            "bell": AudioChannel(f"{prefix}bell", volumes.get("bell", 100), output, media_cache),
+            "announcement": AudioChannel(f"{prefix}announcement", volumes.get("announcement", 80), output,
+                                         media_cache),
+            "music": AudioChannel(f"{prefix}music", volumes.get("music", 60), output),
         }
 
 
         
-        # Müzik duraklatma durumu
+        # Müzik duraklatma durumu (zil müziği susturup duraklatır)
         self._music_was_playing = False
+        # Mola sonu fade-out sürüyor: kısma/devam ettirme müziği yeniden açmaz
+        self._music_stopping = False
+        # Kısma ve geçişler tüm kanallar için tek zarf thread'inde yürür
+        self.mixer = mixer
+        # Zil/anons/TTS istekleri tek işçi thread'inde öncelik sırasıyla çalınır
+        self.queue = AudioQueue(self, f"AudioQueue:{zone_id}" if zone_id else "AudioQueue")
+        
+        # Aynı dakikanın zil/anons programları için tek dosya önbelleği (ffmpeg varsa; bölgeler ortak)
+        self.program_renderer = program_renderer
         
         # Callback fonksiyonlar
         self.on_bell_start: Optional[Callable] = None
@@ -340,16 +509,27 @@ class AudioEngine:
         
         return filename
     
+    def prepare(self, channel: str, filename: str):
+        """
+        Zamanlayıcı yaklaşan zil/anonsu birkaç saniye önceden bildirir;
+        medya arka planda açılıp duraklatılmış bir player'da bekletilir
+        """
+        if channel not in ("bell", "announcement"):
+            return
+        path = self._resolve_path(filename, BELLS_DIR if channel == "bell" else ANNOUNCEMENTS_DIR)
+        if not path:
+            return
+        threading.Thread(target=self.channels[channel].prepare, args=(path,), daemon=True).start()
+    
     def play_bell(self, filename: str, blocking: bool = True) -> bool:
         """
         Zil çalar - en yüksek öncelik
         Diğer tüm kanalları duraklatır
         """
         with self.lock:
-            # Müzik çalıyorsa duraklat
-            if self.channels["music"].is_playing():
+            # Müzik çalıyorsa hızla kısıp duraklat
+            if self._duck_music(pause=True):
                 self._music_was_playing = True
-                self.channels["music"].pause()
             
             # Anonsu durdur
             self.channels["announcement"].stop()
@@ -363,13 +543,12 @@ class AudioEngine:
         
         if blocking and success:
             # Zil bitene kadar bekle
-            while self.channels["bell"].is_playing():
-                time.sleep(0.1)
+            self.channels["bell"].wait()
             
             with self.lock:
-                # Müziği devam ettir
+                # Müziği devam ettir (yavaşça açarak)
                 if self._music_was_playing:
-                    self.channels["music"].resume()
+                    self._restore_music()
                     self._music_was_playing = False
                 
                 if self.on_bell_end:
@@ -384,31 +563,157 @@ class AudioEngine:
         Zil çalıyorsa zil bitene kadar bekle
         """
         # Zil çalıyorsa bekle
-        while self.channels["bell"].is_playing():
-            time.sleep(0.1)
+        self.channels["bell"].wait()
         
         with self.lock:
-            # Müzik çalıyorsa duraklat (flag'i kontrol et)
+            # Müzik çalıyorsa anons altında kıs (zil müziği zaten duraklattıysa dokunma)
             music_was_playing = False
-            if self.channels["music"].is_playing() and not self._music_was_playing:
-                music_was_playing = True
-                self.channels["music"].pause()
+            if not self._music_was_playing:
+                music_was_playing = self._duck_music(pause=False)
             
             # Anonsu çal
             path = self._resolve_path(filename, ANNOUNCEMENTS_DIR)
             success = self.channels["announcement"].play(path)
         
-        if blocking and success:
-            while self.channels["announcement"].is_playing():
-                time.sleep(0.1)
-            
+        if not success:
+            if music_was_playing:
+                with self.lock:
+                    self._restore_music()
+        elif blocking:
+            self._finish_announcement(music_was_playing)
+        elif music_was_playing:
+            # Beklenmiyorsa müzik anons bitince arka planda eski seviyesine döner
+            threading.Thread(target=self._finish_announcement, args=(True,), daemon=True).start()
+        
+        return success
+    
+    def _finish_announcement(self, music_was_playing: bool):
+        """Anons bitene kadar bekler, kısılan müziği eski seviyesine döndürür"""
+        self.channels["announcement"].wait()
+        with self.lock:
+            # Arada zil müziği duraklattıysa müziği zil geri açar
+            if music_was_playing and not self._music_was_playing:
+                self._restore_music()
+    
+    def _mixer_setting(self, key: str, default: float) -> float:
+        try:
+            return float(self.mixer_settings.get(key, default))
+        except (TypeError, ValueError):
+            return default
+    
+    def _duck_music(self, pause: bool) -> bool:
+        """
+        Çalan müziği kısar: pause=True ise sessize indirip duraklatır (zil),
+        değilse anons seviyesine indirir. Müzik çalmıyorsa False döner.
+        """
+        music = self.channels["music"]
+        if self._music_stopping:
+            # Durdurulmakta olan müzik kısılmaz; durdurma hemen tamamlanır
+            self._finish_fade_out()
+            return False
+        if not music.is_playing():
+            return False
+        duck_seconds = self._mixer_setting("duck_seconds", 0.5)
+        if pause:
+            self.mixer.fade(music, 0.0, duck_seconds, on_done=music.pause)
+        else:
+            level = self._mixer_setting("duck_level", 20) / 100
+            self.mixer.fade(music, level, duck_seconds)
+        return True
+    
+    def _restore_music(self):
+        """Kısılan veya duraklatılan müziği devam ettirip yavaşça eski seviyesine açar"""
+        music = self.channels["music"]
+        if self._music_stopping:
+            return
+        music.resume()
+        self.mixer.fade(music, 1.0, self._mixer_setting("fade_in_seconds", 1.5))
+    
+    def _reset_music_gain(self):
+        """Süren geçişi (ör. mola sonu fade-out) iptal eder, müziği tam seviyeye alır"""
+        music = self.channels["music"]
+        self._music_stopping = False
+        self.mixer.cancel(music)
+        music.set_gain(1.0)
+    
+    def play_program(self, steps: list, cancel: Optional[threading.Event] = None) -> bool:
+        """
+        Zamanlayıcının dakika programını çalar: [(tür, değer), ...] (zil, ara, anons)
+        Müzik program boyunca bir kez duraklatılır; sıradaki ses önceki çalarken hazırlanır.
+        Program daha önce tek dosyaya işlendiyse o dosya çalınır.
+        cancel işaretlenirse (kuyrukta kesilme) sonraki adımlara geçilmez.
+        """
+        program_steps = []
+        for kind, value in steps:
+            if kind == STEP_GAP:
+                program_steps.append((kind, value))
+            elif kind in (STEP_BELL, STEP_ANNOUNCEMENT):
+                path = self._resolve_path(value, BELLS_DIR if kind == STEP_BELL else ANNOUNCEMENTS_DIR)
+                if path:
+                    program_steps.append((kind, path))
+        sounds = [step for step in program_steps if step[0] != STEP_GAP]
+        if not sounds:
+            return False
+        
+        # İşlenmiş dosya ilk sesin kanalında çalar; diğer kanalın ses seviyesi oranla uygulanır
+        first_channel = self.channels[sounds[0][0]]
+        gains = [
+            self.channels[kind].volume / first_channel.volume
+            if kind != STEP_GAP and first_channel.volume else 1.0
+            for kind, _ in program_steps
+        ]
+        key = self.program_renderer.cache_key(program_steps, gains)
+        rendered = self.program_renderer.lookup(key)
+        
+        with self.lock:
+            # Zil içeren programda müzik susturulup duraklatılır, yalnızca anonslarda kısılır
+            music_was_playing = False
+            if not self._music_was_playing:
+                has_bell = any(kind == STEP_BELL for kind, _ in sounds)
+                if self._duck_music(pause=has_bell):
+                    music_was_playing = True
+                    self._music_was_playing = True
+            self.channels["announcement"].stop()
+            if self.on_bell_start and sounds[0][0] == STEP_BELL:
+                self.on_bell_start()
+        
+        success = False
+        try:
+            if rendered:
+                if first_channel.play(rendered):
+                    success = True
+                    self._wait_channel(first_channel)
+            else:
+                for index, (kind, path) in enumerate(program_steps):
+                    if cancel is not None and cancel.is_set():
+                        break
+                    if kind == STEP_GAP:
+                        time.sleep(path)
+                        continue
+                    # Sıradaki ses bu çalarken hazırlanır
+                    upcoming = next(((k, p) for k, p in program_steps[index + 1:] if k != STEP_GAP), None)
+                    if upcoming:
+                        threading.Thread(target=self.channels[upcoming[0]].prepare,
+                                         args=(upcoming[1],), daemon=True).start()
+                    channel = self.channels[kind]
+                    if channel.play(path):
+                        success = True
+                        self._wait_channel(channel)
+                if success and not (cancel is not None and cancel.is_set()):
+                    self.program_renderer.render_async(key, program_steps, gains)
+        finally:
             with self.lock:
-                # Müziği devam ettir (eğer arka planda çalıyordu)
                 if music_was_playing:
-                    self.channels["music"].resume()
-        
+                    self._restore_music()
+                    self._music_was_playing = False
+                if self.on_bell_end and sounds[0][0] == STEP_BELL:
+                    self.on_bell_end()
         return success
     
+    def _wait_channel(self, channel: AudioChannel, timeout: Optional[float] = None) -> bool:
+        """Kanal çalmayı bitirene kadar bekler"""
+        return channel.wait(timeout)
+    
     def play_music(self, source: str, is_stream: bool = False) -> bool:
         """
         Mola müziği çalar
@@ -418,6 +723,7 @@ class AudioEngine:
             return False
         
         with self.lock:
+            self._reset_music_gain()
             if is_stream:
                 success = self.channels["music"].play(source, is_stream=True)
                 # Eğer stream olarak başlatıldıysa, kısa süreli bir monitor başlat
@@ -447,6 +753,9 @@ class AudioEngine:
         if self.channels["bell"].is_playing() or self.channels["announcement"].is_playing():
             return False
         
+        # Mola sonu kısılırken yeni mola başladıysa kısma iptal edilir, müzik sürer
+        self._reset_music_gain()
+        
         # Zaten müzik çalıyorsa yeni playlist başlatma (müzik devam etsin)
         if self.channels["music"].is_playing() and self.channels["music"].is_playlist_mode:
             print("[AudioEngine] Müzik zaten çalıyor, yeni playlist başlatılmıyor")
@@ -467,18 +776,38 @@ class AudioEngine:
             # Mola müziği her zaman karışık çalmalı
             return self.channels["music"].play_playlist(full_paths, shuffle=True)
     
-    def stop_music(self):
-        """Mola müziğini durdurur"""
+    def stop_music(self, fade: bool = True):
+        """Mola müziğini durdurur (fade=True ise yavaşça kısarak)"""
+        # Kuyrukta bekleyen müzik başlatma, durdurmadan sonra müziği açmasın
+        self.queue.cancel(KIND_MUSIC)
         with self.lock:
-            self.channels["music"].stop()
+            music = self.channels["music"]
             self._music_was_playing = False
+            fade_seconds = self._mixer_setting("fade_out_seconds", 3.0) if fade else 0
+            if fade_seconds > 0 and music.is_playing():
+                self._music_stopping = True
+                self.mixer.fade(music, 0.0, fade_seconds, on_done=self._finish_fade_out)
+            else:
+                self._finish_fade_out()
+    
+    def _finish_fade_out(self):
+        """Kısılarak biten müziği durdurur; sonraki çalma tam seviyeden başlar"""
+        music = self.channels["music"]
+        self._music_stopping = False
+        self.mixer.cancel(music)
+        music.stop()
+        music.set_gain(1.0)
     
     def stop_all(self):
-        """Tüm kanalları durdurur"""
+        """Tüm kanalları durdurur (bekleyen çalma istekleri atılır)"""
+        self.queue.clear()
         with self.lock:
             for channel in self.channels.values():
+                self.mixer.cancel(channel)
                 channel.stop()
+                channel.set_gain(1.0)
             self._music_was_playing = False
+            self._music_stopping = False
     
     def set_volume(self, channel: str, volume: int):
         """Kanal ses seviyesini ayarlar"""
@@ -487,9 +816,22 @@ class AudioEngine:
             
             # Yapılandırmaya kaydet
             config = load_config()
-            config["volumes"][channel] = volume
+            if self.zone_id:
+                zone_config = self._get_zone_config(config)
+                zone_config.setdefault("volumes", {})[channel] = volume
+            else:
+                config["volumes"][channel] = volume
             save_config(config)
     
+    def _get_zone_config(self, config: dict) -> dict:
+        """Config içindeki bu bölgenin kaydı (varsayılan motor için boş)"""
+        if not self.zone_id:
+            return {}
+        for zone in config.get("zones", []):
+            if zone.get("id") == self.zone_id:
+                return zone
+        return {}
+    
     def get_volume(self, channel: str) -> int:
         """Kanal ses seviyesini döndürür"""
         if channel in self.channels:
@@ -506,7 +848,8 @@ class AudioEngine:
                 "volume": channel.volume,
                 "source": channel.current_source,
                 "position": channel.get_position(),
-                "duration": channel.get_duration()
+                "duration": channel.get_duration(),
+                "start_latency": channel.get_latency_stats()
             }
         return status
     
@@ -0,0 +1,280 @@
+"""
+NikolayCo SmartZill v2.0 - Öncelikli Ses İstek Kuyruğu
+Zamanlayıcı tetiklemeleri ve API istekleri (zil, anons, TTS, acil durum) her biri
+ayrı thread açıp motor kilidi için yarışmak yerine tek kuyruğa girer ve motor
+başına tek bir işçi thread'inde sırayla çalınır.
+
+- Öncelik: acil durum > zil > program > anons > müzik
+- Öncelikli istek çalan düşük öncelikli isteği keser (PREEMPTS); zil veya program
+  tarafından kesilen anons kuyruğa geri konur (acil durum tarafından kesildiyse atılır)
+- Pencere içinde gelen aynı istek (çift tıklama, API tekrarı) tekrar çalınmaz
+- Kuyruk derinliği sınırlıdır: doluysa en düşük öncelikli bekleyen atılır
+"""
+import heapq
+import itertools
+import threading
+import time
+from typing import Optional, Callable, Dict, List, Tuple, Any
+
+KIND_EMERGENCY = "emergency"
+KIND_BELL = "bell"
+KIND_PROGRAM = "program"
+KIND_ANNOUNCEMENT = "announcement"
+KIND_MUSIC = "music"
+
+# Küçük değer önce çalar
+PRIORITIES = {
+    KIND_EMERGENCY: 0,
+    KIND_BELL: 1,
+    KIND_PROGRAM: 1,
+    KIND_ANNOUNCEMENT: 2,
+    KIND_MUSIC: 3,
+}
+# Hangi istek çalan hangi istekleri keser
+PREEMPTS = {
+    KIND_EMERGENCY: {KIND_BELL, KIND_PROGRAM, KIND_ANNOUNCEMENT, KIND_MUSIC},
+    KIND_BELL: {KIND_ANNOUNCEMENT},
+    # Zamanlanmış ziller kuyruğa program olarak gelir
+    KIND_PROGRAM: {KIND_ANNOUNCEMENT},
+}
+# Kesilince susturulan kanallar
+REQUEST_CHANNELS = {
+    KIND_EMERGENCY: ("announcement",),
+    KIND_BELL: ("bell",),
+    KIND_PROGRAM: ("bell", "announcement"),
+    KIND_ANNOUNCEMENT: ("announcement",),
+    KIND_MUSIC: (),
+}
+# Kesildiğinde baştan çalınmak üzere kuyruğa geri konan türler
+REQUEUE_ON_PREEMPT = {KIND_ANNOUNCEMENT}
+# Aynı istek bu süre içinde tekrar gelirse birleştirilir (saniye)
+COALESCE_SECONDS = 2.0
+# Bekleyen en fazla istek
+QUEUE_DEPTH = 32
+
+
+class AudioRequest:
+    """Kuyruktaki tek çalma isteği"""
+
+    def __init__(self, kind: str, key: Any, func: Callable, seq: int):
+        self.kind = kind
+        self.priority = PRIORITIES[kind]
+        self.key = key
+        self.func = func
+        self.seq = seq
+        self.submitted = time.monotonic()
+        # queued, playing, done, failed, dropped
+        self.status = "queued"
+        # Kesildiğinde işaretlenir (ör. program sonraki adıma geçmez)
+        self.cancelled = threading.Event()
+        self.requeue = False
+        self.finished = threading.Event()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """İstek çalınıp bitene (veya atılana) kadar bekler"""
+        return self.finished.wait(timeout)
+
+
+class AudioQueue:
+    """
+    Tek ses motorunun öncelikli istek kuyruğu ve işçi thread'i
+
+    İşçi ilk istekte başlatılır; istek fonksiyonları func(request) olarak çağrılır
+    ve çalma bitene kadar dönmez.
+    """
+
+    def __init__(self, engine, name: str = "AudioQueue", depth: int = QUEUE_DEPTH,
+                 coalesce_seconds: float = COALESCE_SECONDS):
+        self.engine = engine
+        self.name = name
+        self.depth = depth
+        self.coalesce_seconds = coalesce_seconds
+        self.heap: List[Tuple[int, int, AudioRequest]] = []
+        self.current: Optional[AudioRequest] = None
+        self._recent: Dict[Tuple[str, Any], AudioRequest] = {}
+        self._seq = itertools.count()
+        self.cond = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+        self.stats = {"submitted": 0, "coalesced": 0, "rejected": 0, "dropped": 0,
+                      "preempted": 0, "requeued": 0, "completed": 0, "failed": 0,
+                      "max_depth": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0, "started": 0}
+
+    def submit(self, kind: str, key: Any, func: Callable, wait: bool = False) -> bool:
+        """
+        İsteği kuyruğa ekler; kabul edildiyse (veya aynısı zaten varsa) True döner
+        wait=True ise istek çalınıp bitene kadar bekler
+        """
+        preempt = None
+        with self.cond:
+            now = time.monotonic()
+            self._prune_recent(now)
+            request = self._recent.get((kind, key))
+            if request is not None:
+                self.stats["coalesced"] += 1
+            else:
+                request = AudioRequest(kind, key, func, next(self._seq))
+                if not self._make_room(request):
+                    self.stats["rejected"] += 1
+                    print(f"[{self.name}] Kuyruk dolu, istek reddedildi: {kind} {key}")
+                    return False
+                heapq.heappush(self.heap, (request.priority, request.seq, request))
+                self._recent[(kind, key)] = request
+                self.stats["submitted"] += 1
+                self.stats["max_depth"] = max(self.stats["max_depth"], len(self.heap))
+                current = self.current
+                if current and current.kind in PREEMPTS.get(kind, ()) and not current.cancelled.is_set():
+                    preempt = current
+                    self._mark_preempted(current, requeue=(current.kind in REQUEUE_ON_PREEMPT
+                                                           and kind != KIND_EMERGENCY))
+                self._ensure_worker()
+                self.cond.notify()
+
+        if preempt:
+            self._silence(preempt)
+        if wait:
+            request.wait()
+        return True
+
+    def _prune_recent(self, now: float):
+        for recent_key, request in list(self._recent.items()):
+            if request.status in ("dropped", "failed") or (
+                    request.finished.is_set() and now - request.submitted > self.coalesce_seconds):
+                del self._recent[recent_key]
+
+    def _make_room(self, request: AudioRequest) -> bool:
+        """Kuyruk doluysa daha düşük öncelikli en yeni bekleyeni atar"""
+        if len(self.heap) < self.depth:
+            return True
+        worst = max(self.heap, key=lambda item: (item[0], item[1]))
+        if worst[0] <= request.priority:
+            return False
+        self.heap.remove(worst)
+        heapq.heapify(self.heap)
+        self._finish(worst[2], "dropped")
+        self.stats["dropped"] += 1
+        return True
+
+    def _mark_preempted(self, request: AudioRequest, requeue: bool):
+        request.cancelled.set()
+        request.requeue = requeue
+        self.stats["preempted"] += 1
+
+    def _silence(self, request: AudioRequest):
+        """Kesilen isteğin kanallarını durdurur (çalma fonksiyonu bekleme sonrası döner)"""
+        for channel_name in REQUEST_CHANNELS.get(request.kind, ()):
+            channel = self.engine.channels.get(channel_name)
+            if channel:
+                channel.stop()
+
+    def _ensure_worker(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._worker, name=self.name, daemon=True)
+            self.thread.start()
+
+    def _worker(self):
+        while True:
+            with self.cond:
+                while not self.heap:
+                    self.cond.wait()
+                _, _, request = heapq.heappop(self.heap)
+                self.current = request
+                request.status = "playing"
+                waited_ms = (time.monotonic() - request.submitted) * 1000
+                self.stats["started"] += 1
+                self.stats["wait_ms_total"] += waited_ms
+                self.stats["wait_ms_max"] = max(self.stats["wait_ms_max"], round(waited_ms, 1))
+
+            status = "done"
+            try:
+                request.func(request)
+            except Exception as e:
+                status = "failed"
+                print(f"[{self.name}] İstek hatası ({request.kind} {request.key}): {e}")
+
+            with self.cond:
+                self.current = None
+                if request.requeue:
+                    # Kesilen anons baştan çalınmak üzere eski sırasıyla geri döner
+                    request.requeue = False
+                    request.cancelled = threading.Event()
+                    request.status = "queued"
+                    heapq.heappush(self.heap, (request.priority, request.seq, request))
+                    self.stats["requeued"] += 1
+                    continue
+                self.stats["failed" if status == "failed" else "completed"] += 1
+                self._finish(request, status)
+
+    def _finish(self, request: AudioRequest, status: str):
+        request.status = status
+        request.finished.set()
+
+    def clear(self) -> int:
+        """Bekleyen istekleri atar, çalanı kesilmiş sayar (kanalları çağıran durdurur)"""
+        with self.cond:
+            pending = [item[2] for item in self.heap]
+            self.heap = []
+            for request in pending:
+                self._finish(request, "dropped")
+            self.stats["dropped"] += len(pending)
+            if self.current:
+                self.current.cancelled.set()
+                self.current.requeue = False
+        return len(pending)
+
+    def cancel(self, kind: str) -> int:
+        """Verilen türdeki bekleyen istekleri atar, çalıyorsa kesilmiş sayar (ör. müzik durdurma)"""
+        with self.cond:
+            pending = [item for item in self.heap if item[2].kind == kind]
+            if pending:
+                self.heap = [item for item in self.heap if item[2].kind != kind]
+                heapq.heapify(self.heap)
+                for _, _, request in pending:
+                    self._finish(request, "dropped")
+                self.stats["dropped"] += len(pending)
+            if self.current and self.current.kind == kind:
+                self.current.cancelled.set()
+                self.current.requeue = False
+        return len(pending)
+
+    # ===== İstek türleri =====
+
+    def bell(self, filename: str, wait: bool = False) -> bool:
+        return self.submit(KIND_BELL, filename,
+                           lambda request: self.engine.play_bell(filename, blocking=True), wait)
+
+    def announcement(self, filename: str, wait: bool = False) -> bool:
+        return self.submit(KIND_ANNOUNCEMENT, filename,
+                           lambda request: self.engine.play_announcement(filename, blocking=True), wait)
+
+    def program(self, steps: list, wait: bool = False) -> bool:
+        return self.submit(KIND_PROGRAM, tuple(tuple(step) for step in steps),
+                           lambda request: self.engine.play_program(steps, cancel=request.cancelled), wait)
+
+    def emergency(self, filename: str, wait: bool = False) -> bool:
+        def play(request):
+            self.engine.stop_music(fade=False)
+            self.engine.play_announcement(filename, blocking=True)
+        return self.submit(KIND_EMERGENCY, filename, play, wait)
+
+    def music(self, func: Callable, key: Any = "break") -> bool:
+        """
+        Müzik başlatma: zil ve anonslar bittikten sonra çalışır
+        Beklerken müzik durdurulduysa (cancel) hiç başlamaz; başlarken durdurulduysa hemen susturulur
+        """
+        def start(request):
+            if request.cancelled.is_set():
+                return
+            func()
+            if request.cancelled.is_set():
+                self.engine.stop_music(fade=False)
+        return self.submit(KIND_MUSIC, key, start)
+
+    def get_status(self) -> dict:
+        with self.cond:
+            stats = dict(self.stats)
+            started = stats.pop("started")
+            total = stats.pop("wait_ms_total")
+            stats["depth"] = len(self.heap)
+            stats["wait_ms_avg"] = round(total / started, 1) if started else None
+            stats["current"] = {"kind": self.current.kind, "key": str(self.current.key)} if self.current else None
+        return stats
@@ -0,0 +1,276 @@
+"""
+NikolayCo SmartZill v2.0 - Tetikleme Kuyruğu
+Zamanlayıcının zil/anons/müzik işlerini sıralı çalıştıran ayrı bir işçi thread'i.
+Zamanlayıcı thread'i ses bitene kadar beklemez; geciken işler tespit edilip raporlanır.
+Çok kiracılı kurulumda kuyruklar ortak bir işçi havuzunda (DispatchPool) çalışır.
+"""
+import queue
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Optional, Callable, Dict
+
+# Olay türüne göre en fazla kabul edilen gecikme (saniye); None = süresiz
+DEFAULT_MAX_DELAY = {
+    "start": 60,
+    "end": 60,
+    "interim": 60,
+    "birthday": 60,
+    "music": None,
+}
+
+
+class DispatchJob:
+    """Kuyruktaki tek bir iş"""
+
+    __slots__ = ("name", "kind", "action", "scheduled", "deadline", "enqueued_at")
+
+    def __init__(self, name: str, kind: str, action: Callable, scheduled: datetime,
+                 deadline: Optional[datetime], enqueued_at: datetime):
+        self.name = name
+        self.kind = kind
+        self.action = action
+        self.scheduled = scheduled
+        self.deadline = deadline
+        self.enqueued_at = enqueued_at
+
+
+class DispatchPool:
+    """
+    Birden çok tetikleme kuyruğunu az sayıda işçi thread'iyle çalıştıran havuz
+
+    - Her kuyruğun işleri yine sırayla ve tek seferde bir işçide çalışır
+    - Farklı kuyruklar (kiracılar) paralel işlenir
+    - submit ile tek seferlik işler de (ör. kiracı tick'i) aynı işçilerde çalışır
+    """
+
+    def __init__(self, workers: int = 8, name: str = "DispatchPool"):
+        self.name = name
+        self.workers = workers
+        # Sıradaki kuyruklar (TriggerDispatcher) ve tek seferlik işler (callable)
+        self.ready: "queue.Queue" = queue.Queue()
+        self.threads: list = []
+        self.running = False
+        self.lock = threading.Lock()
+
+    def start(self):
+        """İşçi thread'lerini başlatır (çalışıyorsa bir şey yapmaz)"""
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+            self.threads = [
+                threading.Thread(target=self._worker, daemon=True, name=f"{self.name}-{i}")
+                for i in range(self.workers)
+            ]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self, timeout: float = 2):
+        """İşçileri durdurur"""
+        with self.lock:
+            if not self.running:
+                return
+            self.running = False
+        for _ in self.threads:
+            self.ready.put(None)
+        for thread in self.threads:
+            thread.join(timeout=timeout)
+
+    def schedule(self, dispatcher: "TriggerDispatcher"):
+        """İşi olan kuyruğu sıraya alır"""
+        self.ready.put(dispatcher)
+
+    def submit(self, func: Callable):
+        """Tek seferlik işi havuza verir"""
+        self.ready.put(func)
+
+    def _worker(self):
+        while True:
+            item = self.ready.get()
+            if item is None:
+                break
+            if isinstance(item, TriggerDispatcher):
+                item._drain()
+                continue
+            try:
+                item()
+            except Exception as e:
+                print(f"[{self.name}] İş hatası: {e}")
+
+
+class TriggerDispatcher:
+    """
+    Sıralı tetikleme kuyruğu
+
+    - İşler geliş sırasıyla tek bir işçi thread'inde çalışır (havuz verilmişse havuzun işçisinde)
+    - Her işin planlanan anı ve son geçerlilik anı vardır
+    - Son anı geçmiş işler çalınmaz, geç kalmış olarak raporlanır
+    - İşçi başlatılmamışsa işler çağıran thread'de hemen çalışır
+    """
+
+    def __init__(self, name: str = "Dispatch", clock: Callable[[], datetime] = datetime.now,
+                 pool: Optional[DispatchPool] = None):
+        self.name = name
+        self.clock = clock
+        self.queue: "queue.Queue[Optional[DispatchJob]]" = queue.Queue()
+        self.thread: Optional[threading.Thread] = None
+        self.running = False
+
+        # Ortak işçi havuzu: kendi thread'i açılmaz, işler havuzda sırayla çalışır
+        self.pool = pool
+        self._pooled: deque = deque()
+        self._pool_scheduled = False
+        self._pool_idle = threading.Condition()
+        self.max_delay: Dict[str, Optional[float]] = dict(DEFAULT_MAX_DELAY)
+
+        # İstatistikler
+        self.lock = threading.Lock()
+        self.dispatched = 0
+        self.late = 0
+        self.failed = 0
+        self.late_events: deque = deque(maxlen=50)
+        self.current_job: Optional[DispatchJob] = None
+
+        # Callback'ler
+        self.on_started: Optional[Callable[[DispatchJob], None]] = None  # İş çalmaya başladığında
+        self.on_late: Optional[Callable[[DispatchJob, float], None]] = None  # İş geç kaldığında
+
+    def start(self):
+        """İşçi thread'ini başlatır"""
+        if self.running:
+            return
+        self.running = True
+        if self.pool:
+            self.pool.start()
+            return
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 2):
+        """İşçi thread'ini durdurur (kuyrukta bekleyen işler atılır)"""
+        if not self.running:
+            return
+        self.running = False
+        if self.pool:
+            with self._pool_idle:
+                self._pooled.clear()
+            return
+        # Bekleyen işleri boşalt, işçiyi uyandır
+        try:
+            while True:
+                self.queue.get_nowait()
+                self.queue.task_done()
+        except queue.Empty:
+            pass
+        self.queue.put(None)
+        if self.thread:
+            self.thread.join(timeout=timeout)
+
+    def submit(self, name: str, kind: str, action: Callable,
+               scheduled: Optional[datetime] = None) -> DispatchJob:
+        """İşi kuyruğa ekler (işçi yoksa hemen çalıştırır)"""
+        now = self.clock()
+        scheduled = scheduled or now
+        max_delay = self.max_delay.get(kind)
+        deadline = scheduled + timedelta(seconds=max_delay) if max_delay is not None else None
+        job = DispatchJob(name, kind, action, scheduled, deadline, now)
+
+        if self.running and self.pool:
+            with self._pool_idle:
+                self._pooled.append(job)
+                if self._pool_scheduled:
+                    return job
+                self._pool_scheduled = True
+            self.pool.schedule(self)
+        elif self.running:
+            self.queue.put(job)
+        else:
+            self._run(job)
+        return job
+
+    def join(self):
+        """Kuyruktaki tüm işler bitene kadar bekler"""
+        if self.running and self.pool:
+            with self._pool_idle:
+                while self._pool_scheduled:
+                    self._pool_idle.wait()
+        elif self.running:
+            self.queue.join()
+
+    def pending(self) -> int:
+        """Kuyrukta bekleyen iş sayısı"""
+        if self.pool:
+            return len(self._pooled)
+        return self.queue.qsize()
+
+    def _drain(self):
+        """Havuz işçisinde bu kuyruğun bekleyen işlerini sırayla çalıştırır"""
+        while True:
+            with self._pool_idle:
+                if not self._pooled:
+                    self._pool_scheduled = False
+                    self._pool_idle.notify_all()
+                    return
+                job = self._pooled.popleft()
+            self._run(job)
+
+    def _worker(self):
+        """İşçi döngüsü"""
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    break
+                self._run(job)
+            finally:
+                self.queue.task_done()
+
+    def _run(self, job: DispatchJob):
+        """Tek bir işi çalıştırır, geç kalmışsa raporlar"""
+        now = self.clock()
+        if job.deadline is not None and now > job.deadline:
+            lateness = (now - job.scheduled).total_seconds()
+            with self.lock:
+                self.late += 1
+                self.late_events.append({
+                    "name": job.name,
+                    "kind": job.kind,
+                    "scheduled": job.scheduled.strftime("%Y-%m-%d %H:%M:%S"),
+                    "late_seconds": round(lateness, 2)
+                })
+            print(f"[{self.name}] Geç kalan olay atlandı: {job.name} ({lateness:.1f} sn gecikme)")
+            if self.on_late:
+                try:
+                    self.on_late(job, lateness)
+                except Exception as e:
+                    print(f"[{self.name}] on_late callback hatası: {e}")
+            return
+
+        self.current_job = job
+        try:
+            if self.on_started:
+                self.on_started(job)
+            job.action()
+            with self.lock:
+                self.dispatched += 1
+        except Exception as e:
+            with self.lock:
+                self.failed += 1
+            print(f"[{self.name}] İş hatası ({job.name}): {e}")
+        finally:
+            self.current_job = None
+
+    def get_status(self) -> dict:
+        """Kuyruk durumunu döndürür"""
+        current = self.current_job
+        with self.lock:
+            return {
+                "running": self.running,
+                "pending": self.pending(),
+                "current": current.name if current else None,
+                "dispatched": self.dispatched,
+                "late": self.late,
+                "failed": self.failed,
+                "late_events": list(self.late_events)
+            }
@@ -0,0 +1,99 @@
+"""
+NikolayCo SmartZill v2.0 - Etkinlik Aralık Dizini
+Bir günün etkinliklerini başlangıca göre sıralı tutar; çakışma sorguları
+tüm etkinlikleri taramak yerine bisect ve en büyük bitiş segment ağacıyla yapılır.
+Gece yarısını geçen etkinlik (ör. 22:00-06:00) iki parçaya bölünerek dizine girer.
+"""
+from bisect import bisect_left, bisect_right
+from typing import Optional, List, Tuple
+
+from core.timeline import parse_hhmm, MINUTES_PER_DAY
+
+
+def activity_spans(activity: dict) -> Optional[List[Tuple[int, int]]]:
+    """
+    Etkinliğin (başlangıç, bitiş) dakika aralıkları; geçersiz veya boş aralıksa None
+    Bitiş başlangıçtan önceyse etkinlik gece yarısını geçer: [başlangıç, 24:00) ve [00:00, bitiş)
+    """
+    start = parse_hhmm(activity.get("startTime"))
+    end = parse_hhmm(activity.get("endTime"))
+    if start is None or end is None or end == start:
+        return None
+    if end > start:
+        return [(start, end)]
+    spans = [(start, MINUTES_PER_DAY)]
+    if end > 0:
+        spans.append((0, end))
+    return spans
+
+
+class ActivityIndex:
+    """
+    Tek günün etkinlik aralıkları
+
+    - _starts: sıralı başlangıç dakikaları
+    - _tree: sıralı aralıkların bitişleri üzerinde en büyük değer segment ağacı
+      (çakışan eski kayıtlar olsa da sorgu O((k+1)·log n), ekleme O(n))
+    """
+
+    def __init__(self, activities: Optional[List[dict]] = None):
+        items = []
+        for activity in activities or []:
+            for start, end in activity_spans(activity) or []:
+                items.append((start, end, activity))
+        items.sort(key=lambda i: i[0])
+
+        self._items: List[Tuple[int, int, dict]] = items
+        self._starts: List[int] = [i[0] for i in items]
+        self._size = 1
+        self._tree: List[int] = []
+        self._build()
+
+    def _build(self):
+        """Segment ağacını yaprak sayısı ikinin kuvveti olacak şekilde yeniden kurar"""
+        size = 1
+        while size < len(self._items):
+            size *= 2
+        tree = [-1] * (2 * size)
+        for i, (_, end, _) in enumerate(self._items):
+            tree[size + i] = end
+        for node in range(size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self._size = size
+        self._tree = tree
+
+    def _collect(self, node: int, lo: int, hi: int, limit: int, start: int, found: List[int]):
+        """[lo, hi) düğümünde limit öncesi, bitişi start'tan büyük yaprakları sırayla toplar"""
+        if lo >= limit or self._tree[node] <= start:
+            return
+        if node >= self._size:
+            found.append(lo)
+            return
+        mid = (lo + hi) // 2
+        self._collect(2 * node, lo, mid, limit, start, found)
+        self._collect(2 * node + 1, mid, hi, limit, start, found)
+
+    def overlaps(self, start: int, end: int) -> List[dict]:
+        """[start, end) aralığıyla çakışan etkinlikler (başlangıca göre sıralı)"""
+        # Başlangıcı end'den önce olan aralıklardan bitişi start'tan sonra olanlar
+        limit = bisect_left(self._starts, end)
+        positions: List[int] = []
+        if limit:
+            self._collect(1, 0, self._size, limit, start, positions)
+        found = []
+        for position in positions:
+            activity = self._items[position][2]
+            # Gece yarısını geçen etkinliğin iki parçası tek sonuç sayılır
+            if not any(activity is other for other in found):
+                found.append(activity)
+        return found
+
+    def insert(self, start: int, end: int, activity: dict):
+        """Aralığı sıralı konumuna ekler"""
+        idx = bisect_right(self._starts, start)
+        self._starts.insert(idx, start)
+        self._items.insert(idx, (start, end, activity))
+        self._build()
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,96 @@
+"""
+NikolayCo SmartZill v2.0 - Tetiklenme Defteri
+Tetiklenen olayları (tarih, olay anahtarı, tür, tetiklenme anı) diske ekler.
+Yeniden başlatmada okunur: aynı olay ikinci kez çalmaz, kapalı kalınan süredeki
+olaylar son işlenen dakikadan itibaren telafi kurallarıyla oynatılır.
+
+Kayıt başına tek satır eklenir; eski günler gün dönümünde atılır (dosya yeniden yazılır).
+"""
+import json
+import os
+import threading
+from datetime import datetime, date
+from typing import Optional, Dict, List, Tuple
+from pathlib import Path
+
+
+class FiredLedger:
+    """Tek bölgenin tetiklenme defteri (JSON satırları)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+
+    def load(self, keep_from: Optional[date] = None) -> Tuple[Dict[date, set], Optional[datetime]]:
+        """
+        Defteri okur: (tarih -> olay anahtarları, son işlenen dakika)
+        Yarım yazılmış son satır atlanır; keep_from'dan eski günler yok sayılır
+        """
+        fired: Dict[date, set] = {}
+        processed: Optional[datetime] = None
+        for record in self._read():
+            try:
+                if "processed" in record:
+                    minute = datetime.strptime(record["processed"], "%Y-%m-%d %H:%M")
+                else:
+                    day = date.fromisoformat(record["day"])
+                    minute = datetime.fromisoformat(record["at"]).replace(second=0, microsecond=0)
+                    if keep_from is None or day >= keep_from:
+                        fired.setdefault(day, set()).add(record["key"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if processed is None or minute > processed:
+                processed = minute
+        return fired, processed
+
+    def _read(self) -> List[dict]:
+        if not self.path.exists():
+            return []
+        records = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        return records
+
+    def record(self, day: date, events: List[Tuple[str, str]], at: datetime):
+        """Tetiklenen olayları (anahtar, tür) ekler; sesler çalınmadan önce çağrılır"""
+        at_text = at.isoformat(timespec="seconds")
+        self._append([
+            {"day": day.isoformat(), "key": key, "kind": kind, "at": at_text}
+            for key, kind in events
+        ])
+
+    def mark_processed(self, minute: datetime):
+        """Son işlenen dakikayı ekler (düzgün kapanışta)"""
+        self._append([{"processed": minute.strftime("%Y-%m-%d %H:%M")}])
+
+    def _append(self, records: List[dict]):
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def prune(self, keep_from: date):
+        """keep_from'dan eski günlerin kayıtlarını atar (son işlenen dakika korunur)"""
+        with self.lock:
+            records = self._read()
+            kept = [r for r in records if "day" in r and r["day"] >= keep_from.isoformat()]
+            markers = [r for r in records if "processed" in r]
+            if len(kept) + min(len(markers), 1) == len(records):
+                return
+            if markers:
+                kept.append(max(markers, key=lambda r: r["processed"]))
+
+            tmp_file = self.path.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                for record in kept:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.path)
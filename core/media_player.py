@@ -13,6 +13,7 @@ import platform
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import load_config, save_config, MUSIC_DIR
+from core.vlc_runtime import get_instance, PlayerPool
 
 
 class MediaPlayer:
@@ -27,12 +28,9 @@ class MediaPlayer:
     def __init__(self):
         self.lock = threading.Lock()
         
-        # VLC instance
-        vlc_args = ["--quiet", "--no-video", "--vout=dummy"]
-        if sys.platform.startswith("linux"):
-            vlc_args.append("--no-xlib")
-            
-        self.instance = vlc.Instance(*vlc_args)
+        # Ses kanallarıyla ortak libVLC instance; player'lar havuzdan alınır
+        self.instance = get_instance()
+        self.pool = PlayerPool("MediaPlayer", self._on_track_end, size=1)
         self.player: Optional[vlc.MediaPlayer] = None
         
         # Durum
@@ -120,7 +118,7 @@ class MediaPlayer:
                 
                 media = self.instance.media_new_path(source)
             
-            self.player = self.instance.media_player_new()
+            self.player = self.pool.acquire()
             self.player.set_media(media)
             # Windows VLC uses 0-255 volume range, map our 0-100 to that range
             if platform.system() == "Windows":
@@ -130,10 +128,6 @@ class MediaPlayer:
             else:
                 self.player.audio_set_volume(self.volume)
             
-            # Parça bittiğinde callback
-            event_manager = self.player.event_manager()
-            event_manager.event_attach(vlc.EventType.MediaPlayerEndReached, self._on_track_end)
-            
             self.player.play()
             self.current_source = source
             self.current_type = source_type
@@ -221,11 +215,7 @@ class MediaPlayer:
         self._stop_reconnect = True
         
         if self.player:
-            try:
-                self.player.stop()
-                self.player.release()
-            except:
-                pass
+            self.pool.release(self.player)
             self.player = None
         
         self.is_paused = False
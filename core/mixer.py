@@ -0,0 +1,149 @@
+"""
+NikolayCo SmartZill v2.0 - Ses Karıştırıcı (Kazanç Zarfları)
+Kanallara zamanlı kazanç geçişleri uygular: anons altında müziği kısma (ducking),
+mola bitişinde yavaşça kısarak durdurma (fade-out), devam ederken açma (fade-in).
+
+Tüm kanallar tek zarf thread'ini paylaşır; aktif geçiş yokken thread bekler
+ve hiç CPU kullanmaz. Geçiş sürerken RAMP_INTERVAL aralıklarla adım atılır.
+"""
+import threading
+import time
+from typing import Optional, Callable, Dict, List
+
+# Zarf adım aralığı (saniye) - geçişin çözünürlüğü
+RAMP_INTERVAL = 0.02
+
+
+def _linear(p: float) -> float:
+    return p
+
+
+def _smooth(p: float) -> float:
+    # Başı ve sonu yumuşak S eğrisi (smoothstep)
+    return p * p * (3 - 2 * p)
+
+
+CURVES = {"linear": _linear, "smooth": _smooth}
+
+
+class Mixer:
+    """
+    Kanal kazanç zarflarını süren ortak thread
+
+    - fade: kanalın kazancını verilen sürede hedefe taşır, bitince on_done çağrılır
+    - Aynı kanala yeni geçiş verilirse eskisi iptal edilir (on_done çağrılmaz)
+    - Kanal nesnesinin set_gain(gain) ve gain alanı olması yeterlidir
+    """
+
+    def __init__(self, interval: float = RAMP_INTERVAL):
+        self.interval = interval
+        self.envelopes: Dict[object, dict] = {}
+        self.cond = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+        # Ölçüm: adım sayısı, toplam thread CPU süresi, en büyük gecikme
+        self.stats = {"ramps": 0, "completed": 0, "cancelled": 0, "ticks": 0,
+                      "cpu_seconds": 0.0, "max_lag_ms": 0.0}
+
+    def fade(self, channel, target: float, duration: float,
+             on_done: Optional[Callable] = None, curve: str = "smooth"):
+        """Kanal kazancını duration saniyede target'a (0.0-1.0) taşır"""
+        target = max(0.0, min(1.0, target))
+        if duration <= 0:
+            self.cancel(channel)
+            channel.set_gain(target)
+            if on_done:
+                on_done()
+            return
+
+        with self.cond:
+            if self.envelopes.pop(channel, None):
+                self.stats["cancelled"] += 1
+            self.envelopes[channel] = {
+                "start": time.monotonic(),
+                "duration": duration,
+                "from": channel.gain,
+                "to": target,
+                "curve": CURVES.get(curve, _smooth),
+                "on_done": on_done,
+            }
+            self.stats["ramps"] += 1
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._loop, name="Mixer", daemon=True)
+                self.thread.start()
+            self.cond.notify()
+
+    def cancel(self, channel) -> bool:
+        """Kanalın süren geçişini iptal eder (kazanç olduğu yerde kalır)"""
+        with self.cond:
+            if self.envelopes.pop(channel, None):
+                self.stats["cancelled"] += 1
+                return True
+        return False
+
+    def is_fading(self, channel) -> bool:
+        with self.cond:
+            return channel in self.envelopes
+
+    def _loop(self):
+        next_tick = time.monotonic()
+        while True:
+            with self.cond:
+                while not self.envelopes:
+                    self.cond.wait()
+                    next_tick = time.monotonic()
+
+            now = time.monotonic()
+            lag_ms = (now - next_tick) * 1000
+            cpu_started = time.thread_time()
+            done = self._step(now)
+            self.stats["cpu_seconds"] += time.thread_time() - cpu_started
+            self.stats["ticks"] += 1
+            if lag_ms > self.stats["max_lag_ms"]:
+                self.stats["max_lag_ms"] = round(lag_ms, 2)
+
+            for callback in done:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"[Mixer] Geçiş sonu hatası: {e}")
+
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Geride kalındıysa adımlar biriktirilmez
+                next_tick = time.monotonic()
+
+    def _step(self, now: float) -> List[Callable]:
+        """Tüm aktif zarfları bir adım ilerletir, biten geçişlerin on_done'larını döndürür"""
+        done = []
+        with self.cond:
+            for channel, env in list(self.envelopes.items()):
+                progress = min(1.0, (now - env["start"]) / env["duration"])
+                gain = env["from"] + (env["to"] - env["from"]) * env["curve"](progress)
+                try:
+                    channel.set_gain(gain)
+                except Exception as e:
+                    print(f"[Mixer] Kazanç uygulanamadı: {e}")
+                if progress >= 1.0:
+                    del self.envelopes[channel]
+                    self.stats["completed"] += 1
+                    if env["on_done"]:
+                        done.append(env["on_done"])
+        return done
+
+    def get_status(self) -> dict:
+        with self.cond:
+            active = len(self.envelopes)
+        stats = dict(self.stats)
+        ticks = stats["ticks"]
+        stats["cpu_seconds"] = round(stats["cpu_seconds"], 4)
+        stats["avg_tick_us"] = round(self.stats["cpu_seconds"] / ticks * 1e6, 1) if ticks else None
+        stats["active"] = active
+        stats["interval_ms"] = self.interval * 1000
+        return stats
+
+
+# Global karıştırıcı (tüm bölgelerin kanalları ortak kullanır)
+mixer = Mixer()
@@ -0,0 +1,217 @@
+"""
+NikolayCo SmartZill v2.0 - Çalma Programları
+Aynı dakikaya düşen zil, anons ve doğum günü (TTS) seslerini tek bir sıralı
+programda birleştirir: önce ziller, kısa ara, sonra anonslar ve TTS.
+Ses motoru programı tek seferde, aralarda yeni player beklemeden çalar.
+
+Girdileri sabit dosyalar olan programlar ffmpeg varsa tek bir dosyaya işlenip
+önbelleğe alınır; aynı program sonraki günlerde o dosyadan çalınır. İşleme tüm
+bölgelerin paylaştığı tek işçi thread'inde sırayla yapılır; işlenemeyen program
+girdi dosyaları değişene kadar tekrar denenmez.
+"""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Optional, List, Tuple, Any
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import DATA_DIR
+
+STEP_BELL = "bell"
+STEP_GAP = "gap"
+STEP_ANNOUNCEMENT = "announcement"
+STEP_TTS = "tts"
+# Zil ile anons arasındaki ara (saniye)
+BELL_GAP_SECONDS = 2
+# İşlenmiş program önbelleği
+PROGRAM_CACHE_DIR = DATA_DIR / "cache" / "programs"
+# Önbellekte tutulacak en fazla dosya
+PROGRAM_CACHE_SIZE = 64
+# ffmpeg çıktı biçimi (kodlayıcı gerektirmez)
+RENDER_SAMPLE_RATE = 44100
+# İşlenmeyi bekleyen en fazla program
+RENDER_QUEUE_DEPTH = 16
+# Hatırlanan en fazla başarısız anahtar
+FAILED_KEYS_SIZE = 256
+
+
+class PlaybackProgram:
+    """Tek dakikanın sıralı çalma programı"""
+
+    def __init__(self, name: str, kind: str, scheduled: datetime):
+        self.name = name
+        # Kuyruk önceliği ve dakiklik için ilk olayın türü
+        self.kind = kind
+        self.scheduled = scheduled
+        self.bells: List[str] = []
+        self.announcements: List[str] = []
+        self.tts: List[str] = []
+
+    def add_bell(self, filename: str):
+        # Aynı zil (ör. bitiş ve sonraki başlangıç) art arda iki kez çalınmaz
+        if filename and filename not in self.bells:
+            self.bells.append(filename)
+
+    def add_announcement(self, filename: str):
+        if filename:
+            self.announcements.append(filename)
+
+    def add_tts(self, name: str):
+        if name:
+            self.tts.append(name)
+
+    def drop_announcements(self) -> int:
+        """Anons ve TTS adımlarını atar (bayatlamış program), atılan sayıyı döndürür"""
+        dropped = len(self.announcements) + len(self.tts)
+        self.announcements = []
+        self.tts = []
+        return dropped
+
+    def steps(self) -> List[Tuple[str, Any]]:
+        """(tür, değer) adımları: ziller, ara, anonslar, TTS"""
+        steps: List[Tuple[str, Any]] = [(STEP_BELL, f) for f in self.bells]
+        if self.bells and (self.announcements or self.tts):
+            steps.append((STEP_GAP, BELL_GAP_SECONDS))
+        steps.extend((STEP_ANNOUNCEMENT, f) for f in self.announcements)
+        steps.extend((STEP_TTS, n) for n in self.tts)
+        return steps
+
+    def __bool__(self):
+        return bool(self.bells or self.announcements or self.tts)
+
+
+class ProgramRenderer:
+    """
+    Sabit girdili programları tek dosyaya işleyen önbellek
+
+    - Anahtar: adımlar, dosyaların boyut/değişme zamanı ve kanal ses oranları
+    - ffmpeg yoksa hiçbir şey yapılmaz, program adım adım çalınır
+    - İşler tek işçi thread'inde sırayla işlenir; bekleyen iş sayısı sınırlıdır
+    - İşlenemeyen anahtar tekrar denenmez (dosya değişince anahtar da değişir)
+    """
+
+    def __init__(self, cache_dir: Path = PROGRAM_CACHE_DIR, max_files: int = PROGRAM_CACHE_SIZE):
+        self.cache_dir = Path(cache_dir)
+        self.max_files = max_files
+        self.ffmpeg = shutil.which("ffmpeg")
+        self._rendering = set()
+        self._queue: deque = deque()
+        self._failed: "OrderedDict[str, str]" = OrderedDict()
+        self.cond = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def available(self) -> bool:
+        return bool(self.ffmpeg)
+
+    def cache_key(self, steps: List[Tuple[str, Any]], gains: List[float]) -> Optional[str]:
+        """Adımlar ve girdi dosyalarının durumu için anahtar (dosya yoksa veya TTS varsa None)"""
+        parts = []
+        for (kind, value), gain in zip(steps, gains):
+            if kind == STEP_GAP:
+                parts.append([kind, value])
+                continue
+            if kind == STEP_TTS or not value or not os.path.isfile(value):
+                return None
+            stat = os.stat(value)
+            parts.append([kind, os.path.abspath(value), stat.st_size, stat.st_mtime_ns, round(gain, 3)])
+        text = json.dumps(parts, ensure_ascii=False)
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: Optional[str]) -> Optional[str]:
+        """İşlenmiş dosya önbellekte varsa yolunu döndürür"""
+        if not key:
+            return None
+        path = self.cache_dir / f"{key}.wav"
+        if path.exists():
+            try:
+                os.utime(path)  # Son kullanım (eskiler önce silinir)
+            except OSError:
+                pass
+            return str(path)
+        return None
+
+    def render_async(self, key: Optional[str], steps: List[Tuple[str, Any]], gains: List[float]):
+        """Programı arka planda tek dosyaya işler (sonraki çalmalarda kullanılır)"""
+        if not key or not self.available:
+            return
+        with self.cond:
+            if key in self._rendering or key in self._failed:
+                return
+            if len(self._queue) >= RENDER_QUEUE_DEPTH:
+                print("[Program] İşleme kuyruğu dolu, program adım adım çalınmaya devam edecek")
+                return
+            self._rendering.add(key)
+            self._queue.append((key, steps, gains))
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._worker, name="ProgramRenderer", daemon=True)
+                self.thread.start()
+            self.cond.notify()
+
+    def _worker(self):
+        while True:
+            with self.cond:
+                while not self._queue:
+                    self.cond.wait()
+                key, steps, gains = self._queue.popleft()
+            self._render(key, steps, gains)
+
+    def _render(self, key: str, steps: List[Tuple[str, Any]], gains: List[float]):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            target = self.cache_dir / f"{key}.wav"
+            tmp_file = self.cache_dir / f"{key}.tmp"
+
+            args = [self.ffmpeg, "-y", "-loglevel", "error"]
+            filters = []
+            labels = []
+            input_index = 0
+            for n, ((kind, value), gain) in enumerate(zip(steps, gains)):
+                if kind == STEP_GAP:
+                    filters.append(f"anullsrc=r={RENDER_SAMPLE_RATE}:cl=stereo,atrim=duration={value},"
+                                   f"aformat=sample_fmts=s16:channel_layouts=stereo[s{n}]")
+                else:
+                    args += ["-i", value]
+                    filters.append(f"[{input_index}:a]volume={gain:.3f},aresample={RENDER_SAMPLE_RATE},"
+                                   f"aformat=sample_fmts=s16:channel_layouts=stereo[s{n}]")
+                    input_index += 1
+                labels.append(f"[s{n}]")
+            filters.append(f"{''.join(labels)}concat=n={len(labels)}:v=0:a=1[out]")
+            args += ["-filter_complex", ";".join(filters), "-map", "[out]", "-f", "wav", str(tmp_file)]
+
+            subprocess.run(args, check=True, timeout=60, capture_output=True)
+            os.replace(tmp_file, target)
+            self._evict()
+        except Exception as e:
+            detail = getattr(e, "stderr", None)
+            if isinstance(detail, bytes):
+                detail = detail.decode("utf-8", "replace").strip()
+            print(f"[Program] İşlenemedi, girdiler değişene kadar tekrar denenmeyecek: {e}"
+                  + (f" ({detail})" if detail else ""))
+            with self.cond:
+                self._failed[key] = str(e)
+                while len(self._failed) > FAILED_KEYS_SIZE:
+                    self._failed.popitem(last=False)
+        finally:
+            with self.cond:
+                self._rendering.discard(key)
+
+    def _evict(self):
+        """En eski kullanılan dosyaları önbellek sınırına kadar siler"""
+        files = sorted(self.cache_dir.glob("*.wav"), key=lambda p: p.stat().st_mtime)
+        for path in files[:max(0, len(files) - self.max_files)]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+# Global program işleyici (tüm bölgelerin ses motorları ortak kullanır)
+program_renderer = ProgramRenderer()
@@ -0,0 +1,86 @@
+"""
+NikolayCo SmartZill v2.0 - Dakiklik İstatistikleri
+Her olayın planlanan andan ne kadar geç tetiklendiğini gün bazında kaydeder.
+"""
+import math
+import threading
+from datetime import date
+from typing import Dict, List, Optional
+
+# Histogram kova sınırları (milisaniye, üst sınır dahil değil)
+BUCKETS_MS = [10, 50, 100, 250, 500, 1000, 2000, 5000]
+
+# Kaç günlük geçmiş tutulacak
+KEEP_DAYS = 7
+
+
+def _bucket_label(index: int) -> str:
+    if index == 0:
+        return f"<{BUCKETS_MS[0]}ms"
+    if index >= len(BUCKETS_MS):
+        return f">={BUCKETS_MS[-1]}ms"
+    return f"{BUCKETS_MS[index - 1]}-{BUCKETS_MS[index]}ms"
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Sıralı listeden en yakın sıra yöntemiyle yüzdelik değer"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+class PunctualityStats:
+    """Günlük tetiklenme gecikmesi histogramı (p50/p95/max)"""
+
+    def __init__(self, keep_days: int = KEEP_DAYS):
+        self.lock = threading.Lock()
+        self.keep_days = keep_days
+        self._samples: Dict[date, List[float]] = {}
+        self._by_kind: Dict[date, Dict[str, int]] = {}
+
+    def record(self, day: date, kind: str, offset_seconds: float):
+        """Bir olayın planlanan andan sapmasını kaydeder"""
+        offset_ms = offset_seconds * 1000.0
+        with self.lock:
+            if day not in self._samples:
+                self._samples[day] = []
+                self._by_kind[day] = {}
+                # Eski günleri temizle
+                for old in sorted(self._samples)[:-self.keep_days]:
+                    del self._samples[old]
+                    del self._by_kind[old]
+            self._samples[day].append(offset_ms)
+            self._by_kind[day][kind] = self._by_kind[day].get(kind, 0) + 1
+
+    def summary(self, day: date) -> Optional[dict]:
+        """Tek günün özetini döndürür"""
+        with self.lock:
+            samples = sorted(self._samples.get(day, []))
+            by_kind = dict(self._by_kind.get(day, {}))
+
+        if not samples:
+            return None
+
+        histogram = [0] * (len(BUCKETS_MS) + 1)
+        for value in samples:
+            index = 0
+            while index < len(BUCKETS_MS) and value >= BUCKETS_MS[index]:
+                index += 1
+            histogram[index] += 1
+
+        return {
+            "date": day.isoformat(),
+            "count": len(samples),
+            "p50_ms": round(_percentile(samples, 50), 1),
+            "p95_ms": round(_percentile(samples, 95), 1),
+            "max_ms": round(samples[-1], 1),
+            "histogram": {_bucket_label(i): n for i, n in enumerate(histogram) if n},
+            "by_kind": by_kind
+        }
+
+    def get_status(self) -> List[dict]:
+        """Tutulan tüm günlerin özetleri (yeniden eskiye)"""
+        with self.lock:
+            days = sorted(self._samples, reverse=True)
+        return [s for s in (self.summary(d) for d in days) if s]
@@ -0,0 +1,285 @@
+"""
+NikolayCo SmartZill v2.0 - Tekrar Kuralları
+Etkinlik ve anonslardaki RRULE benzeri "recurrence" tanımlarını sadece
+derlenen gün için açar; programda her tekrar ayrı kayıt olarak tutulmaz.
+
+Desteklenen alt küme (metin "FREQ=MINUTELY;INTERVAL=45;UNTIL=17:00" veya sözlük):
+- FREQ: MINUTELY, HOURLY (gün içi tekrar), DAILY, WEEKLY, MONTHLY, YEARLY (gün seçimi)
+- INTERVAL: tekrar aralığı (gün düzeyinde DTSTART ile birlikte)
+- UNTIL: "HH:MM" gün içi son tekrar, "YYYY-MM-DD" / "YYYYMMDD" son tarih
+- DTSTART: "YYYY-MM-DD" / "YYYYMMDD" ilk tarih
+- BYDAY: MO..SU, ay içi sıra ile (1MO = ayın ilk Pazartesisi, -1FR = son Cuması)
+- BYMONTHDAY, BYMONTH
+"""
+import calendar
+from datetime import date, datetime
+from typing import Optional, List, Tuple
+
+from core.timeline import parse_hhmm, format_minute, MINUTES_PER_DAY
+
+FREQUENCIES = ("MINUTELY", "HOURLY", "DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+
+
+def _parse_date(value) -> date:
+    value = str(value).strip()
+    for fmt in ("%Y-%m-%d", "%Y%m%d"):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Geçersiz tarih: {value}")
+
+
+def _parse_list(value) -> list:
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [v for v in str(value).split(",") if v.strip()]
+
+
+def _parse_byday(value) -> List[Tuple[Optional[int], int]]:
+    """'1MO', '-1FR', 'WE' -> (sıra, haftanın günü)"""
+    result = []
+    for item in _parse_list(value):
+        item = str(item).strip().upper()
+        weekday = WEEKDAYS.get(item[-2:])
+        if weekday is None:
+            raise ValueError(f"Geçersiz BYDAY: {item}")
+        ordinal = None
+        if item[:-2]:
+            try:
+                ordinal = int(item[:-2])
+            except ValueError:
+                raise ValueError(f"Geçersiz BYDAY: {item}")
+            if ordinal == 0 or abs(ordinal) > 5:
+                raise ValueError(f"Geçersiz BYDAY: {item}")
+        result.append((ordinal, weekday))
+    return result
+
+
+class RecurrenceRule:
+    """Ayrıştırılmış tekrar kuralı"""
+
+    __slots__ = ("freq", "interval", "until_minute", "until_date", "dtstart",
+                 "byday", "bymonthday", "bymonth")
+
+    def __init__(self, freq: str, interval: int = 1, until_minute: Optional[int] = None,
+                 until_date: Optional[date] = None, dtstart: Optional[date] = None,
+                 byday: Optional[list] = None, bymonthday: Optional[list] = None,
+                 bymonth: Optional[list] = None):
+        self.freq = freq
+        self.interval = interval
+        self.until_minute = until_minute
+        self.until_date = until_date
+        self.dtstart = dtstart
+        self.byday = byday or []
+        self.bymonthday = bymonthday or []
+        self.bymonth = bymonth or []
+
+    @classmethod
+    def parse(cls, spec) -> "RecurrenceRule":
+        """Metin veya sözlük kuralı ayrıştırır, geçersizse ValueError"""
+        if isinstance(spec, str):
+            fields = {}
+            for part in spec.strip().split(";"):
+                if not part.strip():
+                    continue
+                if "=" not in part:
+                    raise ValueError(f"Geçersiz kural parçası: {part}")
+                key, value = part.split("=", 1)
+                fields[key.strip().upper()] = value.strip()
+        elif isinstance(spec, dict):
+            fields = {str(k).upper(): v for k, v in spec.items()}
+        else:
+            raise ValueError("Tekrar kuralı metin veya sözlük olmalı")
+
+        freq = str(fields.get("FREQ", "")).upper()
+        if freq not in FREQUENCIES:
+            raise ValueError(f"Geçersiz FREQ: {freq or '-'}")
+
+        try:
+            interval = int(fields.get("INTERVAL", 1))
+        except (TypeError, ValueError):
+            raise ValueError("INTERVAL sayı olmalı")
+        if interval < 1:
+            raise ValueError("INTERVAL en az 1 olmalı")
+
+        until_minute = until_date = None
+        if fields.get("UNTIL"):
+            until = str(fields["UNTIL"])
+            if ":" in until:
+                until_minute = parse_hhmm(until)
+                if until_minute is None:
+                    raise ValueError(f"Geçersiz UNTIL: {until}")
+            else:
+                until_date = _parse_date(until)
+
+        dtstart = _parse_date(fields["DTSTART"]) if fields.get("DTSTART") else None
+        if interval > 1 and freq not in ("MINUTELY", "HOURLY") and dtstart is None:
+            raise ValueError("Gün düzeyinde INTERVAL için DTSTART gerekli")
+
+        try:
+            bymonthday = [int(v) for v in _parse_list(fields.get("BYMONTHDAY", []))]
+            bymonth = [int(v) for v in _parse_list(fields.get("BYMONTH", []))]
+        except ValueError:
+            raise ValueError("BYMONTHDAY/BYMONTH sayı olmalı")
+
+        return cls(freq, interval, until_minute, until_date, dtstart,
+                   _parse_byday(fields.get("BYDAY", [])), bymonthday, bymonth)
+
+    @property
+    def is_intraday(self) -> bool:
+        return self.freq in ("MINUTELY", "HOURLY")
+
+    def occurs_on(self, day: date) -> bool:
+        """Kural verilen tarihte geçerli mi"""
+        if self.dtstart and day < self.dtstart:
+            return False
+        if self.until_date and day > self.until_date:
+            return False
+        if self.bymonth and day.month not in self.bymonth:
+            return False
+        if self.bymonthday:
+            last = calendar.monthrange(day.year, day.month)[1]
+            if day.day not in self.bymonthday and (day.day - last - 1) not in self.bymonthday:
+                return False
+        if self.byday and not any(self._matches_byday(day, o, w) for o, w in self.byday):
+            return False
+        if self.dtstart and not self.is_intraday:
+            if not self._matches_interval(day):
+                return False
+            # Başka seçici yoksa DTSTART'ın gün/ay bilgisi kullanılır (RRULE varsayılanı)
+            if not (self.byday or self.bymonthday):
+                if self.freq == "WEEKLY" and day.weekday() != self.dtstart.weekday():
+                    return False
+                if self.freq in ("MONTHLY", "YEARLY") and day.day != self.dtstart.day:
+                    return False
+                if self.freq == "YEARLY" and not self.bymonth and day.month != self.dtstart.month:
+                    return False
+        return True
+
+    @staticmethod
+    def _matches_byday(day: date, ordinal: Optional[int], weekday: int) -> bool:
+        if day.weekday() != weekday:
+            return False
+        if ordinal is None:
+            return True
+        if ordinal > 0:
+            return (day.day - 1) // 7 + 1 == ordinal
+        last = calendar.monthrange(day.year, day.month)[1]
+        return -((last - day.day) // 7 + 1) == ordinal
+
+    def _matches_interval(self, day: date) -> bool:
+        if self.interval == 1:
+            return True
+        start = self.dtstart
+        if self.freq == "DAILY":
+            steps = (day - start).days
+        elif self.freq == "WEEKLY":
+            steps = (day.toordinal() - day.weekday() - (start.toordinal() - start.weekday())) // 7
+        elif self.freq == "MONTHLY":
+            steps = (day.year - start.year) * 12 + day.month - start.month
+        else:
+            steps = day.year - start.year
+        return steps % self.interval == 0
+
+    def minutes_from(self, first: int, limit: Optional[int] = None) -> List[int]:
+        """İlk dakikadan başlayarak gün içi tekrar dakikaları"""
+        if not self.is_intraday:
+            return [first]
+        step = self.interval * (60 if self.freq == "HOURLY" else 1)
+        last = MINUTES_PER_DAY - 1
+        if self.until_minute is not None:
+            last = min(last, self.until_minute)
+        if limit is not None:
+            last = min(last, limit)
+        return list(range(first, last + 1, step))
+
+
+def _rule_of(item: dict, day: Optional[date]) -> Tuple[bool, Optional[RecurrenceRule]]:
+    """(bugün geçerli mi, kural); geçersiz kural tek seferlik kayıt gibi davranır"""
+    spec = item.get("recurrence")
+    if not spec:
+        return True, None
+    try:
+        rule = RecurrenceRule.parse(spec)
+    except ValueError as e:
+        print(f"[Recurrence] Geçersiz tekrar kuralı yok sayıldı ({spec}): {e}")
+        return True, None
+    if day is not None and not rule.occurs_on(day):
+        return False, rule
+    return True, rule
+
+
+def _expand_announcements(announcements: list, day: Optional[date], shift: int = 0) -> list:
+    """Anonsları gün için açar, shift dakika kaydırarak"""
+    result = []
+    for ann in announcements:
+        minute = parse_hhmm(ann.get("time"))
+        active, rule = _rule_of(ann, day)
+        if not active:
+            continue
+        if minute is None or (rule is None and shift == 0):
+            result.append(ann)
+            continue
+        times = rule.minutes_from(minute) if rule else [minute]
+        for m in times:
+            if 0 <= m + shift < MINUTES_PER_DAY:
+                occurrence = {k: v for k, v in ann.items() if k != "recurrence"}
+                occurrence["time"] = format_minute(m + shift)
+                result.append(occurrence)
+    return result
+
+
+def expand_activities(activities: List[dict], day: Optional[date] = None) -> List[dict]:
+    """
+    Tekrar kuralı olan etkinlik ve anonsları verilen gün için açar
+    Kuralı olmayan kayıtlar aynen (aynı nesne) döner; day None ise gün seçimi yapılmaz
+    """
+    result = []
+    for activity in activities:
+        active, rule = _rule_of(activity, day)
+        if not active:
+            continue
+
+        anns_key = "announcements" if activity.get("announcements") else "interimAnnouncements"
+        anns = activity.get(anns_key) or []
+        has_ann_rules = any(a.get("recurrence") for a in anns)
+        start = parse_hhmm(activity.get("startTime"))
+        end = parse_hhmm(activity.get("endTime"))
+
+        if rule is None or not rule.is_intraday or start is None:
+            if not has_ann_rules:
+                result.append(activity)
+            else:
+                expanded = dict(activity)
+                expanded[anns_key] = _expand_announcements(anns, day)
+                result.append(expanded)
+            continue
+
+        # Gün içi tekrar eden etkinlik: her tekrar süresi korunarak kaydırılır
+        duration = (end - start) if end is not None else None
+        for m in rule.minutes_from(start):
+            shift = m - start
+            if duration is not None and m + duration >= MINUTES_PER_DAY:
+                break
+            occurrence = {k: v for k, v in activity.items() if k != "recurrence"}
+            if shift:
+                occurrence["id"] = f"{activity.get('id', '')}@{format_minute(m)}"
+            occurrence["startTime"] = format_minute(m)
+            if duration is not None:
+                occurrence["endTime"] = format_minute(m + duration)
+            occurrence[anns_key] = _expand_announcements(anns, day, shift)
+            result.append(occurrence)
+    return result
+
+
+def expand_day(day_data: Optional[dict], day: date) -> Optional[dict]:
+    """Gün planındaki tekrar kurallarını açar; kural yoksa aynı nesne döner"""
+    if not day_data:
+        return day_data
+    activities = day_data.get("activities", [])
+    expanded = expand_activities(activities, day)
+    if len(expanded) == len(activities) and all(a is b for a, b in zip(expanded, activities)):
+        return day_data
+    return dict(day_data, activities=expanded)
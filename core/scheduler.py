@@ -2,15 +2,72 @@
 NikolayCo SmartZill v2.0 - Zamanlayıcı Servisi
 7 günlük haftalık program yönetimi
 """
+import copy
 import threading
 import time
-from datetime import datetime, timedelta
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
 from typing import Optional, List, Dict, Any
 from pathlib import Path
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from config import load_config, load_schedule, save_schedule
+from config import (
+    load_config, load_site_config, load_schedule, save_schedule, append_schedule_journal,
+    get_fired_ledger_file, DEFAULT_ZONE_ID
+)
+from core.timeline import DayTimeline, MINUTES_PER_DAY
+from core.intervals import ActivityIndex, activity_spans
+from core.recurrence import RecurrenceRule, expand_day
+from core.punctuality import PunctualityStats
+from core.dispatch import TriggerDispatcher, DispatchJob
+from core.ledger import FiredLedger
+from core.program import PlaybackProgram, STEP_BELL, STEP_GAP, STEP_ANNOUNCEMENT, STEP_TTS
+
+# Sonraki etkinlik aranırken bakılacak gün sayısı (bugün hariç)
+NEXT_EVENT_LOOKAHEAD_DAYS = 7
+# Aynı anda tutulacak derlenmiş gün sayısı
+TIMELINE_CACHE_SIZE = 16
+# Hiçbir olay yokken en fazla bu kadar uyunur (saniye)
+MAX_IDLE_SLEEP = 1800
+# Bekleme en fazla bu kadar sürer, sonra duvar saati yeniden okunur (askıya alma / NTP sıçraması)
+CLOCK_CHECK_SECONDS = 60
+# Kaçırılan olaylar için geriye en fazla bu kadar bakılır (saniye)
+MAX_CATCHUP_SECONDS = 24 * 3600
+# Tetiklenme kayıtlarının tutulacağı gün sayısı (saat geri alınmasına karşı)
+FIRED_KEEP_DAYS = 2
+# Olay türüne göre varsayılan gecikme toleransı (saniye); None = her zaman çal
+DEFAULT_GRACE_SECONDS = {
+    "bell": 120,
+    "announcement": 60,
+    "music": None,
+}
+# Mola müziği bekleniyor ama başlatılamadıysa (ör. manuel player aktif) tekrar kontrol aralığı
+MUSIC_RECHECK_SECONDS = 5
+# Değişiklik günlüğü bu boyutu aşınca program tek dosyaya yeniden yazılır (bayt)
+JOURNAL_COMPACT_BYTES = 64 * 1024
+# Zil/anons sesleri olaydan bu kadar önce hazırlanır (dosya açılır, duraklatılmış player'a yüklenir)
+PREPARE_LEAD_SECONDS = 5
+
+
+class ScheduleSnapshot:
+    """
+    Yayınlandıktan sonra değiştirilmeyen program sürümü
+    Yazıcılar yeni bir kopya oluşturup referansı değiştirir; okuyucular kilit almaz
+    """
+
+    __slots__ = ("version", "days", "_by_day")
+
+    def __init__(self, days: list, version: int = 0):
+        self.version = version
+        self.days = days
+        self._by_day = {}
+        for day in days:
+            self._by_day.setdefault(day.get("dayOfWeek"), day)
+
+    def get_day(self, day_of_week: int) -> Optional[dict]:
+        return self._by_day.get(day_of_week)
 
 
 class SchedulerService:
@@ -25,27 +82,83 @@ class SchedulerService:
     - custom: Özel etkinlik
     """
     
-    def __init__(self):
+    def __init__(self, zone_id: str = DEFAULT_ZONE_ID, data_dir: Optional[Path] = None):
+        self.zone_id = zone_id
+        # Kiracı dizini (çok kiracılı kurulum); None ise uygulamanın veri dizini
+        self.data_dir = data_dir
+        # Çalışma durumu (mola müziği vb.); program yazımları bu kilidi kullanmaz
         self.lock = threading.Lock()
         self.running = False
         self.thread: Optional[threading.Thread] = None
+        # Paylaşımlı zamanlayıcı (ZoneManager); atanmışsa kendi thread'i açılmaz
+        self.timer = None
+        
+        # Olay güdümlü döngü: bir sonraki olaya kadar uyunur, program değişince erken uyanılır
+        self._wakeup = threading.Condition()
+        self._plan_changed = False
+        self.next_wakeup: Optional[datetime] = None
+        self.wakeup_count = 0
+        # Sesleri önceden hazırlanmış son olay anı
+        self._prepared_at: Optional[datetime] = None
+        
+        # Zil dakikliği istatistikleri (planlanan kenara göre tetiklenme sapması)
+        self.punctuality = PunctualityStats()
         
-        # Program
-        self.schedule = load_schedule()
+        # Zil/anons/müzik işleri ayrı bir işçi thread'inde sırayla çalar;
+        # zamanlayıcı thread'i ses bitene kadar bloklanmaz
+        dispatch_name = "Dispatch" if zone_id == DEFAULT_ZONE_ID else f"Dispatch:{zone_id}"
+        self.dispatcher = TriggerDispatcher(dispatch_name, clock=lambda: self._now())
+        self.dispatcher.on_started = self._on_job_started
+        
+        # Program (kayıtlı program + değişiklik günlüğü), değişmez anlık görüntü olarak
+        self.snapshot = ScheduleSnapshot(load_schedule(zone_id, data_dir=data_dir))
+        # Program yazıcılarının sırası; tick ve durum okuyucuları bu kilidi almaz
+        self._schedule_lock = threading.Lock()
+        # Günlüğe ekleme ve sıkıştırma sırası: yazıcılar _schedule_lock altında sıra numarası
+        # alır, diske kilidi bıraktıktan sonra bu sırayla yazar
+        self._persist_lock = threading.RLock()
+        self._persist_cond = threading.Condition(self._persist_lock)
+        self._persist_next = 0
+        self._persist_turn = 0
+        self._journal_dirty = False
+        # Tarih -> derlenmiş zaman çizelgesi (program değişince sıfırlanır)
+        self._timelines: Dict[date, DayTimeline] = {}
+        # Haftanın günü -> etkinlik çakışma dizini (etkinlik eklerken kullanılır)
+        self._activity_indexes: Dict[int, ActivityIndex] = {}
         
         # Durum
         self.current_state = "idle"  # idle, in_activity
         self.next_event: Optional[dict] = None
         
-        # Tetiklenen etkinlik takibi (dakika bazlı)
-        self.last_minute_str: Optional[str] = None
-        self.triggered_events_this_minute: set = set()
+        # Tick sırasında toplanan çalma programları: planlanan an -> program
+        self._programs: Dict[datetime, PlaybackProgram] = {}
+        
+        # Tetiklenen olay takibi: tarih -> olay anahtarları (saat geri alınsa da tekrar çalmaz)
+        self.fired_events: Dict[date, set] = {}
+        # En son işlenen dakika; uyanınca aradaki boşluktaki olaylar yeniden oynatılır
+        self._last_processed: Optional[datetime] = None
+        # Tetiklenme defteri (start ile açılır): yeniden başlatmada tekrar çalma / kaçırma olmasın
+        self.ledger: Optional[FiredLedger] = None
+        self.replayed_count = 0
+        self.missed_count = 0
+        self.missed_events: deque = deque(maxlen=50)
+        
+        # Yedek (standby) düğüm: olay çalmaz, çizelgeyi ve sesleri sıcak tutar (bkz. services/ha.py)
+        self.standby = False
+        
+        # Bilgi logları (simülasyonda kapatılır; hatalar her zaman yazılır)
+        self.verbose = True
+        # Başlangıç durumu kontrolünden önce diğer servisler için bekleme (saniye)
+        self.startup_delay = 1.0
+        
+        # Kaçırılan olaylar için tolerans (saniye)
+        self.grace_seconds: Dict[str, Optional[float]] = {}
+        self.reload_settings()
         
         self.background_music_playing = False
         self.in_activity = False
         self.current_activity: Optional[dict] = None  # Şu anki aktif etkinlik
         self.last_ended_activity: Optional[dict] = None  # Son biten etkinlik
-        self.announced_birthdays: set = set()  # Bugün anons edilen doğum günleri
         
         # Callback'ler
         self.on_bell: Optional[callable] = None
@@ -53,10 +166,17 @@ class SchedulerService:
         self.on_music_start: Optional[callable] = None
         self.on_music_stop: Optional[callable] = None
         self.is_manual_player_active: Optional[callable] = None  # Manuel player kontrolü
-        self.birthday_checker: Optional[callable] = None  # Doğum günü kontrolü
+        self.on_prepare: Optional[callable] = None  # (kanal, dosya) - yaklaşan ses önceden hazırlanır
+        self.on_fired: Optional[callable] = None  # (tarih, [olay anahtarları]) - sesler çalınmadan önce çağrılır
+        # Aynı dakikanın sesleri tek programda: [(tür, değer), ...]; yoksa adımlar on_bell/on_announcement ile çalınır
+        self.on_program: Optional[callable] = None
+        # Doğum günü listesi: tarih -> [("HH:MM", [isimler]), ...] (çizelgeye derlenir)
+        self.birthday_roster: Optional[callable] = None
         
-        # Tatil kontrolü
+        # Tatil kontrolü: tarih -> tatil mi (gün bazında önbellekli karar)
         self.holiday_checker: Optional[callable] = None
+        # Tarihe özel program: (tarih, haftalık gün, bölge) -> geçerli gün planı
+        self.day_resolver: Optional[callable] = None
     
     def start(self):
         """Zamanlayıcıyı başlatır"""
@@ -64,9 +184,18 @@ class SchedulerService:
             return
         
         self.running = True
-        self.thread = threading.Thread(target=self._loop, daemon=True)
-        self.thread.start()
-        print("[Scheduler] Başlatıldı")
+        self._plan_changed = False
+        # Kapalı kalınan süre defterdeki son işlenen dakikadan itibaren telafi edilir;
+        # HA devralmasıyla gelen daha yeni dakika korunur
+        self._open_ledger()
+        self.dispatcher.start()
+        if self.timer:
+            # Paylaşımlı zamanlayıcı bu bölgeyi de sürer
+            self.timer.start_timer(self)
+        else:
+            self.thread = threading.Thread(target=self._loop, daemon=True)
+            self.thread.start()
+        print(f"[Scheduler] Başlatıldı (bölge: {self.zone_id})")
         
         # Başlangıçta mevcut durumu kontrol et ve gerekirse müziği başlat
         self._check_initial_state()
@@ -75,200 +204,467 @@ class SchedulerService:
         """Zamanlayıcıyı durdurur"""
         self.running = False
         self.background_music_playing = False  # Durdurulduğunda müzik durumunu sıfırla
+        self.reschedule()  # Uyuyan döngüyü hemen uyandır
         if self.thread:
             self.thread.join(timeout=2)
-        print("[Scheduler] Durduruldu")
+        self.dispatcher.stop()
+        if self.ledger and self._last_processed and not self.standby:
+            try:
+                self.ledger.mark_processed(self._last_processed)
+            except Exception as e:
+                print(f"[Scheduler] Tetiklenme defteri yazılamadı: {e}")
+        if self._journal_dirty:
+            self.compact_schedule()
+        print(f"[Scheduler] Durduruldu (bölge: {self.zone_id})")
     
     def _loop(self):
-        """Ana zamanlayıcı döngüsü"""
+        """Ana zamanlayıcı döngüsü - bir sonraki olaya kadar uyur"""
         while self.running:
+            self.wakeup_count += 1
             try:
                 self._tick()
             except Exception as e:
                 print(f"[Scheduler] Hata: {e}")
             
-            time.sleep(1)
+            try:
+                deadline = self._next_deadline(datetime.now())
+            except Exception as e:
+                print(f"[Scheduler] Sonraki uyanma hesaplanamadı: {e}")
+                deadline = datetime.now() + timedelta(seconds=1)
+            
+            self._sleep_until(deadline)
+    
+    def _sleep_until(self, deadline: datetime):
+        """
+        Verilen duvar saati anına kadar veya program değişene kadar bekler.
+        Bekleme monotonic saatle yapılır; süre dolunca duvar saati yeniden okunur,
+        kenara henüz gelinmediyse (saat kayması) kalan süre kadar tekrar beklenir.
+        """
+        with self._wakeup:
+            self.next_wakeup = deadline
+            while self.running and not self._plan_changed:
+                remaining = (deadline - datetime.now()).total_seconds()
+                if remaining <= 0:
+                    break
+                # Duvar saati sıçramalarını yakalamak için parça parça bekle
+                target = time.monotonic() + min(remaining, CLOCK_CHECK_SECONDS)
+                while self.running and not self._plan_changed:
+                    left = target - time.monotonic()
+                    if left <= 0:
+                        break
+                    self._wakeup.wait(left)
+            self._plan_changed = False
+    
+    def reschedule(self):
+        """Plan değiştiğinde uyuyan döngüyü erken uyandırır"""
+        with self._wakeup:
+            self._plan_changed = True
+            self._wakeup.notify_all()
+        if self.timer:
+            self.timer.reschedule(self)
+    
+    def _next_deadline(self, now: datetime) -> datetime:
+        """
+        Bir sonraki uyanma anını hesaplar:
+        sonraki olay dakikası (doğum günü anonsları dahil), gece yarısı veya üst sınır
+        """
+        today = now.date()
+        minute = now.hour * 60 + now.minute
+        day_start = datetime.combine(today, datetime.min.time())
+        
+        candidates = [
+            day_start + timedelta(days=1),  # Gün dönümü
+            now + timedelta(seconds=MAX_IDLE_SLEEP),
+        ]
+        
+        timeline = self._get_timeline(today)
+        if timeline.enabled and not self._is_holiday(today):
+            event = timeline.next_event_after(minute)
+            if event:
+                event_at = day_start + timedelta(minutes=event.minute)
+                prepare_at = event_at - timedelta(seconds=PREPARE_LEAD_SECONDS)
+                # Sesler hazırlanacaksa önce hazırlık anında uyan
+                if self.on_prepare and self._prepared_at != event_at and prepare_at > now:
+                    candidates.append(prepare_at)
+                else:
+                    candidates.append(event_at)
+            
+            # Molada müzik bekleniyor ama çalmıyorsa kısa aralıklarla yeniden dene
+            if (self.on_music_start and not self.background_music_playing
+                    and timeline.activity_at(minute) is None
+                    and self.last_ended_activity and self.last_ended_activity.get("playMusic", False)):
+                candidates.append(now + timedelta(seconds=MUSIC_RECHECK_SECONDS))
+        
+        return min(candidates)
     
     def _tick(self):
-        """Her saniye çalışır"""
-        now = datetime.now()
-        current_time = now.strftime("%H:%M")
-        day_of_week = now.weekday()
+        """Her uyanmada çalışır (olay dakikası, gün dönümü veya plan değişikliği)"""
+        now = self._now()
+        current = now.replace(second=0, microsecond=0)
         
-        # Dakika değiştiyse tetiklenen etkinlikleri temizle
-        now_minute_str = now.strftime("%Y%m%d_%H%M")
-        if self.last_minute_str != now_minute_str:
-            self.last_minute_str = now_minute_str
-            self.triggered_events_this_minute.clear()
+        if self.standby:
+            self._standby_tick(now)
+            return
         
-        # Bugünün programını al
-        today_schedule = self._get_day_schedule(day_of_week)
+        # İşlenecek aralık: (since, current]. Geçerli dakika her zaman dahil edilir;
+        # aynı olayın iki kez çalması tarih bazlı tetiklenme kaydı ile engellenir.
+        last = self._last_processed
+        since = current - timedelta(minutes=1)
+        if last is not None:
+            if current < last:
+                self._log(f"Saat geri alındı ({last:%d.%m %H:%M} -> {current:%d.%m %H:%M}), "
+                          f"çalınmış olaylar tekrarlanmayacak")
+            elif last < since:
+                since = max(last, current - timedelta(seconds=MAX_CATCHUP_SECONDS))
+                self._log(f"{last:%H:%M} - {current:%H:%M} arası kaçırılan olaylar kontrol ediliyor")
         
-        if not today_schedule or not today_schedule.get("enabled", True):
+        self._prune_fired(current.date())
+        
+        # Aralıktaki olayları tarih sırasıyla işle
+        music_should_start = False
+        day = since.date()
+        while day <= current.date():
+            timeline = self._get_timeline(day)
+            if timeline.enabled and not self._is_holiday(day):
+                lo = since.hour * 60 + since.minute if day == since.date() else -1
+                hi = current.hour * 60 + current.minute if day == current.date() else MINUTES_PER_DAY - 1
+                if self._process_events(day, timeline.events_between(lo, hi), now):
+                    music_should_start = True
+            day += timedelta(days=1)
+        
+        self._last_processed = current
+        minute = current.hour * 60 + current.minute
+        
+        # Bugünün derlenmiş zaman çizelgesini al
+        timeline = self._get_timeline(now.date())
+        
+        if not timeline.enabled:
             self._update_next_event(None)
             self._stop_background_music()
             return
         
         # Tatil kontrolü
-        if self.holiday_checker and self.holiday_checker():
+        if self._is_holiday(now.date()):
             self._update_next_event(None)
             self._stop_background_music()
             return
         
-        # Etkinlikleri kontrol et
-        activities = today_schedule.get("activities", [])
-        
-        # Toplanan olay listeleri (aynı dakikadaki olayların önceliğe göre işlenmesi için)
-        start_events: list = []
-        end_events: list = []
-        interim_events: list = []
-        # Müzik başlatma kararı, eğer herhangi bir biten etkinlik playMusic=true ise True olur
-        music_should_start = False
-
-        for activity in activities:
-            activity_id = activity.get("id", "")
-
-            # Başlangıç zamanı
-            start_time = activity.get("startTime", "")
-            if start_time == current_time:
-                event_key = f"{activity_id}_start"
-                if event_key not in self.triggered_events_this_minute:
-                    self.triggered_events_this_minute.add(event_key)
-                    start_events.append(activity)
-
-            # Bitiş zamanı
-            end_time = activity.get("endTime", "")
-            if end_time == current_time:
-                event_key = f"{activity_id}_end"
-                if event_key not in self.triggered_events_this_minute:
-                    self.triggered_events_this_minute.add(event_key)
-                    end_events.append(activity)
-                    # Eğer bu etkinlik müzik istiyorsa, tick sonunda müzik başlatılmalı
-                    if activity.get("playMusic", False):
-                        music_should_start = True
-
-            # Ara anonslar
-            # Önce 'announcements' (yeni format), yoksa 'interimAnnouncements' (eski format)
-            anns = activity.get("announcements") or activity.get("interimAnnouncements", [])
-            for interim in anns:
-                # enabled varsayılan True olsun
-                if interim.get("enabled", True) and interim.get("time") == current_time:
-                    sound_id = interim.get("soundId", "")
-                    # Benzersiz anahtar oluştur
-                    interim_key = f"{activity_id}_interim_{sound_id}_{interim.get('time')}"
-
-                    if interim_key not in self.triggered_events_this_minute:
-                        self.triggered_events_this_minute.add(interim_key)
-                        interim_events.append(interim)
-
-        # Doğum günü kontrolü - önce adları topla ama hemen çağırma (öncelik daha sonra)
-        birthday_names = []
-        if self.birthday_checker:
-            names = self.birthday_checker()
-            if names:
-                birthday_names.extend(names)
-
-        # Olayları öncelik sırasına göre işle
-        # 1) Etkinlik duyuruları (başlangıç, ardından bitiş)
-        for act in start_events:
+        # Müzik başlatma (eğer gerekiyorsa) - zil ve anonslardan sonra
+        if music_should_start:
             try:
-                self._trigger_activity_start(act)
+                self._start_background_music()
             except Exception as e:
-                print(f"[Scheduler] Etkinlik başlangıç hatası: {e}")
-
-        for act in end_events:
+                print(f"[Scheduler] Müzik başlatma hatası (tick sonu): {e}")
+        
+        # Sonraki etkinliği güncelle
+        self._update_next_event(self._find_next_event(now))
+        
+        # Yaklaşan olayın seslerini önceden hazırla
+        self._prepare_upcoming(timeline, now)
+        
+        # Etkinlik içinde mi kontrol et ve müzik durumunu yönet
+        self._manage_background_music(timeline, minute)
+    
+    def _process_events(self, day: date, events: list, now: datetime) -> bool:
+        """
+        Bir günün vadesi gelmiş olaylarını öncelik sırasıyla işler.
+        Tolerans dışında kalan olayların sesi çalınmaz ama durum geçişleri uygulanır.
+        Mola müziği başlatılması gerekiyorsa True döner.
+        """
+        fired = self.fired_events.setdefault(day, set())
+        day_start = datetime.combine(day, datetime.min.time())
+        music_should_start = False
+        
+        new_events = [event for event in events if event.key not in fired]
+        if not new_events:
+            return False
+        fired.update(event.key for event in new_events)
+        if self.ledger:
             try:
-                self._trigger_activity_end(act)
+                self.ledger.record(day, [(event.key, event.kind) for event in new_events], now)
             except Exception as e:
-                print(f"[Scheduler] Etkinlik bitiş hatası: {e}")
-
-        # 2) Etkinlik içindeki ara duyurular
-        for interim in interim_events:
+                print(f"[Scheduler] Tetiklenme defteri yazılamadı: {e}")
+        # Tetiklenme kaydı ses çalınmadan önce paylaşılır (devralan düğüm tekrar çalmasın)
+        if self.on_fired:
             try:
-                self._trigger_interim(interim)
+                self.on_fired(day, [event.key for event in new_events])
             except Exception as e:
-                print(f"[Scheduler] Ara anons hatası: {e}")
-
-        # 3) Doğum günü anonsları
-        for name in birthday_names:
+                print(f"[Scheduler] Tetiklenme kaydı paylaşılamadı: {e}")
+        
+        for event in new_events:
+            scheduled = day_start + timedelta(minutes=event.minute)
+            late = scheduled < now.replace(second=0, microsecond=0)
+            if late:
+                self.replayed_count += 1
+            
             try:
-                self._trigger_birthday(name)
+                if event.kind == "start":
+                    self._trigger_activity_start(event.activity, scheduled)
+                elif event.kind == "end":
+                    self._trigger_activity_end(event.activity, scheduled)
+                    # Eğer bu etkinlik müzik istiyorsa, olaylardan sonra müzik başlatılmalı
+                    if event.activity.get("playMusic", False) and self._within_grace("music", scheduled, now):
+                        music_should_start = True
+                elif event.kind == "interim":
+                    self._trigger_interim(event.payload, scheduled)
+                elif event.kind == "birthday":
+                    self._trigger_birthday(event.payload["name"], scheduled)
             except Exception as e:
-                print(f"[Scheduler] Doğum günü anons hatası: {e}")
-
-        # 4) Müzik başlatma (eğer gerekiyorsa)
-        if music_should_start:
+                print(f"[Scheduler] Olay hatası ({event.key}): {e}")
+        
+        # Aynı dakikanın sesleri tek iş olarak kuyruğa girer
+        self._submit_programs()
+        return music_should_start
+    
+    def _standby_tick(self, now: datetime):
+        """
+        Yedek düğüm tick'i: olay çalınmaz ve tetiklenmiş sayılmaz, işlenen dakika ilerletilmez.
+        Çizelge derlenir, sonraki etkinlik güncellenir ve sesler önceden hazırlanır.
+        """
+        timeline = self._get_timeline(now.date())
+        if not timeline.enabled or self._is_holiday(now.date()):
+            self._update_next_event(None)
+            return
+        self._update_next_event(self._find_next_event(now))
+        self._prepare_upcoming(timeline, now)
+    
+    def set_standby(self, standby: bool):
+        """Yedek moduna geçer veya çıkar (lider değişiminde HA servisi çağırır)"""
+        if standby == self.standby:
+            return
+        self.standby = standby
+        if standby:
+            self._stop_background_music()
+        self.reschedule()
+    
+    def take_over(self, processed: Optional[datetime], fired: Dict[date, set]):
+        """
+        Yedekten lidere geçiş: önceki liderin işlediği son dakika ve tetiklediği olaylar devralınır.
+        Aradaki olaylar normal telafi kurallarıyla (tolerans içindeyse) çalınır.
+        """
+        for day, keys in fired.items():
+            self.fired_events.setdefault(day, set()).update(keys)
+        if processed is not None:
+            self._last_processed = processed
+        self.standby = False
+        self.reschedule()
+    
+    def _prepare_upcoming(self, timeline: DayTimeline, now: datetime):
+        """Olay anına PREPARE_LEAD_SECONDS kaldıysa seslerini ses motoruna önceden bildirir"""
+        if not self.on_prepare:
+            return
+        event = timeline.next_event_after(now.hour * 60 + now.minute)
+        if not event:
+            return
+        event_at = datetime.combine(now.date(), datetime.min.time()) + timedelta(minutes=event.minute)
+        if event_at == self._prepared_at or (event_at - now).total_seconds() > PREPARE_LEAD_SECONDS:
+            return
+        
+        self._prepared_at = event_at
+        for upcoming in timeline.events_at(event.minute):
+            for channel, filename in self._event_sounds(upcoming):
+                try:
+                    self.on_prepare(channel, filename)
+                except Exception as e:
+                    print(f"[Scheduler] Ses hazırlama hatası ({filename}): {e}")
+    
+    def _event_sounds(self, event) -> List[tuple]:
+        """Olayın çalacağı (kanal, dosya) listesi (doğum günü TTS'i hariç)"""
+        if event.kind == "start":
+            sounds = [("bell", event.activity.get("startSoundId")),
+                      ("announcement", event.activity.get("startAnnouncementId"))]
+        elif event.kind == "end":
+            sounds = [("bell", event.activity.get("endSoundId")),
+                      ("announcement", event.activity.get("endAnnouncementId"))]
+        elif event.kind == "interim":
+            sounds = [("announcement", event.payload.get("soundId"))]
+        else:
+            sounds = []
+        return [(channel, filename) for channel, filename in sounds if filename]
+    
+    def _prune_fired(self, today: date):
+        """Eski günlerin tetiklenme kayıtlarını atar"""
+        expired = [d for d in self.fired_events if (today - d).days > FIRED_KEEP_DAYS]
+        for day in expired:
+            del self.fired_events[day]
+        if expired and self.ledger:
             try:
-                self._start_background_music()
+                self.ledger.prune(today - timedelta(days=FIRED_KEEP_DAYS))
             except Exception as e:
-                print(f"[Scheduler] Müzik başlatma hatası (tick sonu): {e}")
+                print(f"[Scheduler] Tetiklenme defteri temizlenemedi: {e}")
+    
+    def _open_ledger(self):
+        """Tetiklenme defterini açar; kayıtlı olaylar ve son işlenen dakika yüklenir"""
+        if self.ledger is None:
+            self.ledger = FiredLedger(get_fired_ledger_file(self.zone_id, self.data_dir))
+        try:
+            fired, processed = self.ledger.load(self._now().date() - timedelta(days=FIRED_KEEP_DAYS))
+        except Exception as e:
+            print(f"[Scheduler] Tetiklenme defteri okunamadı: {e}")
+            return
+        for day, keys in fired.items():
+            self.fired_events.setdefault(day, set()).update(keys)
+        if processed is not None and processed <= self._now() and (
+                self._last_processed is None or processed > self._last_processed):
+            self._last_processed = processed
+            self._log(f"Son işlenen dakika defterden yüklendi: {processed:%d.%m %H:%M}")
+    
+    def reload_settings(self):
+        """Zamanlayıcı ayarlarını (kaçırılan olay toleransları) config'den yükler"""
+        grace = dict(DEFAULT_GRACE_SECONDS)
+        config = load_site_config(self.data_dir) if self.data_dir else load_config()
+        grace.update(config.get("scheduler", {}).get("grace_seconds", {}))
+        self.grace_seconds = grace
         
-        # Doğum günü kontrolü
-        if self.birthday_checker:
-            birthday_names = self.birthday_checker()
-            if birthday_names:
-                # Her kişi için ayrı anons yap
-                for name in birthday_names:
-                    birthday_key = f"birthday_{name}_{now.strftime('%Y%m%d_%H%M')}"
-                    # Bu kişi bu saat için daha önce anons edilmemiş mi kontrol et
-                    if birthday_key not in self.announced_birthdays:
-                        self.announced_birthdays.add(birthday_key)
-                        self._trigger_birthday(name)
-                        
-                # Gün değiştiğinde seti temizle
-                if now.strftime('%H:%M') == '00:00':
-                    self.announced_birthdays.clear()
+        # Kuyruk son geçerlilik süreleri de aynı toleranslardan gelir
+        self.dispatcher.max_delay.update({
+            "start": grace.get("bell"),
+            "end": grace.get("bell"),
+            "interim": grace.get("announcement"),
+            "birthday": grace.get("announcement"),
+            "music": grace.get("music"),
+        })
+    
+    def _within_grace(self, kind: str, scheduled: datetime, now: Optional[datetime] = None) -> bool:
+        """Olay türü için gecikme toleransı aşılmamış mı"""
+        grace = self.grace_seconds.get(kind)
+        if grace is None:
+            return True
+        now = now or self._now()
+        return (now - scheduled).total_seconds() <= grace
+    
+    def _record_missed(self, name: str, kind: str, scheduled: datetime):
+        """Tolerans dışında kaldığı için çalınmayan olayı raporlar"""
+        lateness = (self._now() - scheduled).total_seconds()
+        self.missed_count += 1
+        self.missed_events.append({
+            "name": name,
+            "kind": kind,
+            "scheduled": scheduled.strftime("%Y-%m-%d %H:%M:%S"),
+            "late_seconds": round(lateness, 2)
+        })
+        self._log(f"Tolerans aşıldı, çalınmadı: {name} ({lateness:.0f} sn gecikme)")
+    
+    def _now(self) -> datetime:
+        """Zamanlayıcının kullandığı saat"""
+        return datetime.now()
+    
+    def _pause(self, seconds: float):
+        """Ardışık sesler arasında bekler"""
+        time.sleep(seconds)
+    
+    def _log(self, message: str):
+        """Bilgi logu"""
+        if self.verbose:
+            print(f"[Scheduler] {message}")
+    
+    def _on_job_started(self, job: DispatchJob):
+        """Kuyruktaki iş çalmaya başladığında dakiklik kaydı tutar"""
+        if job.kind != "music":
+            self._record_firing(job.kind, job.scheduled)
+    
+    def _record_firing(self, kind: str, scheduled: datetime):
+        """Olayın planlanan andan ne kadar sapmayla tetiklendiğini kaydeder"""
+        offset = (self._now() - scheduled).total_seconds()
+        self.punctuality.record(scheduled.date(), kind, offset)
+    
+    def _program_for(self, name: str, kind: str, scheduled: datetime) -> PlaybackProgram:
+        """Planlanan anın çalma programı (aynı dakikadaki olaylar birleşir)"""
+        program = self._programs.get(scheduled)
+        if program is None:
+            program = self._programs[scheduled] = PlaybackProgram(name, kind, scheduled)
+        return program
+    
+    def _submit_programs(self):
+        """Toplanan programları planlanan an sırasıyla kuyruğa ekler"""
+        programs, self._programs = self._programs, {}
+        for scheduled in sorted(programs):
+            program = programs[scheduled]
+            if program:
+                self.dispatcher.submit(program.name, program.kind,
+                                       lambda p=program: self._run_program(p), scheduled)
+    
+    def _run_program(self, program: PlaybackProgram):
+        """Programı çalar (tetikleme kuyruğunda çalışır)"""
+        # Kuyrukta beklerken bayatlayan anonslar çalınmaz
+        if not self._within_grace("announcement", program.scheduled):
+            if program.drop_announcements():
+                self._record_missed(f"{program.name} anonsu", "announcement", program.scheduled)
+        steps = program.steps()
+        if not steps:
+            return
         
-        # Sonraki etkinliği güncelle
-        self._update_next_event(self._find_next_event(activities, current_time))
+        if self.on_program:
+            # TTS adımları çalmadan hemen önce dosyaya çevrilir
+            resolved = []
+            for kind, value in steps:
+                if kind == STEP_TTS:
+                    filepath = self._render_birthday(value)
+                    if filepath:
+                        resolved.append((STEP_ANNOUNCEMENT, filepath))
+                else:
+                    resolved.append((kind, value))
+            self.on_program(resolved)
+            return
         
-        # Etkinlik içinde mi kontrol et ve müzik durumunu yönet
-        self._manage_background_music(activities, current_time)
+        for kind, value in steps:
+            if kind == STEP_BELL and self.on_bell:
+                self.on_bell(value)
+            elif kind == STEP_GAP:
+                self._pause(value)
+            elif kind == STEP_ANNOUNCEMENT and self.on_announcement:
+                self.on_announcement(value)
+            elif kind == STEP_TTS:
+                self._play_birthday(value)
     
-    def _trigger_activity_start(self, activity: dict):
-        """Etkinlik başlangıcını tetikler"""
-        print(f"[Scheduler] Etkinlik başladı: {activity.get('name', 'Bilinmeyen')}")
+    def _dispatch_bell_and_announcement(self, name: str, kind: str, bell_id: Optional[str],
+                                        announcement_id: Optional[str], scheduled: Optional[datetime]):
+        """Tolerans içindeki zil/anonsu dakikanın programına ekler, geç kalanları raporlar"""
+        scheduled = scheduled or self._now()
+        if not (bell_id and (self.on_bell or self.on_program)):
+            bell_id = None
+        if not (announcement_id and (self.on_announcement or self.on_program)):
+            announcement_id = None
+        
+        if bell_id and not self._within_grace("bell", scheduled):
+            self._record_missed(f"{name} zili", "bell", scheduled)
+            bell_id = None
+        if announcement_id and not self._within_grace("announcement", scheduled):
+            self._record_missed(f"{name} anonsu", "announcement", scheduled)
+            announcement_id = None
+        
+        if not (bell_id or announcement_id):
+            return
+        program = self._program_for(name, kind, scheduled)
+        program.add_bell(bell_id)
+        program.add_announcement(announcement_id)
+    
+    def _trigger_activity_start(self, activity: dict, scheduled: Optional[datetime] = None):
+        """Etkinlik başlangıcını tetikler (ses işleri kuyruğa gider)"""
+        self._log(f"Etkinlik başladı: {activity.get('name', 'Bilinmeyen')}")
         
         # Etkinlik içine girdik - müziği durdur (etkinlik sırasında çalışma var, müzik yok)
         self.in_activity = True
         self.current_activity = activity  # Aktif etkinliği sakla
         self._stop_background_music()
         
-        # Başlangıç zili
-        bell_id = activity.get("startSoundId")
-        bell_played = False
-        if bell_id and self.on_bell:
-            self.on_bell(bell_id)
-            bell_played = True
-        
-        # Başlangıç anonsu
-        announcement_id = activity.get("startAnnouncementId")
-        if announcement_id and self.on_announcement:
-            # Zil çaldıysa 2 saniye bekle
-            if bell_played:
-                time.sleep(2)
-            self.on_announcement(announcement_id)
+        # Başlangıç zili ve anonsu
+        self._dispatch_bell_and_announcement(
+            f"{activity.get('name', 'Bilinmeyen')} başlangıç", "start",
+            activity.get("startSoundId"), activity.get("startAnnouncementId"), scheduled
+        )
         
         self.current_state = "in_activity"
     
-    def _trigger_activity_end(self, activity: dict):
-        """Etkinlik bitişini tetikler"""
-        print(f"[Scheduler] Etkinlik bitti: {activity.get('name', 'Bilinmeyen')}")
-        
-        # Bitiş zili
-        bell_id = activity.get("endSoundId")
-        bell_played = False
-        if bell_id and self.on_bell:
-            self.on_bell(bell_id)
-            bell_played = True
-        
-        # Bitiş anonsu
-        announcement_id = activity.get("endAnnouncementId")
-        if announcement_id and self.on_announcement:
-            # Zil çaldıysa 2 saniye bekle
-            if bell_played:
-                time.sleep(2)
-            self.on_announcement(announcement_id)
+    def _trigger_activity_end(self, activity: dict, scheduled: Optional[datetime] = None):
+        """Etkinlik bitişini tetikler (ses işleri kuyruğa gider)"""
+        self._log(f"Etkinlik bitti: {activity.get('name', 'Bilinmeyen')}")
+        
+        # Bitiş zili ve anonsu
+        self._dispatch_bell_and_announcement(
+            f"{activity.get('name', 'Bilinmeyen')} bitiş", "end",
+            activity.get("endSoundId"), activity.get("endAnnouncementId"), scheduled
+        )
         
         # Etkinlik bitti - müzik başlatma kararı tick içinde değerlendirilecek
         self.in_activity = False
@@ -278,22 +674,32 @@ class SchedulerService:
         
         # Müzik başlatma kararı artık _tick içinde toplanıp sıralamaya göre yapılacak
         if activity.get("playMusic", False):
-            print(f"[Scheduler] Etkinlik sonrası müzik işaretlendi (playMusic=true) - tick sonunda işlenecek")
+            self._log(f"Etkinlik sonrası müzik işaretlendi (playMusic=true) - tick sonunda işlenecek")
         else:
-            print(f"[Scheduler] Etkinlik sonrası müzik başlatılmıyor (playMusic=false)")
+            self._log(f"Etkinlik sonrası müzik başlatılmıyor (playMusic=false)")
     
-    def _trigger_interim(self, interim: dict):
+    def _trigger_interim(self, interim: dict, scheduled: Optional[datetime] = None):
         """Ara anonsu tetikler"""
-        print(f"[Scheduler] Ara anons çalıyor")
+        self._log(f"Ara anons çalıyor")
         sound_id = interim.get("soundId")
-        if sound_id and self.on_announcement:
-            self.on_announcement(sound_id)
+        scheduled = scheduled or self._now()
+        if sound_id and (self.on_announcement or self.on_program):
+            if not self._within_grace("announcement", scheduled):
+                self._record_missed(f"Ara anons {sound_id}", "announcement", scheduled)
+                return
+            self._program_for(f"Ara anons {sound_id}", "interim", scheduled).add_announcement(sound_id)
     
-    def _trigger_birthday(self, name: str):
-        """Doğum günü anonsu tetikler"""
-        print(f"[Scheduler] Doğum günü anonsu: {name}")
-        
-        # TTS ile doğum günü anonsu oluştur
+    def _trigger_birthday(self, name: str, scheduled: Optional[datetime] = None):
+        """Doğum günü anonsu tetikler (TTS üretimi de kuyrukta yapılır)"""
+        self._log(f"Doğum günü anonsu: {name}")
+        scheduled = scheduled or self._now()
+        if not self._within_grace("announcement", scheduled):
+            self._record_missed(f"Doğum günü {name}", "announcement", scheduled)
+            return
+        self._program_for(f"Doğum günü {name}", "birthday", scheduled).add_tts(name)
+    
+    def _render_birthday(self, name: str) -> Optional[str]:
+        """Doğum günü anonsunu TTS ile dosyaya üretir"""
         try:
             from core.tts_engine import tts_engine
             from services.birthdays import birthday_service
@@ -302,14 +708,18 @@ class SchedulerService:
             template = birthday_service.get_announcement_text(name)
             
             # TTS dosyası oluştur
-            filepath = tts_engine.generate(template, f"birthday_{name.replace(' ', '_')}.mp3")
-            
-            if filepath and self.on_announcement:
-                self.on_announcement(filepath)
+            return tts_engine.generate(template, f"birthday_{name.replace(' ', '_')}.mp3")
         except Exception as e:
             print(f"[Scheduler] Doğum günü anonsu hatası: {e}")
+            return None
+    
+    def _play_birthday(self, name: str):
+        """Doğum günü anonsunu üretip çalar"""
+        filepath = self._render_birthday(name)
+        if filepath and self.on_announcement:
+            self.on_announcement(filepath)
     
-    def _manage_background_music(self, activities: list, current_time: str):
+    def _manage_background_music(self, timeline: DayTimeline, minute: int):
         """Arka plan müziğini yönetir - etkinlik sonrası molada çalar"""
         with self.lock:
             # Manuel player aktifse dokunma
@@ -317,17 +727,8 @@ class SchedulerService:
                 return
             
             # Herhangi bir etkinlik içinde miyiz?
-            in_any_activity = False
-            active_activity = None
-            
-            for activity in activities:
-                start = activity.get("startTime", "")
-                end = activity.get("endTime", "")
-                
-                if start <= current_time < end:
-                    in_any_activity = True
-                    active_activity = activity
-                    break
+            active_activity = timeline.activity_at(minute)
+            in_any_activity = active_activity is not None
             
             # Etkinlik içindeyse müziği durdur
             if in_any_activity:
@@ -335,21 +736,15 @@ class SchedulerService:
                     self._stop_background_music()
             else:
                 # Etkinlik dışında (mola) - en son biten etkinliği bul
-                # Yeni etkinliğe girildiyse last_ended_activity güncelle
-                if active_activity and self.current_activity != active_activity:
-                    self.last_ended_activity = active_activity
-                elif not active_activity and not self.last_ended_activity:
+                if not self.last_ended_activity:
                     # Hiç etkinlik bitmediyse, şu anki zamandan önce biten son etkinliği bul
-                    for activity in sorted(activities, key=lambda x: x.get("endTime", ""), reverse=True):
-                        if activity.get("endTime", "") <= current_time:
-                            self.last_ended_activity = activity
-                            break
+                    self.last_ended_activity = timeline.last_ended_at(minute)
                 
                 # Son biten etkinliğin playMusic ayarını kontrol et
                 if self.last_ended_activity and self.last_ended_activity.get("playMusic", False):
                     # playMusic=true ise müzik çalmalı
                     if not self.background_music_playing:
-                        print("[Scheduler] Mola sırasında müzik başlatılıyor (son etkinlik playMusic=true)")
+                        self._log("Mola sırasında müzik başlatılıyor (son etkinlik playMusic=true)")
                         self._start_background_music()
                 else:
                     # playMusic=false veya hiç etkinlik bitmediyse müzik çalmamalı
@@ -357,7 +752,7 @@ class SchedulerService:
                         self._stop_background_music()
     
     def _start_background_music(self):
-        """Arka plan müziğini başlatır (lock için _manage_background_music içinde çağrılmalı)"""
+        """Arka plan müziğini başlatır (kuyrukta bekleyen zil/anonslardan sonra)"""
         if self.background_music_playing:
             return
         
@@ -365,179 +760,436 @@ class SchedulerService:
         if self.is_manual_player_active and self.is_manual_player_active():
             return
         
-        print("[Scheduler] Arka plan müziği başlatılıyor")
+        if not self.on_music_start:
+            return
+        
+        self._log("Arka plan müziği başlatılıyor")
+        self.background_music_playing = True
+        self.dispatcher.submit("Mola müziği başlat", "music", self._run_music_start)
+    
+    def _run_music_start(self):
         try:
-            if self.on_music_start:
-                self.on_music_start()
-                self.background_music_playing = True
+            self.on_music_start()
         except Exception as e:
+            self.background_music_playing = False
             print(f"[Scheduler] Müzik başlatma hatası: {e}")
     
     def _stop_background_music(self):
-        """Arka plan müziğini durdurur (lock için _manage_background_music içinde çağrılmalı)"""
+        """Arka plan müziğini durdurur (kuyruk sırasına uyarak)"""
         if not self.background_music_playing:
             return
         
-        print("[Scheduler] Arka plan müziği durduruluyor")
+        if not self.on_music_stop:
+            return
+        
+        self._log("Arka plan müziği durduruluyor")
+        self.background_music_playing = False
+        self.dispatcher.submit("Mola müziği durdur", "music", self._run_music_stop)
+    
+    def _run_music_stop(self):
         try:
-            if self.on_music_stop:
-                self.on_music_stop()
-                self.background_music_playing = False
+            self.on_music_stop()
         except Exception as e:
             print(f"[Scheduler] Müzik durdurma hatası: {e}")
     
-    def _find_next_event(self, activities: list, current_time: str) -> Optional[dict]:
-        """Sonraki etkinliği bulur"""
-        next_event = None
-        next_time = None
+    def _find_next_event(self, now: datetime) -> Optional[dict]:
+        """Sonraki etkinliği bulur (gerekirse sonraki günlere bakar)"""
+        minute = now.hour * 60 + now.minute
+        today = now.date()
         
-        for activity in activities:
-            for time_key in ["startTime", "endTime"]:
-                event_time = activity.get(time_key, "")
-                
-                if event_time > current_time:
-                    if next_time is None or event_time < next_time:
-                        next_time = event_time
-                        next_event = {
-                            "time": event_time,
-                            "name": activity.get("name", ""),
-                            "type": "start" if time_key == "startTime" else "end"
-                        }
+        for offset in range(NEXT_EVENT_LOOKAHEAD_DAYS + 1):
+            day = today + timedelta(days=offset)
+            timeline = self._get_timeline(day)
+            if not timeline.enabled or (offset and self._is_holiday(day)):
+                continue
+            
+            event = timeline.next_edge_after(minute if offset == 0 else -1)
+            if event:
+                next_event = {
+                    "time": event.time,
+                    "name": event.activity.get("name", ""),
+                    "type": event.kind
+                }
+                if offset:
+                    next_event["date"] = day.isoformat()
+                    next_event["days_ahead"] = offset
+                return next_event
         
-        return next_event
+        return None
+    
+    def _is_holiday(self, day: date) -> bool:
+        """Verilen gün tatil nedeniyle sessiz mi"""
+        if not self.holiday_checker:
+            return False
+        try:
+            return bool(self.holiday_checker(day))
+        except Exception as e:
+            print(f"[Scheduler] Tatil kontrolü hatası: {e}")
+            return False
     
     def _update_next_event(self, event: Optional[dict]):
         """Sonraki etkinliği günceller"""
-        with self.lock:
-            self.next_event = event
+        self.next_event = event
     
     def _get_day_schedule(self, day_of_week: int) -> Optional[dict]:
         """Belirli günün programını döndürür"""
-        for day in self.schedule:
-            if day.get("dayOfWeek") == day_of_week:
-                return day
-        return None
+        return self.snapshot.get_day(day_of_week)
+    
+    def _get_timeline(self, day: date) -> DayTimeline:
+        """Verilen tarihin derlenmiş zaman çizelgesini döndürür (cache'li)"""
+        timelines = self._timelines
+        timeline = timelines.get(day)
+        if timeline is None:
+            # Tekrar kuralları sadece derlenen gün için açılır
+            timeline = DayTimeline(expand_day(self.get_effective_day(day), day), self._get_birthdays(day))
+            # Eski günleri at, cache küçük kalsın
+            if len(timelines) >= TIMELINE_CACHE_SIZE:
+                timelines.clear()
+            timelines[day] = timeline
+        return timeline
+    
+    def get_effective_day(self, day: date) -> Optional[dict]:
+        """Haftalık planı tarihe özel kayıtlarla birleştirir (gün başına bir kez derlenir)"""
+        weekly_day = self._get_day_schedule(day.weekday())
+        if not self.day_resolver:
+            return weekly_day
+        try:
+            return self.day_resolver(day, weekly_day, self.zone_id)
+        except Exception as e:
+            print(f"[Scheduler] Tarihe özel program alınamadı: {e}")
+            return weekly_day
+    
+    def _get_birthdays(self, day: date) -> list:
+        """Günün doğum günü anons listesini alır"""
+        if not self.birthday_roster:
+            return []
+        try:
+            return self.birthday_roster(day) or []
+        except Exception as e:
+            print(f"[Scheduler] Doğum günü listesi alınamadı: {e}")
+            return []
+    
+    def invalidate_timelines(self):
+        """Program, tarihe özel kayıt veya doğum günü verisi değiştiğinde derlenmiş çizelgeleri geçersiz kılar"""
+        self._timelines = {}
+        self.reschedule()
+    
+    @property
+    def schedule(self) -> list:
+        """Yayınlanmış programın günleri (değiştirilmemeli)"""
+        return self.snapshot.days
+    
+    @property
+    def schedule_version(self) -> int:
+        return self.snapshot.version
     
     def get_schedule(self) -> list:
         """Tam programı döndürür"""
-        return self.schedule
+        return self.snapshot.days
     
-    def update_schedule(self, new_schedule: list):
-        """Programı günceller"""
-        with self.lock:
-            self.schedule = new_schedule
-            save_schedule(new_schedule)
+    def _publish(self, days: list, changed_day: Optional[int] = None) -> ScheduleSnapshot:
+        """
+        Yeni program sürümünü tek referans atamasıyla yayınlar (_schedule_lock altında)
+        changed_day verilirse sadece o günün çakışma dizini atılır
+        """
+        snapshot = ScheduleSnapshot(days, self.snapshot.version + 1)
+        self.snapshot = snapshot
+        if changed_day is None:
+            self._activity_indexes = {}
+        else:
+            self._activity_indexes.pop(changed_day, None)
+        self.invalidate_timelines()
+        return snapshot
+    
+    def _replace_day(self, day_of_week: int, day_data: dict) -> list:
+        """Verilen günü değiştirilmiş yeni gün listesi (eski liste değişmez)"""
+        days = list(self.snapshot.days)
+        for i, day in enumerate(days):
+            if day.get("dayOfWeek") == day_of_week:
+                days[i] = day_data
+                break
+        else:
+            days.append(day_data)
+        return days
+    
+    def update_schedule(self, new_schedule: list, expected_version: Optional[int] = None) -> Optional[int]:
+        """
+        Programı günceller (sadece değişen günler günlüğe yazılır), yeni sürüm numarasını döndürür
+        expected_version verilmiş ve güncel sürümden farklıysa güncelleme yapılmaz (None)
+        """
+        new_schedule = copy.deepcopy(new_schedule)
+        with self._schedule_lock:
+            if expected_version is not None and expected_version != self.snapshot.version:
+                return None
+            records = self._diff_schedule(self.snapshot.days, new_schedule)
+            snapshot = self._publish(new_schedule)
+            ticket = self._reserve_persist()
+        self._persist(records, ticket, snapshot)
         print("[Scheduler] Program güncellendi")
+        return snapshot.version
     
     def update_day(self, day_of_week: int, day_data: dict):
         """Tek günü günceller"""
-        with self.lock:
-            for i, day in enumerate(self.schedule):
-                if day.get("dayOfWeek") == day_of_week:
-                    self.schedule[i] = day_data
-                    break
-            else:
-                self.schedule.append(day_data)
-            
-            save_schedule(self.schedule)
+        day_data = copy.deepcopy(day_data)
+        with self._schedule_lock:
+            snapshot = self._publish(self._replace_day(day_of_week, day_data), day_of_week)
+            ticket = self._reserve_persist()
+        self._persist([{"op": "update_day", "day": day_of_week, "data": day_data}], ticket, snapshot)
     
     def add_activity(self, day_of_week: int, activity: dict) -> bool:
         """Etkinlik ekler, çakışma kontrolü yapar"""
-        day = self._get_day_schedule(day_of_week)
-        if not day:
-            return False
+        return self.add_activities(day_of_week, [activity])["success"]
+    
+    def add_activities(self, day_of_week: int, activities: List[dict]) -> dict:
+        """
+        Birden fazla etkinliği tek seferde ekler
+        Tüm liste doğrulanır, bütün çakışmalar birlikte raporlanır; çakışma varsa hiçbiri eklenmez
+        """
+        activities = copy.deepcopy(list(activities))
+        with self._schedule_lock:
+            day = self._get_day_schedule(day_of_week)
+            if not day:
+                return {"success": False, "added": 0, "version": self.schedule_version,
+                        "conflicts": [{"index": None, "reason": "unknown_day"}]}
+            
+            index = self._get_activity_index(day_of_week)
+            conflicts = self._find_conflicts(day, index, activities)
+            if conflicts:
+                return {"success": False, "added": 0, "version": self.schedule_version,
+                        "conflicts": conflicts}
+            
+            # Yeni gün kopyası, tek sıralama ile
+            merged = sorted(day.get("activities", []) + activities, key=lambda x: x.get("startTime", ""))
+            snapshot = self._publish(self._replace_day(day_of_week, dict(day, activities=merged)),
+                                     day_of_week)
+            # Dizin yeniden kurulmak yerine güncellenir
+            for activity in activities:
+                for start, end in activity_spans(activity):
+                    index.insert(start, end, activity)
+            self._activity_indexes[day_of_week] = index
+            ticket = self._reserve_persist()
+        self._persist([{"op": "add_activities", "day": day_of_week, "activities": activities}],
+                      ticket, snapshot)
+        
+        return {"success": True, "added": len(activities), "version": snapshot.version, "conflicts": []}
+    
+    def _get_activity_index(self, day_of_week: int) -> ActivityIndex:
+        """Günün çakışma dizinini döndürür (cache'li, _schedule_lock altında çağrılır)"""
+        index = self._activity_indexes.get(day_of_week)
+        if index is None:
+            day = self._get_day_schedule(day_of_week) or {}
+            index = ActivityIndex(day.get("activities", []))
+            self._activity_indexes[day_of_week] = index
+        return index
+    
+    @staticmethod
+    def _find_conflicts(day: dict, index: ActivityIndex, activities: List[dict]) -> List[dict]:
+        """Eklenecek etkinliklerin mevcut program ve birbirleriyle çakışmalarını bulur"""
+        def describe(activity: dict) -> dict:
+            return {key: activity.get(key) for key in ("id", "name", "startTime", "endTime")}
         
-        # Çakışma kontrolü
-        new_start = activity.get("startTime", "")
-        new_end = activity.get("endTime", "")
+        conflicts = []
+        ids = {a.get("id") for a in day.get("activities", []) if a.get("id")}
+        spans = []
         
-        for existing in day.get("activities", []):
-            ex_start = existing.get("startTime", "")
-            ex_end = existing.get("endTime", "")
+        for i, activity in enumerate(activities):
+            activity_segments = activity_spans(activity)
+            if activity_segments is None:
+                conflicts.append({"index": i, "activity": describe(activity), "reason": "invalid_time"})
+                continue
             
-            # Zaman çakışması
-            if (new_start < ex_end and new_end > ex_start):
-                return False
-        
-        # Etkinliği ekle
-        with self.lock:
-            for d in self.schedule:
-                if d.get("dayOfWeek") == day_of_week:
-                    if "activities" not in d:
-                        d["activities"] = []
-                    d["activities"].append(activity)
-                    d["activities"].sort(key=lambda x: x.get("startTime", ""))
-                    break
+            rules = [activity.get("recurrence")] + [
+                a.get("recurrence") for a in activity.get("announcements") or activity.get("interimAnnouncements") or []]
+            try:
+                for spec in rules:
+                    if spec:
+                        RecurrenceRule.parse(spec)
+            except ValueError as e:
+                conflicts.append({"index": i, "activity": describe(activity), "reason": "invalid_recurrence",
+                                  "detail": str(e)})
+            
+            activity_id = activity.get("id")
+            if activity_id and activity_id in ids:
+                conflicts.append({"index": i, "activity": describe(activity), "reason": "duplicate_id"})
+            elif activity_id:
+                ids.add(activity_id)
             
-            save_schedule(self.schedule)
+            found = []
+            for start, end in activity_segments:
+                for existing in index.overlaps(start, end):
+                    if not any(existing is other for other in found):
+                        found.append(existing)
+            for existing in found:
+                conflicts.append({"index": i, "activity": describe(activity), "reason": "overlap",
+                                  "with": describe(existing)})
+            spans.extend((start, end, i, activity) for start, end in activity_segments)
         
-        return True
+        # Liste içi çakışmalar: başlangıca göre sırala, en geç biten önceki aralıkla karşılaştır
+        # (gece yarısını geçen etkinliğin iki parçası aynı çifti iki kez raporlamaz)
+        spans.sort(key=lambda s: (s[0], s[2]))
+        latest = None
+        reported = set()
+        for start, end, i, activity in spans:
+            if latest and latest[1] > start and latest[2] != i and (i, latest[2]) not in reported:
+                reported.add((i, latest[2]))
+                conflicts.append({"index": i, "activity": describe(activity), "reason": "overlap",
+                                  "with": describe(latest[3])})
+            if latest is None or end > latest[1]:
+                latest = (start, end, i, activity)
+        
+        conflicts.sort(key=lambda c: c["index"])
+        return conflicts
     
     def remove_activity(self, day_of_week: int, activity_id: str) -> bool:
         """Etkinlik siler"""
-        with self.lock:
-            for day in self.schedule:
-                if day.get("dayOfWeek") == day_of_week:
-                    activities = day.get("activities", [])
-                    day["activities"] = [a for a in activities if a.get("id") != activity_id]
-                    save_schedule(self.schedule)
-                    return True
-        return False
+        with self._schedule_lock:
+            day = self._get_day_schedule(day_of_week)
+            if not day:
+                return False
+            activities = [a for a in day.get("activities", []) if a.get("id") != activity_id]
+            snapshot = self._publish(self._replace_day(day_of_week, dict(day, activities=activities)),
+                                     day_of_week)
+            ticket = self._reserve_persist()
+        self._persist([{"op": "remove_activity", "day": day_of_week, "id": activity_id}], ticket, snapshot)
+        return True
+    
+    def reload_schedule(self):
+        """Programı diskten yeniden yükler (ör. yedek geri yükleme sonrası)"""
+        with self._schedule_lock:
+            # Sıradaki yazımlar bitmeden okunmaz
+            with self._persist_order(self._reserve_persist()):
+                schedule = load_schedule(self.zone_id, data_dir=self.data_dir)
+            self._publish(schedule)
+    
+    @staticmethod
+    def _diff_schedule(old: list, new: list) -> List[dict]:
+        """İki program arasındaki farkı gün bazında günlük kayıtlarına çevirir"""
+        old_days = {d.get("dayOfWeek"): d for d in old}
+        new_days = {d.get("dayOfWeek"): d for d in new}
+        if set(old_days) != set(new_days) or len(new_days) != len(new):
+            return [{"op": "replace", "schedule": new}]
+        return [
+            {"op": "update_day", "day": day_of_week, "data": day}
+            for day_of_week, day in new_days.items()
+            if old_days[day_of_week] != day
+        ]
+    
+    def _reserve_persist(self) -> int:
+        """Disk yazımı için sıra numarası alır (_schedule_lock altında, yayınla aynı sırada)"""
+        ticket = self._persist_next
+        self._persist_next += 1
+        return ticket
+    
+    @contextmanager
+    def _persist_order(self, ticket: int):
+        """Önceki sıra numaralarının yazımı bitene kadar bekler; çıkışta sırayı ilerletir"""
+        with self._persist_cond:
+            while self._persist_turn != ticket:
+                self._persist_cond.wait()
+            try:
+                yield
+            finally:
+                self._persist_turn += 1
+                self._persist_cond.notify_all()
+    
+    def _persist(self, records: List[dict], ticket: int, snapshot: ScheduleSnapshot):
+        """
+        Değişiklikleri günlüğün sonuna ekler (küçük bir ekleme, tam yeniden yazım değil)
+        _schedule_lock dışında, alınan sıra numarasıyla çağrılır; okuyucular ve sonraki
+        yazıcılar fsync'i beklemez. Günlük büyüdüyse bu kayda karşılık gelen sürüm tek
+        dosyaya sıkıştırılır.
+        """
+        with self._persist_order(ticket):
+            if not records:
+                return
+            try:
+                size = append_schedule_journal(records, self.zone_id, data_dir=self.data_dir)
+            except Exception as e:
+                print(f"[Scheduler] Program günlüğe yazılamadı: {e}")
+                return
+            self._journal_dirty = True
+            if size > JOURNAL_COMPACT_BYTES:
+                self._save_snapshot(snapshot)
+    
+    def compact_schedule(self):
+        """Programın tamamını atomik olarak yazar ve günlüğü sıfırlar (bekleyen yazımlardan sonra)"""
+        with self._schedule_lock:
+            # Yayınlanmış sürüm değişmez, kopyalamaya gerek yok
+            snapshot = self.snapshot
+            ticket = self._reserve_persist()
+        with self._persist_order(ticket):
+            self._save_snapshot(snapshot)
+    
+    def _save_snapshot(self, snapshot: ScheduleSnapshot):
+        try:
+            save_schedule(snapshot.days, self.zone_id, data_dir=self.data_dir)
+            self._journal_dirty = False
+        except Exception as e:
+            print(f"[Scheduler] Program kaydedilemedi: {e}")
     
     def get_status(self) -> dict:
         """Zamanlayıcı durumunu döndürür"""
-        with self.lock:
-            return {
-                "running": self.running,
-                "state": self.current_state,
-                "next_event": self.next_event,
-                "current_time": datetime.now().strftime("%H:%M:%S"),
-                "day_of_week": datetime.now().weekday()
+        # Kilitsiz okuma: alanlar tek tek atanır, program anlık görüntüsü değişmez
+        punctuality = self.punctuality.get_status()
+        next_wakeup = self.next_wakeup
+        return {
+            "zone": self.zone_id,
+            "schedule_version": self.schedule_version,
+            "running": self.running,
+            "standby": self.standby,
+            "state": self.current_state,
+            "next_event": self.next_event,
+            "current_time": datetime.now().strftime("%H:%M:%S"),
+            "day_of_week": datetime.now().weekday(),
+            "next_wakeup": next_wakeup.strftime("%Y-%m-%d %H:%M:%S") if next_wakeup else None,
+            "wakeups": self.wakeup_count,
+            "dispatch": self.dispatcher.get_status(),
+            "catch_up": {
+                "last_processed": self._last_processed.strftime("%Y-%m-%d %H:%M") if self._last_processed else None,
+                "replayed": self.replayed_count,
+                "missed": self.missed_count,
+                "missed_events": list(self.missed_events),
+                "grace_seconds": self.grace_seconds
+            },
+            "punctuality": {
+                "today": self.punctuality.summary(datetime.now().date()),
+                "days": punctuality
             }
+        }
     
     def get_daily_timeline(self) -> list:
         """Bugünün zaman çizelgesini döndürür"""
-        day_of_week = datetime.now().weekday()
-        day = self._get_day_schedule(day_of_week)
-        
-        if not day:
-            return []
-        
-        timeline = []
+        timeline = self._get_timeline(self._now().date())
         
-        for activity in day.get("activities", []):
-            timeline.append({
-                "time": activity.get("startTime", ""),
-                "name": activity.get("name", ""),
-                "type": "start",
-                "activity_type": activity.get("type", "custom")
-            })
-            timeline.append({
-                "time": activity.get("endTime", ""),
-                "name": activity.get("name", ""),
-                "type": "end",
-                "activity_type": activity.get("type", "custom")
-            })
-        
-        return sorted(timeline, key=lambda x: x["time"])
+        return [
+            {
+                "time": event.time,
+                "name": event.activity.get("name", ""),
+                "type": event.kind,
+                "activity_type": event.activity.get("type", "custom")
+            }
+            for event in timeline.edges
+        ]
     
     def _check_initial_state(self):
         """Uygulama başlangıcında mevcut durumu kontrol eder ve müziği başlatır"""
-        import time
-        time.sleep(1)  # Diğer servislerin başlaması için kısa bir bekleme
+        if self.startup_delay:
+            time.sleep(self.startup_delay)  # Diğer servislerin başlaması için kısa bir bekleme
         
         now = datetime.now()
-        current_time = now.strftime("%H:%M")
-        day_of_week = now.weekday()
         
-        # Bugünün programını al
-        today_schedule = self._get_day_schedule(day_of_week)
+        # Yedek düğüm müzik başlatmaz
+        if self.standby:
+            return
         
-        if not today_schedule or not today_schedule.get("enabled", True):
+        # Bugünün derlenmiş çizelgesini al
+        timeline = self._get_timeline(now.date())
+        
+        if not timeline.enabled:
             return
         
         # Tatil kontrolü
-        if self.holiday_checker and self.holiday_checker():
+        if self._is_holiday(now.date()):
             return
         
         # Manuel player aktifse dokunma
@@ -545,18 +1197,12 @@ class SchedulerService:
             return
         
         # Şu anda bir etkinlik içinde mi?
-        activities = today_schedule.get("activities", [])
-        in_any_activity = False
-        
-        for activity in activities:
-            start = activity.get("startTime", "")
-            end = activity.get("endTime", "")
-            
-            if start <= current_time < end:
-                in_any_activity = True
-                self.in_activity = True
-                self.current_activity = activity
-                break
+        minute = now.hour * 60 + now.minute
+        active_activity = timeline.activity_at(minute)
+        in_any_activity = active_activity is not None
+        if in_any_activity:
+            self.in_activity = True
+            self.current_activity = active_activity
         
         # Başlangıçta müzik başlatma - sadece etkinlik bitişinde playMusic kontrolü ile başlar
         if in_any_activity:
@@ -566,16 +1212,18 @@ class SchedulerService:
             # Ve bir sonraki etkinlikten önce miyiz?
             
             # 1. Şimdi bitmiş olan en son etkinliği bul
-            last_ended = None
-            for activity in sorted(activities, key=lambda x: x.get("endTime", ""), reverse=True):
-                if activity.get("endTime", "") <= current_time:
-                    last_ended = activity
-                    break
+            last_ended = timeline.last_ended_at(minute)
             
             self.last_ended_activity = last_ended
             
             # 2. Eğer son biten etkinlik varsa ve müzik istiyorsa
-            if last_ended and last_ended.get("playMusic", False):
+            # Kapalıyken biten etkinlik: bitişi telafi tick'inde işlenir, müzik kararı orada verilir
+            end_key = f"{last_ended.get('id', '')}_end" if last_ended else None
+            replay_pending = (self._last_processed is not None
+                              and end_key not in self.fired_events.get(now.date(), set()))
+            if last_ended and last_ended.get("playMusic", False) and replay_pending:
+                print(f"[Scheduler] Başlangıçta mola ({last_ended.get('name')} sonrası) - bitiş telafi edilecek")
+            elif last_ended and last_ended.get("playMusic", False):
                 # 3. Sonraki etkinlik (veya gün sonu) gelmediyse çal
                 print(f"[Scheduler] Başlangıçta mola ({last_ended.get('name')} sonrası) - müzik kontrolü")
                 self._start_background_music()
@@ -0,0 +1,106 @@
+"""
+NikolayCo SmartZill v2.0 - Program Simülasyonu
+Zamanlayıcının gerçek karar mantığını sanal bir saatle çalıştırır ve
+çalınacak her sesi kaydeder (ses çalınmaz, dosyaya yazılmaz).
+"""
+from datetime import datetime, date, timedelta
+from typing import Optional, List
+
+from core.scheduler import SchedulerService
+
+# Tek istekte simüle edilebilecek en uzun aralık (gün)
+MAX_SIMULATION_DAYS = 366
+
+
+class SimulatedScheduler(SchedulerService):
+    """Sanal saatle çalışan, sesleri kaydeden zamanlayıcı kopyası"""
+
+    def __init__(self, source: SchedulerService, start: datetime):
+        # Kiracı/bölge dizini kaynaktan alınır; ayarlar aynı yerden okunur
+        super().__init__(source.zone_id, data_dir=source.data_dir)
+        self.verbose = False
+        self.clock = start
+        self.records: List[dict] = []
+
+        # Kaynak zamanlayıcının programı ve ayarları (kaynak değiştirilmez)
+        # Program anlık görüntüsü değişmez, kopyalamadan paylaşılır
+        self.snapshot = source.snapshot
+        self._timelines = {}
+        self.grace_seconds = dict(source.grace_seconds)
+        self.dispatcher.max_delay = dict(source.dispatcher.max_delay)
+        self.holiday_checker = source.holiday_checker
+        self.birthday_roster = source.birthday_roster
+        self.day_resolver = source.day_resolver
+
+        # Kayıt yapan ses çıkışı
+        self.on_bell = lambda f: self._record("bell", f)
+        self.on_announcement = lambda f: self._record("announcement", f)
+        self.on_music_start = lambda: self._record("music_start")
+        self.on_music_stop = lambda: self._record("music_stop")
+
+    def _now(self) -> datetime:
+        return self.clock
+
+    def _pause(self, seconds: float):
+        # Beklemek yerine sanal saati ilerlet
+        self.clock += timedelta(seconds=seconds)
+
+    def _play_birthday(self, name: str):
+        # TTS üretilmez, sadece kaydedilir
+        self._record("birthday", name)
+
+    def _record(self, kind: str, source: Optional[str] = None):
+        self.records.append({
+            "time": self.clock.strftime("%Y-%m-%d %H:%M:%S"),
+            "kind": kind,
+            "source": source
+        })
+
+    def run(self, end: datetime):
+        """Başlangıçtan bitişe kadar olay olay ilerler"""
+        # Başlangıç dakikası da işlensin
+        self._last_processed = self.clock.replace(second=0, microsecond=0) - timedelta(minutes=1)
+        while self.clock <= end:
+            self._tick()
+            deadline = self._next_deadline(self.clock)
+            # Sesler arası bekleme saati ileri almış olabilir
+            self.clock = max(deadline, self.clock + timedelta(seconds=1))
+
+
+def simulate(source: SchedulerService, start: datetime, end: datetime) -> dict:
+    """
+    Verilen aralıkta çalınacak zil/anons/müzik olaylarını döndürür
+    Tatiller, doğum günleri ve mola müziği kararları dahildir
+    """
+    if end < start:
+        raise ValueError("Bitiş başlangıçtan önce olamaz")
+    if (end - start).days > MAX_SIMULATION_DAYS:
+        raise ValueError(f"En fazla {MAX_SIMULATION_DAYS} gün simüle edilebilir")
+
+    sim = SimulatedScheduler(source, start)
+
+    # Gün özetleri (kapalı ve tatil günleri)
+    days = []
+    day: date = start.date()
+    while day <= end.date():
+        days.append({
+            "date": day.isoformat(),
+            "enabled": sim._get_timeline(day).enabled,
+            "holiday": sim._is_holiday(day)
+        })
+        day += timedelta(days=1)
+
+    sim.run(end)
+
+    counts = {}
+    for record in sim.records:
+        counts[record["kind"]] = counts.get(record["kind"], 0) + 1
+
+    return {
+        "zone": source.zone_id,
+        "from": start.strftime("%Y-%m-%d %H:%M:%S"),
+        "to": end.strftime("%Y-%m-%d %H:%M:%S"),
+        "events": sim.records,
+        "counts": counts,
+        "days": days
+    }
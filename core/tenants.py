@@ -0,0 +1,319 @@
+"""
+NikolayCo SmartZill v2.0 - Çok Kiracılı Zamanlayıcı
+Yüzlerce sahanın (kiracı) programını tek süreçte çalıştırır.
+
+- Her kiracının kendi veri dizini vardır: <base_dir>/<kiracı>/schedule.json, config.json
+- Tüm kiracıların sonraki uyanma anları tek bir öncelik kuyruğunda (heap) tutulur,
+  tek timer thread'i sadece vadesi gelen kiracıları seçer; tick'leri ortak işçi
+  havuzunda çalışır, yavaş bir kiracı (defter fsync'i, tatil sorgusu) diğerlerini geciktirmez
+- Zil/anons işleri kiracı başına thread yerine ortak bir işçi havuzunda sırayla çalışır
+- Ses çıkışı kiracıya özeldir (AudioSink; ör. sahadaki hoparlöre akış)
+"""
+import heapq
+import itertools
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Optional, Callable, Dict, List
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from core.scheduler import SchedulerService, MAX_IDLE_SLEEP, CLOCK_CHECK_SECONDS
+from core.dispatch import DispatchPool
+
+# Kiracı kimliği dizin adında kullanıldığı için sınırlı karakter kümesi
+TENANT_ID_PATTERN = re.compile(r"^[a-z0-9_-]{1,64}$")
+# Ortak zil/anons işçi sayısı
+DEFAULT_WORKERS = 8
+
+
+class AudioSink:
+    """Kiracının ses çıkışı; varsayılanı sessizdir, kurulum kendi çıkışını verir"""
+
+    def play_bell(self, filename: str):
+        pass
+
+    def play_announcement(self, filename: str):
+        pass
+
+    def start_music(self):
+        pass
+
+    def stop_music(self):
+        pass
+
+    def prepare(self, channel: str, filename: str):
+        pass
+
+
+class HeapTimer:
+    """
+    Tek thread'li zamanlayıcı: kiracıların sonraki uyanma anları bir heap'te tutulur
+
+    - Kayıt: (uyanma anı, sıra no, zamanlayıcı); plan değişince eski kayıt geçersiz
+      sayılır (sıra no eşleşmez) ve zamanlayıcı hemen işlenip yeniden eklenir
+    - Her uyanmada sadece vadesi gelenler işlenir; 500 kiracıda bile maliyet o ana düşen kiracılar kadardır
+    - Havuz verilmişse tick'ler havuzda çalışır; bir kiracının aynı anda tek tick'i olur,
+      tick sürerken planı değişirse bitince tekrar işlenir
+    """
+
+    def __init__(self, pool: Optional[DispatchPool] = None):
+        self.pool = pool
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+        self._wakeup = threading.Condition()
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        # id(zamanlayıcı) -> geçerli heap kaydının sıra no'su
+        self._entries: Dict[int, int] = {}
+        # Planı değişen (hemen işlenecek) zamanlayıcılar
+        self._dirty: Dict[int, SchedulerService] = {}
+        # Tick'i havuzda süren zamanlayıcılar ve bu sırada planı değişenler
+        self._ticking: Dict[int, SchedulerService] = {}
+        self._retick: set = set()
+        self.next_wakeup: Optional[datetime] = None
+        self.wakeup_count = 0
+        self.tick_count = 0
+
+    def start(self):
+        """Timer thread'ini başlatır"""
+        with self._wakeup:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True, name="HeapTimer")
+        self.thread.start()
+
+    def stop(self):
+        """Timer thread'ini durdurur"""
+        with self._wakeup:
+            self.running = False
+            self._wakeup.notify_all()
+        if self.thread:
+            self.thread.join(timeout=2)
+
+    def start_timer(self, scheduler: Optional[SchedulerService] = None):
+        """Zamanlayıcı başlatıldığında çağrılır (SchedulerService.start)"""
+        self.reschedule(scheduler)
+
+    def reschedule(self, scheduler: Optional[SchedulerService] = None):
+        """Zamanlayıcının planı değişti: bir sonraki turda işlenip yeniden sıraya girer"""
+        with self._wakeup:
+            if scheduler is not None:
+                self._dirty[id(scheduler)] = scheduler
+            self._wakeup.notify_all()
+
+    def _loop(self):
+        while self.running:
+            self.wakeup_count += 1
+            self._step(datetime.now())
+            self._sleep()
+
+    def _step(self, now: datetime):
+        """Vadesi gelen ve planı değişen zamanlayıcıları işler (havuz varsa havuza verir)"""
+        due = []
+        with self._wakeup:
+            due.extend(self._dirty.values())
+            self._dirty.clear()
+            while self._heap and self._heap[0][0] <= now:
+                _, seq, scheduler = heapq.heappop(self._heap)
+                if self._entries.get(id(scheduler)) == seq:
+                    due.append(scheduler)
+
+        seen = set()
+        pooled = self.pool is not None and self.pool.running
+        for scheduler in due:
+            if id(scheduler) in seen:
+                continue
+            seen.add(id(scheduler))
+            with self._wakeup:
+                if not scheduler.running:
+                    self._entries.pop(id(scheduler), None)
+                    continue
+                if id(scheduler) in self._ticking:
+                    self._retick.add(id(scheduler))
+                    continue
+                self._ticking[id(scheduler)] = scheduler
+
+            if pooled:
+                self.pool.submit(lambda s=scheduler: self._tick_one(s))
+            else:
+                self._tick_one(scheduler)
+
+        with self._wakeup:
+            # Geçersiz kayıtlar birikirse heap yeniden kurulur
+            if len(self._heap) > 2 * len(self._entries) + 64:
+                self._heap = [e for e in self._heap if self._entries.get(id(e[2])) == e[1]]
+                heapq.heapify(self._heap)
+
+    def _tick_one(self, scheduler: SchedulerService):
+        """Tek zamanlayıcının tick'i; sonraki uyanma anı tick bittikten sonraki saate göre hesaplanır"""
+        scheduler.wakeup_count += 1
+        with self._wakeup:
+            self.tick_count += 1
+        try:
+            scheduler._tick()
+        except Exception as e:
+            print(f"[Tenants] Hata ({scheduler.zone_id}): {e}")
+        now = datetime.now()
+        try:
+            deadline = scheduler._next_deadline(now)
+        except Exception as e:
+            print(f"[Tenants] Sonraki uyanma hesaplanamadı ({scheduler.zone_id}): {e}")
+            deadline = now + timedelta(seconds=1)
+        scheduler.next_wakeup = deadline
+
+        with self._wakeup:
+            self._ticking.pop(id(scheduler), None)
+            if id(scheduler) in self._retick:
+                self._retick.discard(id(scheduler))
+                self._dirty[id(scheduler)] = scheduler
+            seq = next(self._seq)
+            self._entries[id(scheduler)] = seq
+            heapq.heappush(self._heap, (deadline, seq, scheduler))
+            self._wakeup.notify_all()
+
+    def _sleep(self):
+        """En yakın uyanma anına kadar veya bir plan değişene kadar bekler"""
+        with self._wakeup:
+            while self.running and not self._dirty:
+                now = datetime.now()
+                deadline = self._heap[0][0] if self._heap else now + timedelta(seconds=MAX_IDLE_SLEEP)
+                self.next_wakeup = deadline
+                remaining = (deadline - now).total_seconds()
+                if remaining <= 0:
+                    break
+                # Duvar saati sıçramalarını yakalamak için parça parça bekle
+                self._wakeup.wait(min(remaining, CLOCK_CHECK_SECONDS))
+
+    def get_status(self) -> dict:
+        next_wakeup = self.next_wakeup
+        return {
+            "running": self.running,
+            "scheduled": len(self._entries),
+            "heap": len(self._heap),
+            "next_wakeup": next_wakeup.strftime("%Y-%m-%d %H:%M:%S") if next_wakeup else None,
+            "wakeups": self.wakeup_count,
+            "ticks": self.tick_count,
+        }
+
+
+class TenantManager:
+    """
+    Kiracı yöneticisi
+
+    - Kiracılar base_dir altındaki dizinlerden yüklenir veya add_tenant ile eklenir
+    - Tüm kiracılar tek HeapTimer ve ortak DispatchPool paylaşır
+    """
+
+    def __init__(self, base_dir: Path, workers: int = DEFAULT_WORKERS):
+        self.base_dir = Path(base_dir)
+        self.lock = threading.Lock()
+        self.running = False
+        self.pool = DispatchPool(workers, name="TenantDispatch")
+        self.timer = HeapTimer(self.pool)
+        self.tenants: Dict[str, SchedulerService] = {}
+        self.sinks: Dict[str, AudioSink] = {}
+
+        # (kiracı, veri dizini) -> AudioSink; verilmezse sessiz çıkış
+        self.sink_factory: Optional[Callable[[str, Path], AudioSink]] = None
+        # Tüm kiracılara atanan tatil kontrolü (tarih -> tatil mi)
+        self.holiday_checker: Optional[Callable] = None
+
+    def load(self) -> List[str]:
+        """base_dir altındaki kiracı dizinlerini yükler"""
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        loaded = []
+        for path in sorted(self.base_dir.iterdir()):
+            if path.is_dir() and TENANT_ID_PATTERN.match(path.name) and path.name not in self.tenants:
+                self.add_tenant(path.name)
+                loaded.append(path.name)
+        print(f"[Tenants] {len(loaded)} kiracı yüklendi ({self.base_dir})")
+        return loaded
+
+    def add_tenant(self, tenant_id: str, sink: Optional[AudioSink] = None) -> SchedulerService:
+        """Kiracıyı ekler (dizini yoksa oluşturur); yönetici çalışıyorsa hemen başlatır"""
+        if not TENANT_ID_PATTERN.match(tenant_id or ""):
+            raise ValueError("Kiracı kimliği sadece küçük harf, rakam, - ve _ içerebilir")
+        data_dir = self.base_dir / tenant_id
+        data_dir.mkdir(parents=True, exist_ok=True)
+
+        with self.lock:
+            if tenant_id in self.tenants:
+                raise ValueError(f"Kiracı zaten var: {tenant_id}")
+            tenant = SchedulerService(tenant_id, data_dir=data_dir)
+            tenant.timer = self.timer
+            tenant.dispatcher.pool = self.pool
+            tenant.startup_delay = 0
+            tenant.verbose = False
+            tenant.holiday_checker = self.holiday_checker
+
+            if sink is None:
+                sink = self.sink_factory(tenant_id, data_dir) if self.sink_factory else AudioSink()
+            self._wire(tenant, sink)
+            self.tenants[tenant_id] = tenant
+            self.sinks[tenant_id] = sink
+
+        if self.running:
+            tenant.start()
+        return tenant
+
+    @staticmethod
+    def _wire(tenant: SchedulerService, sink: AudioSink):
+        tenant.on_bell = sink.play_bell
+        tenant.on_announcement = sink.play_announcement
+        tenant.on_music_start = sink.start_music
+        tenant.on_music_stop = sink.stop_music
+        tenant.on_prepare = sink.prepare
+
+    def remove_tenant(self, tenant_id: str) -> bool:
+        """Kiracıyı durdurur ve çıkarır (dizini silinmez)"""
+        with self.lock:
+            tenant = self.tenants.pop(tenant_id, None)
+            self.sinks.pop(tenant_id, None)
+        if tenant is None:
+            return False
+        if tenant.running:
+            tenant.stop()
+        return True
+
+    def get(self, tenant_id: str) -> Optional[SchedulerService]:
+        return self.tenants.get(tenant_id)
+
+    def list_tenants(self) -> List[dict]:
+        return [
+            {
+                "id": tenant_id,
+                "running": tenant.running,
+                "next_wakeup": tenant.next_wakeup.strftime("%Y-%m-%d %H:%M:%S") if tenant.next_wakeup else None,
+            }
+            for tenant_id, tenant in list(self.tenants.items())
+        ]
+
+    def start(self):
+        """Ortak timer'ı, işçi havuzunu ve tüm kiracıları başlatır"""
+        self.running = True
+        self.pool.start()
+        self.timer.start()
+        for tenant in list(self.tenants.values()):
+            tenant.start()
+        print(f"[Tenants] Başlatıldı ({len(self.tenants)} kiracı)")
+
+    def stop(self):
+        """Tüm kiracıları, timer'ı ve işçi havuzunu durdurur"""
+        self.running = False
+        for tenant in list(self.tenants.values()):
+            if tenant.running:
+                tenant.stop()
+        self.timer.stop()
+        self.pool.stop()
+        print("[Tenants] Durduruldu")
+
+    def get_status(self) -> dict:
+        return {
+            "running": self.running,
+            "tenants": len(self.tenants),
+            "timer": self.timer.get_status(),
+            "workers": self.pool.workers,
+        }
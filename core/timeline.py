@@ -0,0 +1,182 @@
+"""
+NikolayCo SmartZill v2.0 - Derlenmiş Gün Zaman Çizelgesi
+Günlük programı dakika ofsetli, sıralı bir olay dizisine çevirir.
+Zamanlayıcı her saniye ham sözlükleri taramak yerine bisect ile arama yapar.
+"""
+from bisect import bisect_left, bisect_right
+from typing import Optional, List, Tuple
+
+# Aynı dakikadaki olayların işlenme sırası (eski _tick sırası korunur)
+KIND_ORDER = {
+    "start": 0,
+    "end": 1,
+    "interim": 2,
+    "birthday": 3,
+}
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def parse_hhmm(value) -> Optional[int]:
+    """'HH:MM' metnini gün içi dakika ofsetine çevirir, geçersizse None"""
+    if not value or not isinstance(value, str):
+        return None
+    parts = value.strip().split(":")
+    if len(parts) < 2:
+        return None
+    try:
+        hour = int(parts[0])
+        minute = int(parts[1])
+    except ValueError:
+        return None
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        return None
+    return hour * 60 + minute
+
+
+def format_minute(minute: int) -> str:
+    """Dakika ofsetini 'HH:MM' metnine çevirir"""
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+class TimelineEvent:
+    """Derlenmiş tek bir olay"""
+
+    __slots__ = ("minute", "kind", "activity", "payload", "key")
+
+    def __init__(self, minute: int, kind: str, activity: Optional[dict], payload: Optional[dict], key: str):
+        self.minute = minute
+        self.kind = kind
+        self.activity = activity
+        self.payload = payload
+        self.key = key
+
+    @property
+    def time(self) -> str:
+        return format_minute(self.minute)
+
+    def __repr__(self):
+        return f"TimelineEvent({self.time}, {self.kind}, {self.key})"
+
+
+class DayTimeline:
+    """
+    Tek bir günün derlenmiş olay dizisi
+
+    - events: (dakika, tür sırası) ile sıralı tüm olaylar (doğum günü anonsları dahil)
+    - edges: yalnızca başlangıç/bitiş olayları (sonraki etkinlik gösterimi için)
+    - intervals: başlangıca göre sıralı etkinlik aralıkları
+    """
+
+    def __init__(self, day: Optional[dict], birthdays: Optional[List[Tuple[str, List[str]]]] = None):
+        self.enabled = bool(day) and day.get("enabled", True)
+        self.activities: List[dict] = list(day.get("activities", [])) if day else []
+
+        events: List[Tuple[int, int, int, TimelineEvent]] = []
+        intervals: List[Tuple[int, int, int, dict]] = []
+
+        for seq, activity in enumerate(self.activities):
+            activity_id = activity.get("id", "")
+            start = parse_hhmm(activity.get("startTime", ""))
+            end = parse_hhmm(activity.get("endTime", ""))
+
+            if start is not None:
+                events.append((start, KIND_ORDER["start"], seq,
+                               TimelineEvent(start, "start", activity, None, f"{activity_id}_start")))
+            if end is not None:
+                events.append((end, KIND_ORDER["end"], seq,
+                               TimelineEvent(end, "end", activity, None, f"{activity_id}_end")))
+            if start is not None and end is not None:
+                intervals.append((start, end, seq, activity))
+
+            # Önce 'announcements' (yeni format), yoksa 'interimAnnouncements' (eski format)
+            anns = activity.get("announcements") or activity.get("interimAnnouncements", [])
+            for interim in anns:
+                # enabled varsayılan True olsun
+                if not interim.get("enabled", True):
+                    continue
+                minute = parse_hhmm(interim.get("time"))
+                if minute is None:
+                    continue
+                key = f"{activity_id}_interim_{interim.get('soundId', '')}_{interim.get('time')}"
+                events.append((minute, KIND_ORDER["interim"], seq,
+                               TimelineEvent(minute, "interim", activity, interim, key)))
+
+        # Doğum günü anonsları: [("HH:MM", [isimler]), ...]
+        for slot, names in birthdays or []:
+            minute = parse_hhmm(slot)
+            if minute is None:
+                continue
+            for seq, name in enumerate(names):
+                events.append((minute, KIND_ORDER["birthday"], seq,
+                               TimelineEvent(minute, "birthday", None, {"name": name},
+                                             f"birthday_{name}_{slot}")))
+
+        events.sort(key=lambda e: e[:3])
+        self.events: List[TimelineEvent] = [e[3] for e in events]
+        self.minutes: List[int] = [e.minute for e in self.events]
+
+        self.edges: List[TimelineEvent] = [e for e in self.events if e.kind in ("start", "end")]
+        self.edge_minutes: List[int] = [e.minute for e in self.edges]
+
+        intervals.sort(key=lambda i: (i[0], i[2]))
+        self._starts: List[int] = [i[0] for i in intervals]
+        self._intervals = intervals
+        # Çakışan etkinliklere karşı: o indekse kadar görülen en büyük bitiş
+        self._max_end: List[int] = []
+        running = -1
+        for start, end, _, _ in intervals:
+            running = max(running, end)
+            self._max_end.append(running)
+
+        # Aynı bitiş saatinde listede önce gelen etkinlik seçilsin (eski davranış)
+        ends = sorted(((i[1], i[2], i[3]) for i in intervals), key=lambda e: (e[0], -e[1]))
+        self._end_minutes: List[int] = [e[0] for e in ends]
+        self._ends_sorted = ends
+
+    def events_at(self, minute: int) -> List[TimelineEvent]:
+        """Verilen dakikada tetiklenecek olaylar"""
+        lo = bisect_left(self.minutes, minute)
+        hi = bisect_right(self.minutes, minute, lo)
+        return self.events[lo:hi]
+
+    def events_between(self, start_minute: int, end_minute: int) -> List[TimelineEvent]:
+        """start_minute < dakika <= end_minute aralığındaki olaylar"""
+        lo = bisect_right(self.minutes, start_minute)
+        hi = bisect_right(self.minutes, end_minute, lo)
+        return self.events[lo:hi]
+
+    def next_edge_after(self, minute: int) -> Optional[TimelineEvent]:
+        """Verilen dakikadan sonraki ilk başlangıç/bitiş olayı"""
+        idx = bisect_right(self.edge_minutes, minute)
+        if idx < len(self.edges):
+            return self.edges[idx]
+        return None
+
+    def next_event_after(self, minute: int) -> Optional[TimelineEvent]:
+        """Verilen dakikadan sonraki ilk olay (ara anonslar dahil)"""
+        idx = bisect_right(self.minutes, minute)
+        if idx < len(self.events):
+            return self.events[idx]
+        return None
+
+    def activity_at(self, minute: int) -> Optional[dict]:
+        """start <= dakika < end olan etkinliği döndürür"""
+        idx = bisect_right(self._starts, minute) - 1
+        # Önceki aralıkların hiçbiri bu dakikayı kapsamıyorsa erken çık
+        while idx >= 0 and self._max_end[idx] > minute:
+            start, end, _, activity = self._intervals[idx]
+            if end > minute:
+                return activity
+            idx -= 1
+        return None
+
+    def last_ended_at(self, minute: int) -> Optional[dict]:
+        """Bitişi dakikaya eşit veya önce olan en son etkinlik"""
+        idx = bisect_right(self._end_minutes, minute) - 1
+        if idx >= 0:
+            return self._ends_sorted[idx][2]
+        return None
+
+    def __len__(self):
+        return len(self.events)
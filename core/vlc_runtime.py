@@ -0,0 +1,223 @@
+"""
+NikolayCo SmartZill v2.0 - Ortak libVLC Çalışma Ortamı
+Süreç başına tek vlc.Instance: eklenti seti bir kez yüklenir, tüm ses kanalları
+ve manuel player aynı instance'ı kullanır. Kanallar MediaPlayer nesnelerini her
+çalmada yeniden oluşturmak yerine küçük bir havuzdan alıp geri verir.
+
+Sık çalınan zil ve anons dosyalarının Media nesneleri sınırlı bir LRU önbellekte
+tutulur; dosya değişince (boyut/değişme zamanı) veya yükleme/silmede yenilenir.
+Önbelleğe giren Media arka planda ayrıştırılır (biçim ve süre), sonraki çalmalar
+dosyayı yeniden çözümlemez; ayrıştırılamayan kayıt tekrar kullanılmaz.
+"""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Callable, List
+
+import vlc
+
+# Kanal başına havuzda bekletilecek en fazla boş player
+PLAYER_POOL_SIZE = 2
+# Önbellekte tutulacak en fazla Media nesnesi
+MEDIA_CACHE_SIZE = 32
+# Önbelleğe giren Media'nın ayrıştırma zaman aşımı (ms)
+MEDIA_PARSE_TIMEOUT_MS = 2000
+
+_instance = None
+_instance_lock = threading.Lock()
+_stats = {"instances": 0, "startup_ms": None, "players_created": 0, "players_reused": 0}
+
+
+def _instance_args() -> List[str]:
+    """Tüm kullanıcıların ortak seçenekleri (ses kanalları ve manuel player)"""
+    args = ["--quiet", "--no-video", "--vout=dummy"]
+    if sys.platform.startswith("linux"):
+        args.append("--no-xlib")
+    return args
+
+
+def get_instance():
+    """Süreç genelindeki libVLC instance'ı (ilk çağrıda oluşturulur, oluşturulamazsa None)"""
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            started = time.perf_counter()
+            try:
+                _instance = vlc.Instance(*_instance_args())
+            except Exception as e:
+                print(f"[VLC] Uyarı: VLC instance oluşturulamadı: {e}")
+                return None
+            _stats["instances"] += 1
+            _stats["startup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return _instance
+
+
+def get_stats() -> dict:
+    """Instance açılış süresi, player havuzu ve Media önbelleği sayaçları"""
+    stats = dict(_stats)
+    stats["media_cache"] = media_cache.get_stats()
+    return stats
+
+
+class PlayerPool:
+    """
+    Tek kanalın yeniden kullanılabilir MediaPlayer havuzu
+
+    - acquire: boş player varsa onu, yoksa yeni player döndürür
+    - release: player durdurulur; havuz doluysa serbest bırakılır
+    - Bitiş ve hata olayları player oluşturulurken bir kez bağlanır (yeniden kullanımda tekrar bağlanmaz)
+    """
+
+    def __init__(self, name: str, on_end: Optional[Callable] = None, size: int = PLAYER_POOL_SIZE,
+                 on_error: Optional[Callable] = None):
+        self.name = name
+        self.on_end = on_end
+        self.on_error = on_error
+        self.size = size
+        self.idle: list = []
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            if self.idle:
+                _stats["players_reused"] += 1
+                return self.idle.pop()
+
+        instance = get_instance()
+        if instance is None:
+            return None
+        player = instance.media_player_new()
+        _stats["players_created"] += 1
+        events = [(vlc.EventType.MediaPlayerEncounteredError, self.on_error),
+                  (vlc.EventType.MediaPlayerEndReached, self.on_end)]
+        for event_type, callback in events:
+            if not callback:
+                continue
+            try:
+                player.event_manager().event_attach(event_type, callback)
+            except Exception as e:
+                # Player olaysız da çalar; bitiş kanal durumu kontrolüyle yakalanır
+                print(f"[{self.name}] Uyarı: event_attach başarısız: {e}")
+        return player
+
+    def release(self, player):
+        if player is None:
+            return
+        try:
+            player.stop()
+        except Exception:
+            pass
+        with self.lock:
+            if len(self.idle) < self.size:
+                self.idle.append(player)
+                return
+        try:
+            player.release()
+        except Exception:
+            pass
+
+    def close(self):
+        """Havuzdaki boş player'ları serbest bırakır"""
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for player in idle:
+            try:
+                player.release()
+            except Exception:
+                pass
+
+
+class MediaCache:
+    """
+    Yerel dosyalar için sınırlı LRU Media önbelleği
+
+    - Anahtar: mutlak yol; kayıt dosyanın boyutu ve değişme zamanı ile doğrulanır
+    - Dosya değişmişse yeni Media açılır, eskisi bırakılır
+    - Yeni Media yerel ayrıştırmaya verilir; ayrıştırma başarısızsa kayıt yeniden açılır
+    - Taşan kayıtlar en eski kullanılandan başlayarak bırakılır
+    - get() çağırana ayrıca tutulmuş (retain) bir referans verir; çağıran set_media
+      sonrası bırakır. Böylece kayıt arada atılsa da Media çağıranın elinde geçerli kalır
+    """
+
+    def __init__(self, size: int = MEDIA_CACHE_SIZE):
+        self.size = size
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, path: str):
+        """Dosyanın Media nesnesi, çağıran için tutulmuş (dosya yoksa veya VLC açılamadıysa None)"""
+        try:
+            stat = os.stat(path)
+        except (OSError, TypeError, ValueError):
+            return None
+        key = os.path.abspath(path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] == signature and not self._parse_failed(entry[1]):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                entry[1].retain()
+                return entry[1]
+
+        instance = get_instance()
+        if instance is None:
+            return None
+        media = instance.media_new_path(path)
+        self._parse(media)
+
+        with self.lock:
+            self.misses += 1
+            # Önbelleğin referansı media_new_path'ten gelir, çağıranınki ayrıca tutulur
+            media.retain()
+            old = self.entries.pop(key, None)
+            self.entries[key] = (signature, media)
+            evicted = [old[1]] if old else []
+            while len(self.entries) > self.size:
+                evicted.append(self.entries.popitem(last=False)[1][1])
+        self._release(evicted)
+        return media
+
+    def _parse(self, media):
+        """Yerel ayrıştırmayı başlatır (asenkron; çalma bunu beklemez)"""
+        try:
+            media.parse_with_options(vlc.MediaParseFlag.local, MEDIA_PARSE_TIMEOUT_MS)
+        except Exception as e:
+            print(f"[VLC] Uyarı: Media ayrıştırılamadı: {e}")
+
+    def _parse_failed(self, media) -> bool:
+        try:
+            return media.get_parsed_status() == vlc.MediaParsedStatus.failed
+        except Exception:
+            return False
+
+    def invalidate(self, path: Optional[str] = None):
+        """Dosyanın (path None ise tüm) kaydını bırakır; yükleme ve silmede çağrılır"""
+        with self.lock:
+            if path is None:
+                evicted = [media for _, media in self.entries.values()]
+                self.entries.clear()
+            else:
+                entry = self.entries.pop(os.path.abspath(str(path)), None)
+                evicted = [entry[1]] if entry else []
+        self._release(evicted)
+
+    def _release(self, medias: list):
+        for media in medias:
+            try:
+                media.release()
+            except Exception:
+                pass
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {"size": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+# Global Media önbelleği (zil ve anons kanalları ortak kullanır)
+media_cache = MediaCache()
@@ -0,0 +1,240 @@
+"""
+NikolayCo SmartZill v2.0 - Bölgeler
+Her bölgenin kendi haftalık programı ve ses çıkışı vardır (ör. atölye ve ofis).
+Tüm bölgeler tek bir paylaşımlı zamanlayıcı thread'i ile sürülür.
+"""
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Callable, Dict, List
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import load_config, save_config, DEFAULT_ZONE_ID
+from core.scheduler import SchedulerService, scheduler, MAX_IDLE_SLEEP, CLOCK_CHECK_SECONDS
+
+# Bölge kimliği dosya adında kullanıldığı için sınırlı karakter kümesi
+ZONE_ID_PATTERN = re.compile(r"^[a-z0-9_-]{1,32}$")
+
+
+class ZoneManager:
+    """
+    Bölge yöneticisi
+
+    - Varsayılan bölge her zaman vardır (eski tek programlı kurulum)
+    - Ek bölgeler config'deki "zones" listesinden yüklenir
+    - Tek thread her uyanmada tüm bölgeleri işler, en yakın olaya kadar uyur
+    """
+
+    def __init__(self, default_scheduler: SchedulerService):
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+
+        # Paylaşımlı uyanma koşulu
+        self._wakeup = threading.Condition()
+        self._plan_changed = False
+        self.next_wakeup: Optional[datetime] = None
+        self.wakeup_count = 0
+
+        # Bölge kimliği -> zamanlayıcı / bilgi ({"id", "name", "output"})
+        default_scheduler.timer = self
+        self.zones: Dict[str, SchedulerService] = {DEFAULT_ZONE_ID: default_scheduler}
+        self.zone_info: Dict[str, dict] = {
+            DEFAULT_ZONE_ID: {"id": DEFAULT_ZONE_ID, "name": "Varsayılan", "output": None}
+        }
+
+        # Yeni bölge oluşturulduğunda çağrılır (ses çıkışı ve callback bağlantısı için)
+        self.on_zone_created: Optional[Callable[[SchedulerService, dict], None]] = None
+        # Bölge silindiğinde çağrılır
+        self.on_zone_removed: Optional[Callable[[str], None]] = None
+
+    def load_zones(self):
+        """Config'deki bölgeleri yükler"""
+        for info in load_config().get("zones", []):
+            try:
+                self.add_zone(info.get("id", ""), info.get("name", ""), info.get("output"), persist=False)
+            except ValueError as e:
+                print(f"[Zones] Bölge yüklenemedi: {e}")
+
+    def get(self, zone_id: Optional[str] = None) -> Optional[SchedulerService]:
+        """Bölgenin zamanlayıcısını döndürür (boş = varsayılan bölge)"""
+        return self.zones.get(zone_id or DEFAULT_ZONE_ID)
+
+    def list_zones(self) -> List[dict]:
+        """Bölge listesini döndürür"""
+        with self.lock:
+            return [
+                {**self.zone_info[zone_id], "running": zone.running}
+                for zone_id, zone in self.zones.items()
+            ]
+
+    def add_zone(self, zone_id: str, name: str = "", output: Optional[str] = None,
+                 persist: bool = True) -> SchedulerService:
+        """Yeni bölge ekler; zamanlayıcı çalışıyorsa bölge de hemen başlar"""
+        if not ZONE_ID_PATTERN.match(zone_id or ""):
+            raise ValueError(f"Geçersiz bölge kimliği: {zone_id!r}")
+
+        with self.lock:
+            if zone_id in self.zones:
+                raise ValueError(f"Bölge zaten var: {zone_id}")
+            zone = SchedulerService(zone_id)
+            zone.timer = self
+            info = {"id": zone_id, "name": name or zone_id, "output": output}
+            self.zones[zone_id] = zone
+            self.zone_info[zone_id] = info
+
+        if self.on_zone_created:
+            try:
+                self.on_zone_created(zone, info)
+            except Exception as e:
+                print(f"[Zones] on_zone_created callback hatası: {e}")
+
+        if persist:
+            self._save_zones()
+        if self.running:
+            zone.start()
+        print(f"[Zones] Bölge eklendi: {zone_id}")
+        return zone
+
+    def remove_zone(self, zone_id: str) -> bool:
+        """Bölgeyi durdurur ve siler (varsayılan bölge silinemez)"""
+        if zone_id == DEFAULT_ZONE_ID:
+            return False
+
+        with self.lock:
+            zone = self.zones.pop(zone_id, None)
+            self.zone_info.pop(zone_id, None)
+        if not zone:
+            return False
+
+        if zone.running:
+            zone.stop()
+        if self.on_zone_removed:
+            try:
+                self.on_zone_removed(zone_id)
+            except Exception as e:
+                print(f"[Zones] on_zone_removed callback hatası: {e}")
+        self._save_zones()
+        print(f"[Zones] Bölge silindi: {zone_id}")
+        return True
+
+    def invalidate_timelines(self):
+        """Tüm bölgelerin derlenmiş çizelgelerini geçersiz kılar (ör. tatil ayarı değişti)"""
+        for zone in list(self.zones.values()):
+            zone.invalidate_timelines()
+
+    def reload_settings(self):
+        """Tüm bölgelerin zamanlayıcı ayarlarını config'den yeniden yükler"""
+        for zone in list(self.zones.values()):
+            zone.reload_settings()
+
+    def _save_zones(self):
+        """Ek bölgeleri config'e kaydeder"""
+        config = load_config()
+        # Bölge kaydındaki ek alanlar (ör. ses seviyeleri) korunur
+        existing = {zone.get("id"): zone for zone in config.get("zones", [])}
+        config["zones"] = [
+            {**existing.get(zone_id, {}), **info}
+            for zone_id, info in self.zone_info.items() if zone_id != DEFAULT_ZONE_ID
+        ]
+        save_config(config)
+
+    def start(self):
+        """Paylaşımlı zamanlayıcıyı ve tüm bölgeleri başlatır"""
+        self.start_timer()
+        for zone in list(self.zones.values()):
+            zone.start()
+
+    def start_timer(self, zone=None):
+        """Paylaşımlı döngü thread'ini başlatır (çalışıyorsa sadece uyandırır)"""
+        if not self.running:
+            self.running = True
+            self._plan_changed = False
+            self.thread = threading.Thread(target=self._loop, daemon=True)
+            self.thread.start()
+        else:
+            self.reschedule()
+
+    def stop(self):
+        """Tüm bölgeleri ve paylaşımlı zamanlayıcıyı durdurur"""
+        for zone in list(self.zones.values()):
+            if zone.running:
+                zone.stop()
+        self.running = False
+        self.reschedule()
+        if self.thread:
+            self.thread.join(timeout=2)
+
+    def reschedule(self, zone=None):
+        """Bir bölgenin planı değiştiğinde paylaşımlı döngüyü erken uyandırır (tüm bölgeler işlenir)"""
+        with self._wakeup:
+            self._plan_changed = True
+            self._wakeup.notify_all()
+
+    def _loop(self):
+        """Paylaşımlı döngü - tüm bölgeleri işler, en yakın olaya kadar uyur"""
+        while self.running:
+            self.wakeup_count += 1
+            self._tick_all()
+
+            try:
+                deadline = self._next_deadline(datetime.now())
+            except Exception as e:
+                print(f"[Zones] Sonraki uyanma hesaplanamadı: {e}")
+                deadline = datetime.now() + timedelta(seconds=1)
+
+            self._sleep_until(deadline)
+
+    def _tick_all(self):
+        """Çalışan tüm bölgelerin vadesi gelmiş olaylarını işler"""
+        for zone in list(self.zones.values()):
+            if not zone.running:
+                continue
+            zone.wakeup_count += 1
+            try:
+                zone._tick()
+            except Exception as e:
+                print(f"[Zones] Hata ({zone.zone_id}): {e}")
+
+    def _next_deadline(self, now: datetime) -> datetime:
+        """Tüm bölgeler arasında en yakın uyanma anı"""
+        deadlines = [now + timedelta(seconds=MAX_IDLE_SLEEP)]
+        for zone in list(self.zones.values()):
+            if zone.running:
+                deadline = zone._next_deadline(now)
+                zone.next_wakeup = deadline
+                deadlines.append(deadline)
+        return min(deadlines)
+
+    def _sleep_until(self, deadline: datetime):
+        """Verilen ana kadar veya bir bölgenin planı değişene kadar bekler"""
+        with self._wakeup:
+            self.next_wakeup = deadline
+            while self.running and not self._plan_changed:
+                remaining = (deadline - datetime.now()).total_seconds()
+                if remaining <= 0:
+                    break
+                # Duvar saati sıçramalarını yakalamak için parça parça bekle
+                target = time.monotonic() + min(remaining, CLOCK_CHECK_SECONDS)
+                while self.running and not self._plan_changed:
+                    left = target - time.monotonic()
+                    if left <= 0:
+                        break
+                    self._wakeup.wait(left)
+            self._plan_changed = False
+
+    def get_status(self) -> dict:
+        """Paylaşımlı zamanlayıcı ve bölge durumları"""
+        return {
+            "running": self.running,
+            "next_wakeup": self.next_wakeup.strftime("%Y-%m-%d %H:%M:%S") if self.next_wakeup else None,
+            "wakeups": self.wakeup_count,
+            "zones": self.list_zones()
+        }
+
+
+# Singleton instance
+zone_manager = ZoneManager(scheduler)
@@ -12,7 +12,7 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import (
-    DATA_DIR, SOUNDS_DIR, CONFIG_FILE, SCHEDULE_FILE, SPECIAL_DAYS_FILE,
+    DATA_DIR, SOUNDS_DIR, CONFIG_FILE, SCHEDULE_FILE, SPECIAL_DAYS_FILE, OVERRIDES_FILE,
     load_config, save_config, load_schedule, save_schedule
 )
 
@@ -41,7 +41,8 @@ class BackupService:
             "created_at": datetime.now().isoformat(),
             "config": self._get_sanitized_config(),
             "schedule": load_schedule(),
-            "special_days": self._load_special_days()
+            "special_days": self._load_special_days(),
+            "overrides": self._load_overrides()
         }
         
         filename = f"NikolayCo_SmartZill_Yedek_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
@@ -158,6 +159,10 @@ class BackupService:
             if "special_days" in backup_data:
                 self._save_special_days(backup_data["special_days"])
             
+            # Tarihe özel program
+            if "overrides" in backup_data:
+                self._save_overrides(backup_data["overrides"])
+            
             return True
             
         except Exception as e:
@@ -265,6 +270,21 @@ class BackupService:
         with open(SPECIAL_DAYS_FILE, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
     
+    def _load_overrides(self) -> dict:
+        """Tarihe özel program kayıtlarını yükler"""
+        if OVERRIDES_FILE.exists():
+            try:
+                with open(OVERRIDES_FILE, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except:
+                pass
+        return {"overrides": []}
+    
+    def _save_overrides(self, data: dict):
+        """Tarihe özel program kayıtlarını kaydeder"""
+        with open(OVERRIDES_FILE, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    
     def _list_sound_files(self) -> List[dict]:
         """Ses dosyalarını listeler"""
         files = []
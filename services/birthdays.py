@@ -4,7 +4,7 @@ Personel doğum günü anonsları yönetimi
 """
 import json
 from datetime import datetime, date
-from typing import List, Optional
+from typing import List, Optional, Callable, Tuple, Dict
 from pathlib import Path
 import sys
 
@@ -18,6 +18,14 @@ class BirthdayService:
     def __init__(self):
         self.data_file = SPECIAL_DAYS_FILE
         self.data = self._load_data()
+        
+        # Günlük anons listesi (tarih başına bir kez hesaplanır, veri değişince sıfırlanır)
+        self._roster_day: Optional[date] = None
+        self._roster: List[Tuple[str, List[str]]] = []
+        self._birthdays_by_day: Dict[date, List[dict]] = {}
+        
+        # Veri değiştiğinde çağrılır (zamanlayıcı çizelgesini yeniden derlesin)
+        self.on_change: Optional[Callable] = None
     
     def _load_data(self) -> dict:
         """Veriyi yükler"""
@@ -40,6 +48,23 @@ class BirthdayService:
         DATA_DIR.mkdir(parents=True, exist_ok=True)
         with open(self.data_file, "w", encoding="utf-8") as f:
             json.dump(self.data, f, ensure_ascii=False, indent=2)
+        self._invalidate_roster()
+    
+    def _invalidate_roster(self):
+        """Günlük anons listesini geçersiz kılar ve dinleyeni haberdar eder"""
+        self._roster_day = None
+        self._roster = []
+        self._birthdays_by_day = {}
+        if self.on_change:
+            try:
+                self.on_change()
+            except Exception as e:
+                print(f"[Birthday] on_change callback hatası: {e}")
+    
+    def reload(self):
+        """Veriyi diskten yeniden yükler (ör. yedek geri yükleme sonrası)"""
+        self.data = self._load_data()
+        self._invalidate_roster()
     
     def add_person(self, name: str, birth_date: str) -> bool:
         """Kişi ekler (tarih formatı: DD.MM.YYYY, YYYY-MM-DD veya MM-DD)"""
@@ -91,8 +116,15 @@ class BirthdayService:
     
     def get_todays_birthdays(self) -> List[dict]:
         """Bugünkü doğum günlerini döndürür"""
-        today = date.today()
-        today_str = today.strftime("%d.%m")  # DD.MM formatı
+        return self.get_birthdays_on(date.today())
+    
+    def get_birthdays_on(self, day: date) -> List[dict]:
+        """Verilen tarihteki doğum günlerini döndürür (tarih başına cache'li)"""
+        cached = self._birthdays_by_day.get(day)
+        if cached is not None:
+            return cached
+        
+        day_str = day.strftime("%d.%m")  # DD.MM formatı
         
         result = []
         for p in self.data["people"]:
@@ -102,11 +134,39 @@ class BirthdayService:
                 parts = person_date.split(".")
                 if len(parts) >= 2:
                     person_day_month = f"{parts[0]}.{parts[1]}"
-                    if person_day_month == today_str:
+                    if person_day_month == day_str:
                         result.append(p)
         
+        # Yalnızca birkaç gün tut (bugün, simülasyon vb.)
+        if len(self._birthdays_by_day) > 8:
+            self._birthdays_by_day = {}
+        self._birthdays_by_day[day] = result
         return result
     
+    def get_roster(self, day: Optional[date] = None) -> List[Tuple[str, List[str]]]:
+        """
+        Günün anons listesini döndürür: [("HH:MM", [isimler]), ...]
+        Tarih başına bir kez hesaplanır; zamanlayıcı bunu çizelgesine ekler.
+        """
+        if day is None:
+            day = date.today()
+        
+        if self._roster_day == day:
+            return self._roster
+        
+        roster = []
+        if self.data.get("enabled", True):
+            names = [b["name"] for b in self.get_birthdays_on(day)]
+            if names:
+                times = sorted(set(self.data.get("announcement_times", [])))
+                roster = [(t, names) for t in times]
+        
+        # Sadece bugünün listesi saklanır
+        if day == date.today():
+            self._roster_day = day
+            self._roster = roster
+        return roster
+    
     def get_upcoming_birthdays(self, days: int = 30) -> List[dict]:
         """Yaklaşan doğum günlerini listeler"""
         today = date.today()
@@ -236,16 +296,11 @@ class BirthdayService:
     
     def should_announce_now(self) -> List[str]:
         """Şu an anons zamanı ise kişi adlarını döndürür"""
-        if not self.data.get("enabled", True):
-            return []
-        
         current_time = datetime.now().strftime("%H:%M")
-        
-        if current_time not in self.data.get("announcement_times", []):
-            return []
-        
-        birthdays = self.get_todays_birthdays()
-        return [b["name"] for b in birthdays]
+        for slot, names in self.get_roster():
+            if slot == current_time:
+                return list(names)
+        return []
     
     
     def get_all_people(self) -> List[dict]:
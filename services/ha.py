@@ -0,0 +1,310 @@
+"""
+NikolayCo SmartZill v2.0 - Yüksek Erişilebilirlik (Aktif/Yedek)
+İki kurulum paylaşımlı depolamadaki bir kira (lease) dosyası üzerinden lider seçer.
+Sadece lider olay çalar; yedek çizelgeyi derler ve sesleri hazırlar, lider
+düştüğünde kira süresi dolunca devralır. Lider işlediği dakikayı ve tetiklediği
+olayları değiştikçe kiranın yanındaki durum dosyasına yazar; kira yenilemesi
+yalnızca küçük bir kalp atışı kaydıdır. Devralan düğüm durumu yükler, böylece
+olaylar ne kaçırılır ne de iki kez çalınır.
+
+Düğümlerin saatleri senkron olmalıdır (NTP); kira bitişi duvar saatiyle tutulur.
+"""
+import json
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, date
+from typing import Optional, Callable, Dict, List
+from pathlib import Path
+import sys
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import load_config, DATA_DIR
+
+# Kira süresi (saniye): lider bu süre yenilemezse yedek devralır
+LEASE_SECONDS = 2.0
+# Kiranın yenilenme / yedeğin kontrol aralığı (saniye)
+RENEW_SECONDS = 0.5
+
+
+class HAService:
+    """Kira dosyası ile aktif/yedek lider seçimi"""
+
+    def __init__(self):
+        self.enabled = False
+        self.node_id = socket.gethostname()
+        self.lease_file = DATA_DIR / "ha_lease.json"
+        self.lease_seconds = LEASE_SECONDS
+        self.renew_seconds = RENEW_SECONDS
+
+        self.is_leader = False
+        self.leader: Optional[str] = None
+        self.term = 0
+        self.takeovers = 0
+        self._expires = 0.0
+        # Durum dosyasına en son yazılan bölge durumu (değişmedikçe tekrar yazılmaz)
+        self._written_state: Optional[Dict[str, dict]] = None
+
+        # Yönetilen zamanlayıcılar (bölgeler): () -> [SchedulerService, ...]
+        self.schedulers: Optional[Callable[[], list]] = None
+        # Rol değiştiğinde çağrılır (is_leader)
+        self.on_role_change: Optional[Callable[[bool], None]] = None
+        self.clock = time.time
+
+        self.lock = threading.RLock()
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        self.load_settings()
+
+    def load_settings(self):
+        """Ayarları config'den okur"""
+        settings = load_config().get("ha", {}) or {}
+        self.enabled = bool(settings.get("enabled", False))
+        self.node_id = settings.get("node_id") or socket.gethostname()
+        if settings.get("lease_file"):
+            self.lease_file = Path(settings["lease_file"])
+        self.lease_seconds = float(settings.get("lease_seconds", LEASE_SECONDS))
+        self.renew_seconds = float(settings.get("renew_seconds", RENEW_SECONDS))
+
+    # ===== KİRA DOSYASI =====
+
+    @contextmanager
+    def _locked(self):
+        """Kira dosyası üzerinde süreçler arası kilit (oku-değiştir-yaz için)"""
+        self.lease_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lease_file.with_suffix(".lock"), "a+") as f:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _read_lease(self) -> dict:
+        try:
+            with open(self.lease_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_lease(self, lease: dict):
+        """Kalp atışı kaydı: sahip, dönem ve bitiş (her yenilemede yazılır)"""
+        self._write_json(self.lease_file, lease, sync=False)
+
+    @property
+    def state_file(self) -> Path:
+        """Bölge durumlarının tutulduğu dosya (kira dosyasının yanında)"""
+        return self.lease_file.with_name(self.lease_file.stem + "_state.json")
+
+    def _read_state(self) -> Dict[str, dict]:
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f).get("zones") or {}
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def _write_state(self, zones: Dict[str, dict]):
+        """Bölge durumlarını diske işler; yalnızca durum değiştiğinde çağrılır"""
+        self._write_json(self.state_file, {"holder": self.node_id, "term": self.term, "zones": zones})
+        self._written_state = zones
+
+    def _write_json(self, path: Path, data: dict, sync: bool = True):
+        """Geçici dosyaya yazıp yerine taşır (okuyan düğüm yarım dosya görmez)"""
+        tmp_file = path.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+
+    # ===== ZAMANLAYICI DURUMU =====
+
+    def _get_schedulers(self) -> list:
+        if not self.schedulers:
+            return []
+        try:
+            return list(self.schedulers())
+        except Exception as e:
+            print(f"[HA] Zamanlayıcı listesi alınamadı: {e}")
+            return []
+
+    def _collect_state(self) -> Dict[str, dict]:
+        """Bölge -> işlenen son dakika ve tetiklenen olaylar"""
+        state = {}
+        for scheduler in self._get_schedulers():
+            processed = scheduler._last_processed
+            state[scheduler.zone_id] = {
+                "processed": processed.strftime("%Y-%m-%d %H:%M") if processed else None,
+                "fired": {day.isoformat(): sorted(keys.copy()) for day, keys in list(scheduler.fired_events.items())},
+            }
+        return state
+
+    def _apply_state(self, state: Dict[str, dict]):
+        """Önceki liderin durumunu zamanlayıcılara yükler ve onları aktif eder"""
+        for scheduler in self._get_schedulers():
+            zone_state = state.get(scheduler.zone_id) or {}
+            processed = None
+            if zone_state.get("processed"):
+                try:
+                    processed = datetime.strptime(zone_state["processed"], "%Y-%m-%d %H:%M")
+                except ValueError:
+                    pass
+            fired = {}
+            for day, keys in (zone_state.get("fired") or {}).items():
+                try:
+                    fired[date.fromisoformat(day)] = set(keys)
+                except ValueError:
+                    continue
+            scheduler.take_over(processed, fired)
+
+    # ===== LİDER SEÇİMİ =====
+
+    def _renew(self):
+        """Kirayı alır veya yeniler; başka geçerli lider varsa yedek kalır"""
+        now = self.clock()
+        try:
+            with self.lock, self._locked():
+                lease = self._read_lease()
+                holder = lease.get("holder")
+                if holder and holder != self.node_id and lease.get("expires", 0) > now:
+                    self.leader = holder
+                    self.term = lease.get("term", 0)
+                    self._set_role(False)
+                    return
+
+                taking_over = holder != self.node_id or not self.is_leader
+                if taking_over:
+                    self.term = lease.get("term", 0) + 1
+                    # Önceki liderin durumu aynen korunur, kira yazılınca yüklenir
+                    zones = self._read_state()
+                    self._written_state = zones
+                else:
+                    zones = self._collect_state()
+                    if zones != self._written_state:
+                        self._write_state(zones)
+
+                expires = now + self.lease_seconds
+                self._write_lease({
+                    "holder": self.node_id,
+                    "term": self.term,
+                    "expires": expires,
+                })
+                self._expires = expires
+
+                if taking_over:
+                    # Zamanlayıcılar olay çalmadan önce tetiklenmiş olayları öğrenir
+                    self._apply_state(zones)
+                    if holder and holder != self.node_id:
+                        self.takeovers += 1
+                        print(f"[HA] {holder} düğümünden liderlik devralındı (term {self.term})")
+                self.leader = self.node_id
+                self._set_role(True)
+        except Exception as e:
+            print(f"[HA] Kira yenilenemedi: {e}")
+            # Kira yazılamıyorsa süresi dolunca kendiliğinden yedeğe geç (çift lider olmasın)
+            if self.is_leader and now >= self._expires:
+                self._set_role(False)
+
+    def _set_role(self, leader: bool):
+        if leader == self.is_leader:
+            return
+        self.is_leader = leader
+        if not leader:
+            for scheduler in self._get_schedulers():
+                scheduler.set_standby(True)
+        print(f"[HA] Rol: {'lider' if leader else 'yedek'} (düğüm: {self.node_id})")
+        if self.on_role_change:
+            try:
+                self.on_role_change(leader)
+            except Exception as e:
+                print(f"[HA] Rol değişikliği bildirimi hatası: {e}")
+
+    def publish(self, day: Optional[date] = None, keys: Optional[List[str]] = None):
+        """Lider tetiklediği olayları hemen durum dosyasına yazar (zamanlayıcı on_fired)"""
+        if self.enabled and self.is_leader:
+            self._renew()
+
+    def prepare_scheduler(self, scheduler):
+        """Zamanlayıcıyı HA'ya bağlar: lider değilse yedek başlar, tetiklemeler paylaşılır"""
+        if not self.enabled:
+            return
+        scheduler.on_fired = self.publish
+        scheduler.standby = not self.is_leader
+
+    def start(self):
+        """Kira döngüsünü başlatır (zamanlayıcılar yedek modda başlar)"""
+        if not self.enabled or self.running:
+            return
+        for scheduler in self._get_schedulers():
+            self.prepare_scheduler(scheduler)
+        self.running = True
+        self._stop_event.clear()
+        self._renew()
+        self.thread = threading.Thread(target=self._loop, daemon=True, name="HA")
+        self.thread.start()
+        print(f"[HA] Başlatıldı (düğüm: {self.node_id}, kira: {self.lease_file})")
+
+    def stop(self):
+        """Döngüyü durdurur; liderse kirayı bırakır ki yedek hemen devralsın"""
+        if not self.running:
+            return
+        self.running = False
+        self._stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=2)
+        if self.is_leader:
+            self.release()
+
+    def release(self):
+        """Liderliği bırakır (durum korunur, kira süresi hemen dolar)"""
+        try:
+            with self.lock, self._locked():
+                lease = self._read_lease()
+                if lease.get("holder") == self.node_id:
+                    zones = self._collect_state()
+                    if zones != self._written_state:
+                        self._write_state(zones)
+                    lease["expires"] = 0
+                    self._write_lease(lease)
+        except Exception as e:
+            print(f"[HA] Kira bırakılamadı: {e}")
+        self._set_role(False)
+
+    def _loop(self):
+        while self.running:
+            self._renew()
+            self._stop_event.wait(self.renew_seconds)
+
+    def get_status(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "node_id": self.node_id,
+            "role": "leader" if self.is_leader or not self.enabled else "standby",
+            "leader": self.leader,
+            "term": self.term,
+            "takeovers": self.takeovers,
+            "lease_file": str(self.lease_file),
+            "lease_seconds": self.lease_seconds,
+        }
+
+
+# Singleton instance
+ha_service = HAService()
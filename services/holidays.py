@@ -4,7 +4,7 @@ Resmi tatil günleri yönetimi
 """
 import holidays
 from datetime import datetime, date
-from typing import List, Optional
+from typing import List, Optional, Callable, Dict
 from pathlib import Path
 import sys
 
@@ -30,12 +30,40 @@ class HolidayService:
     }
     
     def __init__(self):
-        self.config = load_config()
-        self.country = self.config.get("holidays", {}).get("country", "TR")
-        self.enabled = self.config.get("holidays", {}).get("enabled", True)
-        self.skip_on_holidays = self.config.get("holidays", {}).get("skip_on_holidays", True)
         self._holidays_cache = None
         self._cache_year = None
+        
+        # Tarih -> günlük karar (tatil mi, sessize alınmış mı, adı); ayar değişince sıfırlanır
+        self._verdicts: Dict[date, dict] = {}
+        
+        # Karar değiştiğinde çağrılır (zamanlayıcı çizelgesini yeniden derlesin)
+        self.on_change: Optional[Callable] = None
+        
+        self._load_settings()
+    
+    def _load_settings(self):
+        """Ayarları config'den okur (diske yalnızca burada gidilir)"""
+        self.config = load_config()
+        holiday_config = self.config.get("holidays", {})
+        self.country = holiday_config.get("country", "TR")
+        self.enabled = holiday_config.get("enabled", True)
+        self.skip_on_holidays = holiday_config.get("skip_on_holidays", True)
+        self._muted_dates = set(holiday_config.get("muted_dates", []))
+    
+    def _invalidate(self):
+        """Günlük kararları geçersiz kılar ve dinleyeni haberdar eder"""
+        self._verdicts = {}
+        if self.on_change:
+            try:
+                self.on_change()
+            except Exception as e:
+                print(f"[Holidays] on_change callback hatası: {e}")
+    
+    def reload(self):
+        """Config dışarıdan değiştiğinde (ayar kaydı, yedek geri yükleme) yeniden yükler"""
+        self._load_settings()
+        self._holidays_cache = None
+        self._invalidate()
     
     def _get_holidays(self, year: int = None) -> holidays.HolidayBase:
         """Tatil verilerini alır (cache'li)"""
@@ -52,28 +80,50 @@ class HolidayService:
         
         return self._holidays_cache
     
-    def is_holiday_today(self) -> bool:
-        """Bugün tatil mi kontrol eder (ve sessize alınmamış mı)"""
-        if not self.enabled or not self.skip_on_holidays:
-            return False
+    def get_day_verdict(self, check_date: date = None) -> dict:
+        """
+        Verilen günün tatil kararını döndürür (tarih başına bir kez hesaplanır)
+        silent: zamanlayıcı o gün sessiz kalmalı mı
+        """
+        if check_date is None:
+            check_date = date.today()
         
-        today = date.today()
-        holidays_data = self._get_holidays(today.year)
+        verdict = self._verdicts.get(check_date)
+        if verdict is not None:
+            return verdict
+        
+        name = self._get_holidays(check_date.year).get(check_date)
+        date_str = check_date.strftime("%d.%m.%Y")
+        is_holiday = name is not None
+        muted = is_holiday and date_str in self._muted_dates
+        
+        verdict = {
+            "date": date_str,
+            "is_holiday": is_holiday,
+            "name": name,
+            "muted": muted,
+            # Tatil ama sessize alınmışsa normal çalışma
+            "silent": self.enabled and self.skip_on_holidays and is_holiday and not muted
+        }
         
-        # Tatil değilse False
-        if today not in holidays_data:
+        if len(self._verdicts) > 32:
+            self._verdicts = {}
+        self._verdicts[check_date] = verdict
+        return verdict
+    
+    def is_holiday_on(self, check_date: date) -> bool:
+        """Verilen gün tatil mi (ve sessize alınmamış mı)"""
+        if not self.enabled or not self.skip_on_holidays:
             return False
-        
-        # Tatil ama sessize alınmışsa False (normal çalışma)
-        date_str = today.strftime("%d.%m.%Y")
-        muted_holidays = self._get_muted_holidays()
-        
-        return date_str not in muted_holidays
+        return self.get_day_verdict(check_date)["silent"]
+    
+    def is_holiday_today(self) -> bool:
+        """Bugün tatil mi kontrol eder (ve sessize alınmamış mı)"""
+        return self.is_holiday_on(date.today())
     
     def _get_muted_holidays(self) -> set:
         """Sessize alınmış tatilleri döndürür"""
-        config = load_config()
-        return set(config.get("holidays", {}).get("muted_dates", []))
+        return self._muted_dates
     
     def set_holiday_muted(self, date_str: str, muted: bool):
         """Belirli bir tatili sessize al veya aktif et"""
@@ -91,14 +141,12 @@ class HolidayService:
             muted_list.remove(date_str)
         
         save_config(config)
+        self._muted_dates = set(muted_list)
+        self._invalidate()
     
     def get_holiday_name(self, check_date: date = None) -> Optional[str]:
         """Verilen tarihin tatil adını döndürür"""
-        if check_date is None:
-            check_date = date.today()
-        
-        holidays_data = self._get_holidays(check_date.year)
-        return holidays_data.get(check_date)
+        return self.get_day_verdict(check_date)["name"]
     
     def get_all_holidays(self, year: int = None) -> List[dict]:
         """Yılın tüm tatillerini listeler"""
@@ -160,6 +208,7 @@ class HolidayService:
             config["holidays"] = {}
         config["holidays"]["country"] = country
         save_config(config)
+        self._invalidate()
     
     def set_enabled(self, enabled: bool):
         """Tatil kontrolünü açar/kapatır"""
@@ -169,6 +218,7 @@ class HolidayService:
             config["holidays"] = {}
         config["holidays"]["enabled"] = enabled
         save_config(config)
+        self._invalidate()
     
     def set_skip_on_holidays(self, skip: bool):
         """Tatillerde sessizliği açar/kapatır"""
@@ -178,6 +228,7 @@ class HolidayService:
             config["holidays"] = {}
         config["holidays"]["skip_on_holidays"] = skip
         save_config(config)
+        self._invalidate()
     
     def get_status(self) -> dict:
         """Tatil durumunu döndürür"""
@@ -0,0 +1,169 @@
+"""
+NikolayCo SmartZill v2.0 - Tarihe Özel Program Servisi
+Sınav günü, yarım gün, tek seferlik etkinlik gibi haftalık programı
+belirli bir tarih için değiştiren kayıtlar.
+"""
+import json
+import uuid
+from datetime import date
+from typing import List, Optional, Callable, Dict
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import DATA_DIR, OVERRIDES_FILE
+
+# Kayıt türleri:
+# - replace: günün etkinlikleri tamamen değiştirilir
+# - add: haftalık etkinliklere ek etkinlikler eklenir
+# - silence: gün tamamen sessiz
+OVERRIDE_TYPES = ("replace", "add", "silence")
+
+
+class OverrideService:
+    """Tarihe özel program kayıtları (tarih -> kayıtlar dizini ile O(1) arama)"""
+
+    def __init__(self):
+        self.data_file = OVERRIDES_FILE
+        self.data = self._load_data()
+
+        # "YYYY-MM-DD" -> o tarihin kayıtları (ekleme sırasıyla)
+        self._by_date: Dict[str, List[dict]] = {}
+        self._rebuild_index()
+
+        # Veri değiştiğinde çağrılır (zamanlayıcı çizelgesini yeniden derlesin)
+        self.on_change: Optional[Callable] = None
+
+    def _load_data(self) -> dict:
+        """Veriyi yükler"""
+        if self.data_file.exists():
+            try:
+                with open(self.data_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except:
+                pass
+
+        return {"overrides": []}
+
+    def _save_data(self):
+        """Veriyi kaydeder"""
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        with open(self.data_file, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        self._invalidate()
+
+    def _invalidate(self):
+        """Dizini yeniden kurar ve dinleyeni haberdar eder"""
+        self._rebuild_index()
+        if self.on_change:
+            try:
+                self.on_change()
+            except Exception as e:
+                print(f"[Overrides] on_change callback hatası: {e}")
+
+    def _rebuild_index(self):
+        """Tarih dizinini yeniden kurar"""
+        index: Dict[str, List[dict]] = {}
+        for override in self.data.get("overrides", []):
+            index.setdefault(override.get("date", ""), []).append(override)
+        self._by_date = index
+
+    def reload(self):
+        """Veriyi diskten yeniden yükler (ör. yedek geri yükleme sonrası)"""
+        self.data = self._load_data()
+        self._invalidate()
+
+    def add_override(self, override: dict) -> dict:
+        """Kayıt ekler; tarih YYYY-MM-DD, tür replace/add/silence olmalı"""
+        day = date.fromisoformat(override.get("date", ""))
+        override_type = override.get("type", "")
+        if override_type not in OVERRIDE_TYPES:
+            raise ValueError(f"Geçersiz tür: {override_type!r}")
+
+        override_id = override.get("id") or uuid.uuid4().hex[:8]
+        activities = []
+        for n, activity in enumerate(override.get("activities", [])):
+            # Haftalık etkinliklerle anahtar çakışmasın
+            activities.append({**activity, "id": activity.get("id") or f"ovr_{override_id}_{n}"})
+
+        entry = {
+            "id": override_id,
+            "date": day.isoformat(),
+            "type": override_type,
+            "name": override.get("name", ""),
+            "zone": override.get("zone"),
+            "activities": sorted(activities, key=lambda a: a.get("startTime", ""))
+        }
+
+        self.data["overrides"] = [o for o in self.data["overrides"] if o.get("id") != override_id]
+        self.data["overrides"].append(entry)
+        self._save_data()
+        return entry
+
+    def remove_override(self, override_id: str) -> bool:
+        """Kayıt siler"""
+        original_count = len(self.data["overrides"])
+        self.data["overrides"] = [o for o in self.data["overrides"] if o.get("id") != override_id]
+
+        if len(self.data["overrides"]) < original_count:
+            self._save_data()
+            return True
+        return False
+
+    def get_overrides_on(self, day: date, zone_id: Optional[str] = None) -> List[dict]:
+        """Verilen tarihin kayıtları (bölgesiz kayıtlar tüm bölgelere uygulanır)"""
+        return [
+            o for o in self._by_date.get(day.isoformat(), [])
+            if not o.get("zone") or o.get("zone") == zone_id
+        ]
+
+    def get_overrides(self, start: Optional[date] = None, end: Optional[date] = None) -> List[dict]:
+        """Aralıktaki kayıtları tarih sırasıyla döndürür"""
+        result = []
+        for day_str in sorted(self._by_date):
+            if start and day_str < start.isoformat():
+                continue
+            if end and day_str > end.isoformat():
+                continue
+            result.extend(self._by_date[day_str])
+        return result
+
+    def resolve_day(self, day: date, weekly_day: Optional[dict], zone_id: Optional[str] = None) -> Optional[dict]:
+        """
+        Haftalık gün planını tarihe özel kayıtlarla birleştirir
+        Kayıt yoksa haftalık plan olduğu gibi döner
+        """
+        overrides = self.get_overrides_on(day, zone_id)
+        if not overrides:
+            return weekly_day
+
+        effective = dict(weekly_day or {"dayOfWeek": day.weekday(), "enabled": False, "activities": []})
+        # Kapalı haftalık günün etkinlikleri "add" ile açılmaz
+        activities = list(effective.get("activities", [])) if effective.get("enabled", True) else []
+
+        for override in overrides:
+            if override["type"] == "silence":
+                effective["enabled"] = False
+                activities = []
+                break
+            if override["type"] == "replace":
+                effective["enabled"] = True
+                activities = list(override.get("activities", []))
+            elif override["type"] == "add":
+                effective["enabled"] = True
+                activities.extend(override.get("activities", []))
+
+        effective["activities"] = sorted(activities, key=lambda a: a.get("startTime", ""))
+        effective["overrides"] = [o["id"] for o in overrides]
+        return effective
+
+    def get_status(self) -> dict:
+        """Servis durumunu döndürür"""
+        return {
+            "total": len(self.data["overrides"]),
+            "dates": len(self._by_date)
+        }
+
+
+# Singleton instance
+override_service = OverrideService()
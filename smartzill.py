@@ -221,7 +221,7 @@ def play_startup_sound():
     # system_audio dizininden başlangıç sesini çal
     startup_sound = SOUNDS_DIR / "system_audio" / "start.mp3"
     if startup_sound.exists():
-        audio_engine.play_bell(str(startup_sound), blocking=False)
+        audio_engine.queue.bell(str(startup_sound))
 
 
 def run_server():
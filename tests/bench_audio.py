@@ -0,0 +1,135 @@
+"""
+NikolayCo SmartZill v2.0 - Ses Motoru Açılış ve Bellek Ölçümü
+
+Ses motorunu (3 kanal) ve manuel player'ı oluşturur, ardından her kanalda kısa
+bir WAV dosyasını art arda çalıp durdurur; son olarak müzik kanalında bir kısma
+geçişi yapar. Açılış süresi, çalma başlatma süresi, bellek (RSS), libVLC
+instance/player sayaçları ve karıştırıcı adım çözünürlüğü/CPU maliyetini JSON
+olarak yazar:
+
+    python tests/bench_audio.py --plays 50 > audio.json
+    python tests/bench_audio.py --mock    # VLC kurulu değilse yalnızca akışı dener
+
+Gerçek sayılar python-vlc ve libVLC kurulu makinede alınmalıdır; --mock ile
+ölçülen değerler yalnızca Python tarafının yüküdür.
+Dosya adı test_ ile başlamadığı için pytest tarafından toplanmaz.
+"""
+import sys
+import os
+import json
+import argparse
+import platform
+import statistics
+import tempfile
+import threading
+import time
+import wave
+from unittest.mock import MagicMock
+
+if "--mock" in sys.argv:
+    sys.modules.setdefault('vlc', MagicMock())
+
+# Proje yolunu ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+DEFAULT_PLAYS = 20
+# Ölçülen kısma geçişinin süresi (saniye)
+FADE_SECONDS = 1.0
+# Ölçüm dosyası: 0.2 sn sessizlik
+SAMPLE_RATE = 44100
+SAMPLE_SECONDS = 0.2
+
+
+def rss_kb():
+    """Sürecin en yüksek bellek kullanımı (KB; desteklenmiyorsa None)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS bayt, Linux KB döndürür
+    return usage // 1024 if sys.platform == "darwin" else usage
+
+
+def make_sample(directory: str) -> str:
+    path = os.path.join(directory, "bench.wav")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(b"\x00\x00" * int(SAMPLE_RATE * SAMPLE_SECONDS))
+    return path
+
+
+def run(plays: int) -> dict:
+    rss_before = rss_kb()
+    started = time.perf_counter()
+    from core.audio_engine import AudioEngine
+    from core.media_player import MediaPlayer
+    from core import vlc_runtime
+    engine = AudioEngine()
+    manual = MediaPlayer()
+    startup_ms = (time.perf_counter() - started) * 1000
+    rss_startup = rss_kb()
+
+    play_ms = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        sample = make_sample(tmp)
+        for name, channel in engine.channels.items():
+            samples = []
+            for _ in range(plays):
+                t0 = time.perf_counter()
+                channel.play(sample)
+                samples.append((time.perf_counter() - t0) * 1000)
+                channel.stop()
+            play_ms[name] = {
+                "mean": round(statistics.mean(samples), 3),
+                "max": round(max(samples), 3),
+            }
+
+        # Karıştırıcı: müzik çalarken tek bir kısma geçişi
+        music = engine.channels["music"]
+        music.play(sample)
+        done = threading.Event()
+        fade_started = time.perf_counter()
+        engine.mixer.fade(music, 0.2, FADE_SECONDS, on_done=done.set)
+        done.wait(FADE_SECONDS * 5)
+        fade_ms = (time.perf_counter() - fade_started) * 1000
+        music.stop()
+
+    result = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "vlc_mocked": isinstance(sys.modules.get("vlc"), MagicMock),
+        "plays_per_channel": plays,
+        "startup_ms": round(startup_ms, 1),
+        "play_ms": play_ms,
+        "fade": {"seconds": FADE_SECONDS, "elapsed_ms": round(fade_ms, 1)},
+        "mixer": engine.mixer.get_status(),
+        "rss_kb": {"before": rss_before, "after_startup": rss_startup, "after_plays": rss_kb()},
+        "vlc": vlc_runtime.get_stats(),
+    }
+    engine.stop_all()
+    manual.stop()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SmartZill ses motoru ölçümü")
+    parser.add_argument("--plays", type=int, default=DEFAULT_PLAYS, help="Kanal başına çalma sayısı")
+    parser.add_argument("--mock", action="store_true", help="VLC yerine sahte modül kullan")
+    parser.add_argument("--output", help="JSON çıktı dosyası (varsayılan: stdout)")
+    args = parser.parse_args()
+
+    text = json.dumps(run(args.plays), ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
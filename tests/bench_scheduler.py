@@ -0,0 +1,250 @@
+"""
+NikolayCo SmartZill v2.0 - Zamanlayıcı Performans Ölçümü
+
+Sentetik haftalık programlarla (gün başına tam 10, 1.000, 50.000 olay; ara anonslar
+ve doğum günleri bu sayıya dahil, tatiller ayrıca) zamanlayıcının sıcak yollarını
+sanal saatle ölçer ve sonucu JSON olarak yazar. Sürümler arası karşılaştırma için:
+
+    python tests/bench_scheduler.py > bench.json
+    python tests/bench_scheduler.py --sizes 10,1000 --output bench.json
+
+Dosya adı test_ ile başlamadığı için pytest tarafından toplanmaz.
+"""
+import sys
+import os
+import json
+import argparse
+import contextlib
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, date, timedelta
+from unittest.mock import MagicMock, patch
+
+# VLC kurulu olmasa da çalışsın (test_playlist_logic ile aynı yöntem)
+sys.modules.setdefault('vlc', MagicMock())
+
+# Proje yolunu ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from core.scheduler import SchedulerService
+from core.timeline import format_minute, MINUTES_PER_DAY
+
+DEFAULT_SIZES = (10, 1000, 50000)
+# Her etkinlik: başlangıç + bitiş + ara anonslar
+INTERIM_PER_ACTIVITY = 3
+EVENTS_PER_ACTIVITY = 2 + INTERIM_PER_ACTIVITY
+# Ölçüm günü (Pazartesi) ve etrafındaki tatiller
+BENCH_DAY = date(2026, 1, 5)
+HOLIDAYS = {BENCH_DAY + timedelta(days=1), BENCH_DAY + timedelta(days=3)}
+BIRTHDAY_NAMES = [f"Kişi {i}" for i in range(20)]
+# Olayların en fazla bu kadarı doğum günüdür (10 olaylı günde 1 doğum günü)
+BIRTHDAY_SHARE = 10
+# add_activity ölçümü için boş bırakılan saat (23:00 sonrası)
+FREE_FROM = 23 * 60
+
+
+class FakeAudioSink:
+    """Sesleri çalmak yerine sayan ses çıkışı"""
+
+    def __init__(self):
+        self.counts = {}
+
+    def __call__(self, kind: str):
+        def play(*args):
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+        return play
+
+
+class BenchScheduler(SchedulerService):
+    """Sanal saatli, beklemesiz zamanlayıcı"""
+
+    def __init__(self, sink: FakeAudioSink, birthdays: list):
+        super().__init__()
+        self.verbose = False
+        self.clock = datetime.combine(BENCH_DAY, datetime.min.time())
+        self.on_bell = sink("bell")
+        self.on_announcement = sink("announcement")
+        self.on_music_start = sink("music_start")
+        self.on_music_stop = sink("music_stop")
+        self.on_prepare = sink("prepare")
+        self._play_birthday = sink("birthday")
+        self.holiday_checker = lambda day: day in HOLIDAYS
+        self.birthday_roster = lambda day: [("09:45", birthdays)]
+
+    def _now(self) -> datetime:
+        return self.clock
+
+    def _pause(self, seconds: float):
+        pass
+
+
+def birthday_names(events_per_day: int) -> list:
+    """Gün başına olay sayısına dahil edilen doğum günü isimleri"""
+    return BIRTHDAY_NAMES[:max(1, min(len(BIRTHDAY_NAMES), events_per_day // BIRTHDAY_SHARE))]
+
+
+def make_schedule(activity_events: int) -> list:
+    """Her gün tam activity_events etkinlik olaylı sentetik program (23:00 sonrası boş)"""
+    full, rest = divmod(activity_events, EVENTS_PER_ACTIVITY)
+    # Etkinlik başına ara anons sayısı; artan olaylar kısa bir etkinlik veya ilk etkinliğe ek anons olur
+    interims = [INTERIM_PER_ACTIVITY] * full
+    if rest >= 2 or not interims:
+        interims.append(max(0, rest - 2))
+    elif rest == 1:
+        interims[0] += 1
+    activities_per_day = len(interims)
+    span = FREE_FROM - 6 * 60
+    schedule = []
+    for dow in range(7):
+        activities = []
+        for i in range(activities_per_day):
+            start = 6 * 60 + (i * span) // activities_per_day
+            end = min(start + max(1, span // activities_per_day), FREE_FROM - 1)
+            activities.append({
+                "id": f"d{dow}_a{i}", "name": f"Etkinlik {i}",
+                "startTime": format_minute(start), "endTime": format_minute(max(end, start + 1)),
+                "startSoundId": "bell1.mp3", "endSoundId": "bell2.mp3",
+                "playMusic": i % 2 == 0,
+                "announcements": [
+                    {"time": format_minute(min(start + k, MINUTES_PER_DAY - 1)), "soundId": f"ann{k}.mp3"}
+                    for k in range(interims[i])
+                ]
+            })
+        schedule.append({"dayOfWeek": dow, "enabled": True, "activities": activities})
+    return schedule
+
+
+def summarize(samples: list) -> dict:
+    """Süre örneklerini (saniye) mikrosaniye özetine çevirir"""
+    ordered = sorted(samples)
+    return {
+        "n": len(samples),
+        "mean_us": round(statistics.fmean(samples) * 1e6, 2),
+        "p50_us": round(ordered[len(ordered) // 2] * 1e6, 2),
+        "p95_us": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1e6, 2),
+        "max_us": round(ordered[-1] * 1e6, 2),
+    }
+
+
+def timed(func, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def bench_size(events_per_day: int, repeat: int) -> dict:
+    sink = FakeAudioSink()
+    birthdays = birthday_names(events_per_day)
+    schedule = make_schedule(events_per_day - len(birthdays))
+    scheduler = BenchScheduler(sink, birthdays)
+    scheduler.update_schedule(schedule)
+    day_start = datetime.combine(BENCH_DAY, datetime.min.time())
+    compiled = len(scheduler._get_timeline(BENCH_DAY).events)
+    if compiled != events_per_day:
+        raise RuntimeError(f"Ölçüm günü {compiled} olay içeriyor, beklenen {events_per_day}")
+    result = {"events_per_day": compiled, "birthdays": len(birthdays)}
+
+    # Gün derleme (cache boşken)
+    def compile_day():
+        scheduler.invalidate_timelines()
+        scheduler._get_timeline(BENCH_DAY)
+    result["compile_day"] = timed(compile_day, max(1, repeat // 10))
+
+    # Tüm gün dakika dakika tick (olaylar çalınır)
+    scheduler.invalidate_timelines()
+    scheduler._last_processed = None
+    samples = []
+    for minute in range(MINUTES_PER_DAY):
+        scheduler.clock = day_start + timedelta(minutes=minute)
+        start = time.perf_counter()
+        scheduler._tick()
+        samples.append(time.perf_counter() - start)
+    result["tick_day"] = summarize(samples)
+    result["fired"] = dict(sink.counts)
+
+    # Aynı dakika içinde boş tick (çalınacak olay yok)
+    scheduler.clock = day_start + timedelta(hours=12, seconds=30)
+    result["tick_idle"] = timed(scheduler._tick, repeat)
+
+    # Sonraki etkinlik (gün içi ve gün sonrası, tatiller atlanarak)
+    scheduler.clock = day_start + timedelta(hours=12)
+    result["find_next_event"] = timed(lambda: scheduler._find_next_event(scheduler.clock), repeat)
+    scheduler.clock = day_start + timedelta(hours=23, minutes=30)
+    result["find_next_event_next_day"] = timed(lambda: scheduler._find_next_event(scheduler.clock), repeat)
+
+    # Günlük çizelge (sanal saatin günü: BENCH_DAY)
+    result["get_daily_timeline"] = timed(scheduler.get_daily_timeline, max(1, repeat // 10))
+
+    # Etkinlik ekleme (çakışma kontrolü dahil), her seferinde geri silinir
+    samples = []
+    for n in range(max(1, repeat // 10)):
+        activity_id = f"bench_{n}"
+        start = time.perf_counter()
+        added = scheduler.add_activity(0, {"id": activity_id, "name": "Ek",
+                                           "startTime": "23:10", "endTime": "23:20"})
+        samples.append(time.perf_counter() - start)
+        if added:
+            scheduler.remove_activity(0, activity_id)
+    result["add_activity"] = summarize(samples)
+    result["add_activity_conflict"] = timed(
+        lambda: scheduler.add_activity(0, {"id": "x", "startTime": "12:00", "endTime": "12:30"}),
+        max(1, repeat // 10))
+
+    # Bellek: program + bir günün derlenmiş çizelgesi
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    measured = BenchScheduler(FakeAudioSink(), birthdays)
+    measured.update_schedule(make_schedule(events_per_day - len(birthdays)))
+    measured._get_timeline(BENCH_DAY)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result["memory"] = {
+        "retained_kb": round(sum(s.size_diff for s in after.compare_to(before, "filename")) / 1024, 1),
+        "peak_kb": round(peak / 1024, 1),
+    }
+    return result
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description="Zamanlayıcı performans ölçümü (JSON çıktı)")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Gün başına olay sayıları, virgülle ayrılmış")
+    parser.add_argument("--repeat", type=int, default=200, help="Ölçüm tekrar sayısı")
+    parser.add_argument("--output", help="JSON dosyası (verilmezse stdout)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    # Program dosyalarına yazılmaz; zamanlayıcı logları JSON çıktısına karışmaz
+    with patch("core.scheduler.load_schedule", side_effect=lambda zone_id=None, data_dir=None: []), \
+            patch("core.scheduler.append_schedule_journal", return_value=0), \
+            patch("core.scheduler.save_schedule"), \
+            contextlib.redirect_stdout(sys.stderr):
+        results = [bench_size(size, args.repeat) for size in sizes]
+
+    report = {
+        "benchmark": "scheduler",
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+import sys
+import os
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+# VLC kurulu olmasa da çalışsın
+sys.modules.setdefault('vlc', MagicMock())
+
+# Proje yolunu ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+
+class TestChannelCompletion(unittest.TestCase):
+
+    def setUp(self):
+        """Çalıyor durumunda bir kanal (bitiş olayı elle tetiklenir)"""
+        # Toplama sırasında import edilmez: test_playlist_logic kendi VLC mock'unu kurar
+        from core import audio_engine
+        self.audio_engine = audio_engine
+        self.channel = audio_engine.AudioChannel("test")
+        self.channel.player = MagicMock()
+        self.channel.player.get_state.return_value = audio_engine.vlc.State.Playing
+        self.channel.finished = threading.Event()
+
+    def _later(self, func, delay: float = 0.05):
+        timer = threading.Timer(delay, func)
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+    def test_end_event_wakes_waiter(self):
+        """Bitiş olayı bekleyeni kontrol aralığını beklemeden uyandırır"""
+        self._later(lambda: self.channel._on_track_end(None))
+        started = time.monotonic()
+        self.assertTrue(self.channel.wait(timeout=2))
+        self.assertLess(time.monotonic() - started, self.audio_engine.COMPLETION_CHECK_INTERVAL)
+
+    def test_stop_and_error_wake_waiter(self):
+        """Durdurma ve oynatma hatası da çalmayı bitmiş sayar"""
+        self._later(self.channel.stop)
+        self.assertTrue(self.channel.wait(timeout=2))
+
+        self.channel.player = MagicMock()
+        self.channel.player.get_state.return_value = self.audio_engine.vlc.State.Playing
+        self.channel.finished = threading.Event()
+        self._later(lambda: self.channel._on_track_error(None))
+        self.assertTrue(self.channel.wait(timeout=2))
+
+    def test_wait_times_out(self):
+        """Süre dolarsa False döner"""
+        self.assertFalse(self.channel.wait(timeout=0.05))
+
+
+if __name__ == '__main__':
+    unittest.main()
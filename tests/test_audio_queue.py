@@ -0,0 +1,169 @@
+import sys
+import os
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+# VLC kurulu olmasa da çalışsın
+sys.modules.setdefault('vlc', MagicMock())
+
+# Proje yolunu ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from core.audio_queue import AudioQueue, KIND_PROGRAM
+
+
+class FakeChannel:
+    """stop() çağrılınca çalan isteği bitiren kanal"""
+
+    def __init__(self):
+        self.stopped = threading.Event()
+
+    def stop(self):
+        self.stopped.set()
+
+
+class FakeEngine:
+    """Çalınanları sırayla kaydeden ses motoru"""
+
+    def __init__(self):
+        self.channels = {"bell": FakeChannel(), "announcement": FakeChannel(), "music": FakeChannel()}
+        self.played = []
+        self.all_played = threading.Event()
+        self.expected = 0
+
+    def _record(self, item):
+        self.played.append(item)
+        if len(self.played) >= self.expected:
+            self.all_played.set()
+
+    def play_bell(self, filename, blocking=True):
+        self._record(("bell", filename))
+
+    def play_announcement(self, filename, blocking=True):
+        self._record(("announcement", filename))
+        channel = self.channels["announcement"]
+        # Kesilme testinde ilk anons susturulana kadar çalar
+        if filename == "uzun.mp3" and not channel.stopped.is_set():
+            channel.stopped.wait(2)
+
+    def play_program(self, steps, cancel=None):
+        self._record(("program", tuple(tuple(step) for step in steps)))
+
+
+class TestAudioQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = FakeEngine()
+        self.queue = AudioQueue(self.engine)
+        # İşçiyi meşgul eden istek: gate açılana kadar çalar
+        self.gate = threading.Event()
+        self.busy = threading.Event()
+
+    def tearDown(self):
+        self.gate.set()
+
+    def _hold_worker(self):
+        def hold(request):
+            self.busy.set()
+            self.gate.wait(2)
+        self.queue.submit(KIND_PROGRAM, "hold", hold)
+        self.assertTrue(self.busy.wait(2))
+
+    def test_priority_order_and_coalescing(self):
+        """Bekleyenler öncelik sırasıyla çalınır; aynı istek bir kez çalınır"""
+        self._hold_worker()
+        music = MagicMock(side_effect=lambda: self.engine._record(("music", "break")))
+        self.engine.expected = 3
+        self.queue.music(music)
+        self.queue.announcement("a.mp3")
+        self.queue.bell("zil.mp3")
+        self.queue.bell("zil.mp3")
+        self.gate.set()
+        self.assertTrue(self.engine.all_played.wait(2))
+        self.assertEqual(self.engine.played, [("bell", "zil.mp3"), ("announcement", "a.mp3"), ("music", "break")])
+        status = self.queue.get_status()
+        self.assertEqual((status["coalesced"], status["submitted"]), (1, 4))
+
+    def test_bell_preempts_announcement_and_requeues_it(self):
+        """Zil çalan anonsu keser; anons zilden sonra baştan çalınır"""
+        self.engine.expected = 3
+        self.queue.announcement("uzun.mp3")
+        for _ in range(200):
+            if self.engine.played:
+                break
+            time.sleep(0.01)
+        self.queue.bell("zil.mp3", wait=True)
+        self.assertTrue(self.engine.all_played.wait(2))
+        self.assertEqual(self.engine.played, [("announcement", "uzun.mp3"), ("bell", "zil.mp3"),
+                                              ("announcement", "uzun.mp3")])
+        status = self.queue.get_status()
+        self.assertEqual((status["preempted"], status["requeued"]), (1, 1))
+
+    def test_program_preempts_announcement_and_requeues_it(self):
+        """Zamanlanmış zil (program) çalan anonsu keser; anons programdan sonra baştan çalınır"""
+        self.engine.expected = 3
+        self.queue.announcement("uzun.mp3")
+        for _ in range(200):
+            if self.engine.played:
+                break
+            time.sleep(0.01)
+        self.queue.program([["bell", "zil.mp3"]], wait=True)
+        self.assertTrue(self.engine.all_played.wait(2))
+        self.assertEqual(self.engine.played, [("announcement", "uzun.mp3"),
+                                              ("program", (("bell", "zil.mp3"),)),
+                                              ("announcement", "uzun.mp3")])
+        status = self.queue.get_status()
+        self.assertEqual((status["preempted"], status["requeued"]), (1, 1))
+
+    def test_bounded_depth_drops_lowest_priority(self):
+        """Kuyruk doluyken zil en yeni anonsun yerini alır; daha düşük öncelikli istek reddedilir"""
+        self.queue.depth = 2
+        self._hold_worker()
+        self.assertTrue(self.queue.announcement("a.mp3"))
+        self.assertTrue(self.queue.announcement("b.mp3"))
+        self.assertTrue(self.queue.bell("zil.mp3"))
+        self.assertFalse(self.queue.announcement("c.mp3"))
+        status = self.queue.get_status()
+        self.assertEqual((status["dropped"], status["rejected"], status["depth"]), (1, 1, 2))
+
+
+class TestMusicStopCancelsQueuedStart(unittest.TestCase):
+
+    def setUp(self):
+        # Toplama sırasında import edilmez: test_playlist_logic kendi VLC mock'unu kurar
+        from core.audio_engine import AudioEngine
+        self.engine = AudioEngine()
+        self.gate = threading.Event()
+
+    def tearDown(self):
+        self.gate.set()
+
+    def test_stop_music_drops_pending_start(self):
+        """Zil sürerken gelen müzik başlatma, arada müzik durdurulursa çalışmaz"""
+        busy = threading.Event()
+
+        def hold(request):
+            busy.set()
+            self.gate.wait(2)
+
+        self.engine.queue.submit(KIND_PROGRAM, "hold", hold)
+        self.assertTrue(busy.wait(2))
+        start = MagicMock()
+        self.assertTrue(self.engine.queue.music(start))
+        self.engine.stop_music()
+
+        done = threading.Event()
+        # Aynı öncelikte sonra eklenen istek: işlendiyse öncekinin sırası geçmiştir
+        self.engine.queue.music(done.set, key="after")
+        self.gate.set()
+        self.assertTrue(done.wait(2))
+        start.assert_not_called()
+        self.assertEqual(self.engine.queue.get_status()["dropped"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import sys
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, date
+from pathlib import Path
+from unittest.mock import patch
+
+# Proje yolunu ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from core.scheduler import SchedulerService
+from core.ledger import FiredLedger
+
+
+def make_schedule():
+    """Sadece Pazartesi 09:00-10:00 tek etkinlik"""
+    schedule = [{"dayOfWeek": i, "enabled": i == 0, "activities": []} for i in range(7)]
+    schedule[0]["activities"].append({
+        "id": "a1", "name": "Vardiya", "startTime": "09:00", "endTime": "10:00",
+        "startSoundId": "bell1.mp3"
+    })
+    return schedule
+
+
+class TestFiredLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ledger_file = Path(self.tmp.name) / "schedule.fired"
+        self.patchers = [
+            patch("core.scheduler.get_fired_ledger_file", lambda zone_id=None, data_dir=None: self.ledger_file),
+            patch("core.scheduler.load_schedule", side_effect=lambda zone_id=None, data_dir=None: make_schedule()),
+            patch("core.scheduler.append_schedule_journal", return_value=0),
+        ]
+        for p in self.patchers:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patchers:
+            p.stop()
+        self.tmp.cleanup()
+
+    def _restart(self, when: datetime):
+        """Yeni süreç gibi: defteri açar ve verilen anda bir tick çalıştırır"""
+        scheduler = SchedulerService()
+        scheduler.verbose = False
+        bells = []
+        scheduler.on_bell = bells.append
+        with patch.object(scheduler, "_now", return_value=when):
+            scheduler._open_ledger()
+            scheduler._tick()
+        return scheduler, bells
+
+    def test_restart_within_minute_does_not_ring_again(self):
+        """Aynı dakika içinde yeniden başlatma zili tekrar çalmaz"""
+        _, bells = self._restart(datetime(2026, 1, 5, 9, 0, 10))
+        self.assertEqual(bells, ["bell1.mp3"])
+        _, bells = self._restart(datetime(2026, 1, 5, 9, 0, 40))
+        self.assertEqual(bells, [])
+
+    def test_downtime_events_recovered_within_grace(self):
+        """Kapalıyken geçen olay, tolerans içindeyse açılışta çalınır"""
+        scheduler, bells = self._restart(datetime(2026, 1, 5, 8, 58, 0))
+        self.assertEqual(bells, [])
+        scheduler.ledger.mark_processed(scheduler._last_processed)
+
+        scheduler, bells = self._restart(datetime(2026, 1, 5, 9, 1, 30))
+        self.assertEqual(bells, ["bell1.mp3"])
+        self.assertEqual(scheduler.replayed_count, 1)
+
+    def test_start_delivers_pending_catch_up_to_wired_callback(self):
+        """Yeniden başlatmada telafi olayı start() sonrası bağlı callback'e ulaşır"""
+        FiredLedger(self.ledger_file).mark_processed(datetime(2026, 1, 5, 8, 58))
+        scheduler = SchedulerService()
+        scheduler.verbose = False
+        scheduler.startup_delay = 0
+        rung = threading.Event()
+        bells = []
+        scheduler.on_bell = lambda f: (bells.append(f), rung.set())
+        with patch.object(scheduler, "_now", return_value=datetime(2026, 1, 5, 9, 1, 30)):
+            scheduler.start()
+            try:
+                self.assertTrue(rung.wait(2))
+            finally:
+                scheduler.stop()
+        self.assertEqual(bells, ["bell1.mp3"])
+        fired, _ = FiredLedger(self.ledger_file).load()
+        self.assertEqual(fired, {date(2026, 1, 5): {"a1_start"}})
+
+    def test_prune_keeps_recent_days_and_last_processed(self):
+        """Eski günler atılır, son işlenen dakika korunur"""
+        ledger = FiredLedger(self.ledger_file)
+        ledger.record(date(2026, 1, 1), [("a1_start", "start")], datetime(2026, 1, 1, 9, 0))
+        ledger.record(date(2026, 1, 5), [("a1_start", "start")], datetime(2026, 1, 5, 9, 0))
+        ledger.mark_processed(datetime(2026, 1, 5, 9, 30))
+        ledger.prune(date(2026, 1, 3))
+
+        fired, processed = ledger.load()
+        self.assertEqual(fired, {date(2026, 1, 5): {"a1_start"}})
+        self.assertEqual(processed, datetime(2026, 1, 5, 9, 30))
+        self.assertEqual(len(self.ledger_file.read_text(encoding="utf-8").splitlines()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import sys
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime, date
+from pathlib import Path
+from unittest.mock import patch
+
+# Proje yolunu ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from core.scheduler import SchedulerService
+from services.ha import HAService
+
+
+def make_schedule():
+    """Pazartesi 09:00 zil, 09:20 ara anons"""
+    schedule = [{"dayOfWeek": i, "enabled": i == 0, "activities": []} for i in range(7)]
+    schedule[0]["activities"].append({
+        "id": "a1", "name": "Ders", "startTime": "09:00", "endTime": "09:40",
+        "startSoundId": "bell1.mp3", "announcements": [{"time": "09:20", "soundId": "isg.mp3"}]
+    })
+    return schedule
+
+
+class TestHAService(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patchers = [
+            patch("core.scheduler.append_schedule_journal", return_value=0),
+            patch("services.ha.load_config", return_value={}),
+        ]
+        for p in self.patchers:
+            p.start()
+        self.now = 1000.0
+        self.fired = []
+        self.nodes = {}
+        for node_id in ("kutu1", "kutu2"):
+            scheduler = SchedulerService()
+            scheduler.update_schedule(make_schedule())
+            scheduler.on_bell = lambda f, n=node_id: self.fired.append((n, f))
+            scheduler.on_announcement = lambda f, n=node_id: self.fired.append((n, f))
+            ha = HAService()
+            ha.enabled = True
+            ha.node_id = node_id
+            ha.lease_file = Path(self.tmp.name) / "lease.json"
+            ha.clock = lambda: self.now
+            ha.schedulers = lambda s=scheduler: [s]
+            ha.prepare_scheduler(scheduler)
+            self.nodes[node_id] = (ha, scheduler)
+
+    def tearDown(self):
+        for p in self.patchers:
+            p.stop()
+        self.tmp.cleanup()
+
+    def _tick(self, node_id: str, when: datetime):
+        scheduler = self.nodes[node_id][1]
+        with patch.object(scheduler, "_now", return_value=when):
+            scheduler._tick()
+
+    def test_only_leader_fires(self):
+        """Kirayı alan lider olur, yedek olay çalmaz"""
+        ha1, s1 = self.nodes["kutu1"]
+        ha2, s2 = self.nodes["kutu2"]
+        ha1._renew()
+        ha2._renew()
+        self.assertTrue(ha1.is_leader)
+        self.assertFalse(ha2.is_leader)
+        self.assertTrue(s2.standby)
+        self._tick("kutu1", datetime(2026, 1, 5, 9, 0, 0))
+        self._tick("kutu2", datetime(2026, 1, 5, 9, 0, 0))
+        self.assertEqual(self.fired, [("kutu1", "bell1.mp3")])
+        self.assertEqual(s2.fired_events, {})
+        # Yedek sonraki etkinliği yine de takip eder
+        self.assertEqual(s2.next_event["time"], "09:40")
+
+    def test_takeover_without_duplicate_or_miss(self):
+        """Lider düşünce yedek kira süresi dolunca devralır, çalınanı tekrar çalmaz"""
+        ha1, s1 = self.nodes["kutu1"]
+        ha2, s2 = self.nodes["kutu2"]
+        ha1._renew()
+        ha2._renew()
+        self._tick("kutu1", datetime(2026, 1, 5, 9, 0, 0))
+
+        # kutu1 çöktü: kira yenilenmiyor
+        self.now += 1.0
+        ha2._renew()
+        self.assertFalse(ha2.is_leader)
+        self.now += ha2.lease_seconds
+        ha2._renew()
+        self.assertTrue(ha2.is_leader)
+        self.assertFalse(s2.standby)
+        self.assertEqual(ha2.takeovers, 1)
+
+        self._tick("kutu2", datetime(2026, 1, 5, 9, 0, 3))
+        self._tick("kutu2", datetime(2026, 1, 5, 9, 20, 0))
+        self.assertEqual(self.fired, [("kutu1", "bell1.mp3"), ("kutu2", "isg.mp3")])
+
+    def test_released_lease_taken_immediately(self):
+        """Düzgün kapanan lider kirayı bırakır, yedek beklemeden devralır"""
+        ha1, s1 = self.nodes["kutu1"]
+        ha2, s2 = self.nodes["kutu2"]
+        ha1._renew()
+        ha1.release()
+        self.assertTrue(s1.standby)
+        ha2._renew()
+        self.assertTrue(ha2.is_leader)
+        # Eski lider geri geldiğinde yedek kalır
+        ha1._renew()
+        self.assertFalse(ha1.is_leader)
+
+    def test_renew_writes_state_only_when_changed(self):
+        """Kira yenilemesi kalp atışıdır; bölge durumu yalnızca değişince yazılır"""
+        ha1, s1 = self.nodes["kutu1"]
+        ha1._renew()
+        with patch.object(ha1, "_write_state", wraps=ha1._write_state) as write_state:
+            ha1._renew()
+            ha1._renew()
+            ha1._renew()
+            self.assertEqual(write_state.call_count, 1)
+            # Tetikleme anında (on_fired) ve işlenen dakika ilerleyince birer kez
+            self._tick("kutu1", datetime(2026, 1, 5, 9, 0, 0))
+            ha1._renew()
+            self.assertEqual(write_state.call_count, 3)
+            ha1._renew()
+            self.assertEqual(write_state.call_count, 3)
+        self.assertNotIn("zones", ha1._read_lease())
+        self.assertEqual(ha1._read_state()["default"]["fired"], {"2026-01-05": ["a1_start"]})
+
+    def test_start_keeps_taken_over_minute(self):
+        """Devralınan son işlenen dakika start() ile sıfırlanmaz; aradaki zil telafi edilir"""
+        ha1, s1 = self.nodes["kutu1"]
+        ha2, s2 = self.nodes["kutu2"]
+        ha1._renew()
+        ha2._renew()
+        self._tick("kutu1", datetime(2026, 1, 5, 8, 59, 50))
+        ha1._renew()
+
+        # kutu1 çöktü; kutu2 devralıp bölgelerini başlatır
+        self.now += ha2.lease_seconds + 1
+        ha2._renew()
+        self.assertTrue(ha2.is_leader)
+        s2.verbose = False
+        s2.startup_delay = 0
+        ledger_file = Path(self.tmp.name) / "kutu2.fired"
+        with patch("core.scheduler.get_fired_ledger_file", return_value=ledger_file), \
+                patch("core.scheduler.save_schedule"), \
+                patch.object(s2, "_now", return_value=datetime(2026, 1, 5, 9, 1, 10)):
+            s2.start()
+            try:
+                for _ in range(200):
+                    if self.fired:
+                        break
+                    time.sleep(0.01)
+            finally:
+                s2.stop()
+        self.assertEqual(self.fired, [("kutu2", "bell1.mp3")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import sys
+import os
+import random
+import unittest
+from unittest.mock import patch
+
+# Proje yolunu ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from core.intervals import ActivityIndex, activity_spans
+from core.scheduler import SchedulerService
+from core.timeline import parse_hhmm
+
+
+def activity(activity_id: str, start: str, end: str) -> dict:
+    return {"id": activity_id, "name": activity_id, "startTime": start, "endTime": end}
+
+
+class TestActivityIndex(unittest.TestCase):
+
+    def test_overlap_queries(self):
+        """Çakışan aralıklar bulunur, uç uca aralıklar çakışma sayılmaz"""
+        index = ActivityIndex([activity("b", "10:00", "10:40"), activity("a", "09:00", "09:40"),
+                               activity("uzun", "08:00", "12:00")])
+        found = index.overlaps(parse_hhmm("09:30"), parse_hhmm("10:10"))
+        self.assertEqual([a["id"] for a in found], ["uzun", "a", "b"])
+        index = ActivityIndex([activity("a", "09:00", "09:40"), activity("b", "10:00", "10:40")])
+        self.assertEqual(index.overlaps(parse_hhmm("09:40"), parse_hhmm("10:00")), [])
+
+    def test_insert_keeps_order(self):
+        """Eklenen aralık sonraki sorgularda görülür"""
+        index = ActivityIndex([activity("a", "09:00", "09:40")])
+        index.insert(parse_hhmm("08:00"), parse_hhmm("08:30"), activity("c", "08:00", "08:30"))
+        self.assertEqual(len(index), 2)
+        self.assertEqual([a["id"] for a in index.overlaps(0, 24 * 60)], ["c", "a"])
+
+    def test_midnight_wrapped_spans(self):
+        """Gece yarısını geçen etkinlik iki parçaya bölünür ve tek sonuç olarak bulunur"""
+        self.assertEqual(activity_spans(activity("gece", "22:00", "06:00")), [(1320, 1440), (0, 360)])
+        self.assertEqual(activity_spans(activity("gece", "22:00", "00:00")), [(1320, 1440)])
+        self.assertIsNone(activity_spans(activity("bos", "10:00", "10:00")))
+        index = ActivityIndex([activity("a", "09:00", "10:00"), activity("gece", "22:00", "06:00")])
+        self.assertEqual([a["id"] for a in index.overlaps(parse_hhmm("05:00"), parse_hhmm("07:00"))], ["gece"])
+        self.assertEqual([a["id"] for a in index.overlaps(parse_hhmm("23:00"), parse_hhmm("23:30"))], ["gece"])
+        self.assertEqual([a["id"] for a in index.overlaps(0, 24 * 60)], ["gece", "a"])
+
+    def test_matches_linear_scan(self):
+        """Çakışan eski kayıtlarla da sonuç tüm etkinlikleri taramakla aynıdır"""
+        rng = random.Random(7)
+        spans = []
+        index = ActivityIndex()
+        for i in range(200):
+            start = rng.randrange(0, 24 * 60 - 1)
+            end = rng.randrange(start + 1, min(start + 180, 24 * 60) + 1)
+            spans.append((start, end, str(i)))
+            index.insert(start, end, {"id": str(i)})
+        for _ in range(200):
+            start = rng.randrange(0, 24 * 60 - 1)
+            end = rng.randrange(start + 1, 24 * 60 + 1)
+            expected = [i for s, e, i in spans if s < end and e > start]
+            self.assertEqual(sorted(a["id"] for a in index.overlaps(start, end)), sorted(expected))
+
+
+class TestBulkActivities(unittest.TestCase):
+
+    def setUp(self):
+        self.patchers = [
+            patch("core.scheduler.append_schedule_journal", return_value=0),
+            patch("core.scheduler.load_schedule",
+                  side_effect=lambda zone_id=None, data_dir=None: [{"dayOfWeek": i, "enabled": True, "activities": []}
+                                                    for i in range(7)]),
+        ]
+        self.journal = self.patchers[0].start()
+        self.patchers[1].start()
+        self.scheduler = SchedulerService()
+        self.scheduler.add_activity(0, activity("mevcut", "12:00", "13:00"))
+        self.journal.reset_mock()
+
+    def tearDown(self):
+        for p in self.patchers:
+            p.stop()
+
+    def test_bulk_insert_single_write(self):
+        """Toplu ekleme tek günlük kaydı ile yazılır ve sıralanır"""
+        batch = [activity(f"d{h}", f"{h:02d}:00", f"{h:02d}:40") for h in (15, 8, 10, 9)]
+        result = self.scheduler.add_activities(0, batch)
+        self.assertTrue(result["success"])
+        self.assertEqual((result["added"], result["conflicts"]), (4, []))
+        self.assertEqual(self.journal.call_count, 1)
+        times = [a["startTime"] for a in self.scheduler.get_schedule()[0]["activities"]]
+        self.assertEqual(times, ["08:00", "09:00", "10:00", "12:00", "15:00"])
+
+    def test_all_conflicts_reported_and_nothing_added(self):
+        """Tüm çakışmalar birlikte raporlanır, hiçbir etkinlik eklenmez"""
+        batch = [
+            activity("ok", "08:00", "08:40"),
+            activity("x", "12:30", "13:30"),     # mevcut ile çakışıyor
+            activity("y", "09:00", "10:00"),
+            activity("z", "09:30", "09:50"),     # y ile çakışıyor
+            activity("bozuk", "11:00", "11:00"),
+        ]
+        result = self.scheduler.add_activities(0, batch)
+        self.assertFalse(result["success"])
+        self.assertEqual([(c["index"], c["reason"]) for c in result["conflicts"]],
+                         [(1, "overlap"), (3, "overlap"), (4, "invalid_time")])
+        self.assertEqual(result["conflicts"][0]["with"]["id"], "mevcut")
+        self.assertEqual(result["conflicts"][1]["with"]["id"], "y")
+        self.assertEqual(len(self.scheduler.get_schedule()[0]["activities"]), 1)
+        self.journal.assert_not_called()
+
+    def test_single_add_rejects_overlap(self):
+        """Tekli ekleme de dizini kullanır"""
+        self.assertFalse(self.scheduler.add_activity(0, activity("x", "11:30", "12:01")))
+        self.assertTrue(self.scheduler.add_activity(0, activity("x", "11:30", "12:00")))
+        self.assertFalse(self.scheduler.add_activity(0, activity("x2", "11:45", "11:50")))
+
+    def test_midnight_crossing_activity_accepted(self):
+        """Gece yarısını geçen etkinlik eklenir; her iki parçasıyla çakışma kontrol edilir"""
+        self.assertTrue(self.scheduler.add_activity(0, activity("gece", "23:00", "07:00")))
+        self.assertFalse(self.scheduler.add_activity(0, activity("sabah", "06:30", "07:30")))
+        self.assertFalse(self.scheduler.add_activity(0, activity("aksam", "22:30", "23:30")))
+        self.assertTrue(self.scheduler.add_activity(0, activity("sabah", "07:00", "08:00")))
+        result = self.scheduler.add_activities(1, [activity("g1", "22:00", "02:00"), activity("g2", "23:00", "01:00")])
+        self.assertEqual([(c["index"], c["with"]["id"]) for c in result["conflicts"]], [(1, "g1")])
+
+
+if __name__ == '__main__':
+    unittest.main()
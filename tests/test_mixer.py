@@ -0,0 +1,109 @@
+import sys
+import os
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+# VLC kurulu olmasa da çalışsın
+sys.modules.setdefault('vlc', MagicMock())
+
+# Proje yolunu ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from core.mixer import Mixer
+
+
+class FakeChannel:
+    """Uygulanan kazançları kaydeden kanal"""
+
+    def __init__(self, gain: float = 1.0):
+        self.gain = gain
+        self.applied = []
+
+    def set_gain(self, gain: float):
+        self.gain = gain
+        self.applied.append(gain)
+
+
+class TestMixer(unittest.TestCase):
+
+    def test_fade_ramps_to_target_and_calls_done(self):
+        """Geçiş adım adım hedefe iner ve bitince on_done çağrılır"""
+        mixer = Mixer(interval=0.005)
+        channel = FakeChannel()
+        done = threading.Event()
+        mixer.fade(channel, 0.2, 0.1, on_done=done.set)
+        self.assertTrue(done.wait(2))
+        self.assertAlmostEqual(channel.gain, 0.2)
+        self.assertGreater(len(channel.applied), 3)
+        self.assertEqual(channel.applied, sorted(channel.applied, reverse=True))
+        status = mixer.get_status()
+        self.assertEqual((status["completed"], status["active"]), (1, 0))
+
+    def test_new_fade_replaces_running_one(self):
+        """Yeni geçiş eskisini iptal eder; eskisinin on_done'u çağrılmaz"""
+        mixer = Mixer(interval=0.005)
+        channel = FakeChannel()
+        stopped = MagicMock()
+        mixer.fade(channel, 0.0, 5, on_done=stopped)
+        done = threading.Event()
+        mixer.fade(channel, 1.0, 0.05, on_done=done.set)
+        self.assertTrue(done.wait(2))
+        stopped.assert_not_called()
+        self.assertEqual(channel.gain, 1.0)
+        self.assertEqual(mixer.get_status()["cancelled"], 1)
+
+
+class TestEngineFades(unittest.TestCase):
+
+    def setUp(self):
+        # Toplama sırasında import edilmez: test_playlist_logic kendi VLC mock'unu kurar
+        from core.audio_engine import AudioEngine
+        self.engine = AudioEngine()
+        self.engine.mixer = Mixer(interval=0.005)
+        self.engine.mixer_settings = {"duck_level": 25, "duck_seconds": 0.02,
+                                      "fade_in_seconds": 0.02, "fade_out_seconds": 0.05}
+        self.music = self.engine.channels["music"]
+
+    def test_duck_and_fade_out(self):
+        """Anonsta müzik kısılır, mola sonunda kısılarak durdurulur ve kazanç sıfırlanır"""
+        stopped = threading.Event()
+        finish = self.engine._finish_fade_out
+
+        def finish_and_signal():
+            finish()
+            stopped.set()
+
+        with patch.object(self.music, "is_playing", return_value=True), \
+                patch.object(self.music, "stop") as stop, \
+                patch.object(self.engine, "_finish_fade_out", side_effect=finish_and_signal):
+            self.assertTrue(self.engine._duck_music(pause=False))
+            self.assertTrue(self.engine.mixer.is_fading(self.music))
+            self.engine.stop_music()
+            self.assertTrue(stopped.wait(2))
+        stop.assert_called_once()
+        self.assertEqual(self.music.gain, 1.0)
+        self.assertFalse(self.engine.mixer.is_fading(self.music))
+
+    def test_bell_during_fade_out_does_not_resume_music(self):
+        """Mola sonu kısılırken gelen zil müziği yeniden açmaz; durdurma hemen tamamlanır"""
+        self.engine.mixer_settings["fade_out_seconds"] = 5
+        bell = self.engine.channels["bell"]
+        with patch.object(self.music, "is_playing", return_value=True), \
+                patch.object(self.music, "stop") as stop, \
+                patch.object(self.music, "resume") as resume, \
+                patch.object(bell, "play", return_value=True), \
+                patch.object(self.engine, "_resolve_path", side_effect=lambda f, d: f"/fake/{f}"):
+            self.engine.stop_music()
+            self.assertTrue(self.engine.mixer.is_fading(self.music))
+            self.assertTrue(self.engine.play_program([("bell", "zil.mp3")]))
+        stop.assert_called_once()
+        resume.assert_not_called()
+        self.assertFalse(self.engine.mixer.is_fading(self.music))
+        self.assertEqual(self.music.gain, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
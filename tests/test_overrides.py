@@ -0,0 +1,111 @@
+import sys
+import os
+import tempfile
+import unittest
+from datetime import datetime, date, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+# Proje yolunu ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from core.scheduler import SchedulerService
+from services.overrides import OverrideService
+
+
+def make_schedule():
+    """Hafta içi 09:00-12:00 tek etkinlik, hafta sonu kapalı"""
+    schedule = []
+    for i in range(7):
+        schedule.append({"dayOfWeek": i, "enabled": i < 5, "activities": []})
+        schedule[i]["activities"].append({
+            "id": "sabah", "name": "Sabah", "startTime": "09:00", "endTime": "12:00",
+            "startSoundId": "bell1.mp3"
+        })
+    return schedule
+
+
+class TestOverrideService(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.service = OverrideService()
+        self.service.data_file = Path(self.tmp.name) / "overrides.json"
+        self.service.data = {"overrides": []}
+        self.service._rebuild_index()
+        self.weekly = make_schedule()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_replace_add_and_silence(self):
+        """Gün değiştirme, ek etkinlik ve sessiz gün"""
+        self.service.add_override({"date": "2026-01-05", "type": "replace", "activities": [
+            {"name": "Sınav", "startTime": "10:00", "endTime": "11:00"}]})
+        self.service.add_override({"date": "2026-01-06", "type": "add", "activities": [
+            {"name": "Tören", "startTime": "08:30", "endTime": "08:45"}]})
+        self.service.add_override({"date": "2026-01-07", "type": "silence"})
+
+        replaced = self.service.resolve_day(date(2026, 1, 5), self.weekly[0])
+        self.assertEqual([a["name"] for a in replaced["activities"]], ["Sınav"])
+        added = self.service.resolve_day(date(2026, 1, 6), self.weekly[1])
+        self.assertEqual([a["name"] for a in added["activities"]], ["Tören", "Sabah"])
+        self.assertFalse(self.service.resolve_day(date(2026, 1, 7), self.weekly[2])["enabled"])
+        # Kaydı olmayan gün haftalık plan ile aynı nesne
+        self.assertIs(self.service.resolve_day(date(2026, 1, 8), self.weekly[3]), self.weekly[3])
+        # Haftalık plan değiştirilmez
+        self.assertEqual([a["name"] for a in self.weekly[1]["activities"]], ["Sabah"])
+
+    def test_add_on_disabled_day_keeps_weekly_activities_off(self):
+        """Kapalı haftalık güne ekleme sadece eklenen etkinliği açar"""
+        self.service.add_override({"date": "2026-01-10", "type": "add", "activities": [
+            {"name": "Nöbet", "startTime": "10:00", "endTime": "14:00"}]})
+        effective = self.service.resolve_day(date(2026, 1, 10), self.weekly[5])
+        self.assertTrue(effective["enabled"])
+        self.assertEqual([a["name"] for a in effective["activities"]], ["Nöbet"])
+
+    def test_zone_scoped_override(self):
+        """Bölgeye özel kayıt sadece o bölgeye uygulanır"""
+        self.service.add_override({"date": "2026-01-05", "type": "silence", "zone": "atolye"})
+        self.assertFalse(self.service.resolve_day(date(2026, 1, 5), self.weekly[0], "atolye")["enabled"])
+        self.assertIs(self.service.resolve_day(date(2026, 1, 5), self.weekly[0], "default"), self.weekly[0])
+
+    def test_invalid_override_rejected(self):
+        """Geçersiz tarih veya tür reddedilir"""
+        with self.assertRaises(ValueError):
+            self.service.add_override({"date": "05.01.2026", "type": "silence"})
+        with self.assertRaises(ValueError):
+            self.service.add_override({"date": "2026-01-05", "type": "tatil"})
+
+    def test_scheduler_compiles_effective_day(self):
+        """Zamanlayıcı tarihe özel planı derler, değişince çizelgeyi yeniler"""
+        with patch("core.scheduler.append_schedule_journal", return_value=0):
+            scheduler = SchedulerService()
+            scheduler.update_schedule(self.weekly)
+        scheduler.day_resolver = self.service.resolve_day
+        self.service.on_change = scheduler.invalidate_timelines
+
+        self.service.add_override({"date": "2026-01-05", "type": "replace", "activities": [
+            {"name": "Sınav", "startTime": "10:00", "endTime": "11:00"}]})
+        event = scheduler._find_next_event(datetime(2026, 1, 5, 8, 0))
+        self.assertEqual((event["time"], event["name"]), ("10:00", "Sınav"))
+        # Ertesi gün haftalık plan
+        self.assertEqual(scheduler._get_timeline(date(2026, 1, 6)).activities[0]["name"], "Sabah")
+
+    def test_many_overrides_indexed_by_date(self):
+        """Binlerce kayıt tarih dizininde tutulur"""
+        start = date(2026, 1, 1)
+        self.service.data = {"overrides": [
+            {"id": str(n), "date": (start + timedelta(days=n)).isoformat(), "type": "silence"}
+            for n in range(3000)
+        ]}
+        self.service._rebuild_index()
+        self.assertEqual(len(self.service._by_date), 3000)
+        self.assertEqual(len(self.service.get_overrides_on(start + timedelta(days=1500))), 1)
+        self.assertEqual(len(self.service.get_overrides(date(2027, 1, 1), date(2027, 1, 31))), 31)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import sys
+import os
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+# Proje yolunu ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from core.scheduler import SchedulerService
+from core.program import PlaybackProgram, ProgramRenderer, BELL_GAP_SECONDS
+
+
+def make_schedule():
+    """Pazartesi 09:40'ta bitiş, başlangıç, ara anons ve doğum günü aynı dakikada"""
+    schedule = [{"dayOfWeek": i, "enabled": i == 0, "activities": []} for i in range(7)]
+    schedule[0]["activities"] = [
+        {"id": "a1", "name": "Ders 1", "startTime": "09:00", "endTime": "09:40",
+         "endSoundId": "zil.mp3", "endAnnouncementId": "teneffus.mp3"},
+        {"id": "a2", "name": "Ders 2", "startTime": "09:40", "endTime": "10:20",
+         "startSoundId": "zil.mp3", "startAnnouncementId": "ders.mp3",
+         "announcements": [{"time": "09:40", "soundId": "isg.mp3"}]},
+    ]
+    return schedule
+
+
+class TestPlaybackProgram(unittest.TestCase):
+
+    def test_steps_order_and_duplicate_bell(self):
+        """Ziller önce (aynı zil bir kez), ara, anonslar, en son TTS"""
+        program = PlaybackProgram("test", "end", datetime(2026, 1, 5, 9, 40))
+        program.add_bell("zil.mp3")
+        program.add_announcement("a.mp3")
+        program.add_tts("Ayşe")
+        program.add_bell("zil.mp3")
+        program.add_announcement("b.mp3")
+        self.assertEqual(program.steps(), [
+            ("bell", "zil.mp3"), ("gap", BELL_GAP_SECONDS),
+            ("announcement", "a.mp3"), ("announcement", "b.mp3"), ("tts", "Ayşe"),
+        ])
+        self.assertEqual(program.drop_announcements(), 3)
+        self.assertEqual(program.steps(), [("bell", "zil.mp3")])
+
+    def test_cache_key_tracks_file_changes(self):
+        """Dosya değişince anahtar değişir; TTS veya eksik dosya önbelleğe alınmaz"""
+        with tempfile.TemporaryDirectory() as tmp:
+            bell = Path(tmp) / "zil.mp3"
+            bell.write_bytes(b"1")
+            renderer = ProgramRenderer(Path(tmp) / "cache")
+            steps = [("bell", str(bell)), ("gap", 2)]
+            key = renderer.cache_key(steps, [1.0, 1.0])
+            self.assertIsNotNone(key)
+            self.assertIsNone(renderer.lookup(key))
+            bell.write_bytes(b"22")
+            self.assertNotEqual(renderer.cache_key(steps, [1.0, 1.0]), key)
+            self.assertIsNone(renderer.cache_key([("tts", "Ayşe")], [1.0]))
+            self.assertIsNone(renderer.cache_key([("bell", str(bell) + "x")], [1.0]))
+
+    def _wait_idle(self, renderer: ProgramRenderer):
+        for _ in range(200):
+            with renderer.cond:
+                if not renderer._rendering:
+                    return
+            time.sleep(0.01)
+        self.fail("İşleme bitmedi")
+
+    def test_single_worker_and_failed_key_not_retried(self):
+        """İşler tek thread'de sırayla işlenir; başarısız anahtar dosya değişene kadar denenmez"""
+        with tempfile.TemporaryDirectory() as tmp:
+            bells = []
+            for i in range(3):
+                bell = Path(tmp) / f"zil{i}.mp3"
+                bell.write_bytes(b"1")
+                bells.append(bell)
+            renderer = ProgramRenderer(Path(tmp) / "cache")
+            renderer.ffmpeg = "ffmpeg"
+            threads = set()
+
+            def fail(args, **kwargs):
+                threads.add(threading.current_thread().name)
+                raise subprocess.CalledProcessError(1, args, stderr=b"bozuk dosya")
+
+            with patch("core.program.subprocess.run", side_effect=fail) as run:
+                for bell in bells:
+                    steps = [("bell", str(bell))]
+                    renderer.render_async(renderer.cache_key(steps, [1.0]), steps, [1.0])
+                self._wait_idle(renderer)
+                self.assertEqual((run.call_count, threads), (3, {"ProgramRenderer"}))
+
+                steps = [("bell", str(bells[0]))]
+                renderer.render_async(renderer.cache_key(steps, [1.0]), steps, [1.0])
+                self._wait_idle(renderer)
+                self.assertEqual(run.call_count, 3)
+
+                bells[0].write_bytes(b"22")
+                renderer.render_async(renderer.cache_key(steps, [1.0]), steps, [1.0])
+                self._wait_idle(renderer)
+                self.assertEqual(run.call_count, 4)
+
+
+class TestSchedulerPrograms(unittest.TestCase):
+
+    def setUp(self):
+        self.patchers = [
+            patch("core.scheduler.load_schedule", side_effect=lambda zone_id=None, data_dir=None: make_schedule()),
+            patch("core.scheduler.append_schedule_journal", return_value=0),
+        ]
+        for p in self.patchers:
+            p.start()
+        self.scheduler = SchedulerService()
+        self.scheduler.verbose = False
+        self.scheduler.birthday_roster = lambda day: [("09:40", ["Ayşe"])]
+        self.scheduler._render_birthday = lambda name: f"birthday_{name}.mp3"
+
+    def tearDown(self):
+        for p in self.patchers:
+            p.stop()
+
+    def _tick_at(self, when: datetime):
+        self.scheduler._last_processed = None
+        with patch.object(self.scheduler, "_now", return_value=when):
+            self.scheduler._tick()
+
+    def test_same_minute_events_coalesced_into_one_program(self):
+        """Aynı dakikadaki tüm sesler tek program olarak çalınır"""
+        programs = []
+        self.scheduler.on_program = programs.append
+        self.scheduler.on_bell = lambda f: self.fail("on_program varken tek tek çalınmamalı")
+        self._tick_at(datetime(2026, 1, 5, 9, 40, 0))
+        self.assertEqual(programs, [[
+            ("bell", "zil.mp3"), ("gap", BELL_GAP_SECONDS),
+            ("announcement", "ders.mp3"), ("announcement", "teneffus.mp3"),
+            ("announcement", "isg.mp3"), ("announcement", "birthday_Ayşe.mp3"),
+        ]])
+
+    def test_program_played_step_by_step_without_engine(self):
+        """Programı çalan motor yoksa adımlar zil/anons callback'leriyle çalınır"""
+        played = []
+        self.scheduler.on_bell = lambda f: played.append(("bell", f))
+        self.scheduler.on_announcement = lambda f: played.append(("announcement", f))
+        self.scheduler._pause = lambda seconds: played.append(("pause", seconds))
+        self._tick_at(datetime(2026, 1, 5, 9, 40, 0))
+        self.assertEqual(played[:3], [("bell", "zil.mp3"), ("pause", BELL_GAP_SECONDS),
+                                      ("announcement", "ders.mp3")])
+        self.assertEqual(played[-1], ("announcement", "birthday_Ayşe.mp3"))
+
+
+if __name__ == '__main__':
+    unittest.main()
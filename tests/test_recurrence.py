@@ -0,0 +1,87 @@
+import sys
+import os
+import unittest
+from datetime import date
+
+# Proje yolunu ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from core.recurrence import RecurrenceRule, expand_activities, expand_day
+from core.timeline import DayTimeline
+
+
+class TestRecurrenceRule(unittest.TestCase):
+
+    def test_first_and_last_weekday_of_month(self):
+        """Ayın ilk Pazartesisi ve son Cuması"""
+        rule = RecurrenceRule.parse("FREQ=MONTHLY;BYDAY=1MO")
+        self.assertTrue(rule.occurs_on(date(2026, 1, 5)))
+        self.assertFalse(rule.occurs_on(date(2026, 1, 12)))
+        self.assertTrue(rule.occurs_on(date(2026, 2, 2)))
+        rule = RecurrenceRule.parse({"freq": "monthly", "byday": ["-1FR"]})
+        self.assertTrue(rule.occurs_on(date(2026, 1, 30)))
+        self.assertFalse(rule.occurs_on(date(2026, 1, 23)))
+
+    def test_interval_anchored_on_dtstart(self):
+        """İki haftada bir kuralı DTSTART haftasına göre sayılır"""
+        rule = RecurrenceRule.parse("FREQ=WEEKLY;INTERVAL=2;DTSTART=2026-01-05;UNTIL=2026-02-28")
+        self.assertTrue(rule.occurs_on(date(2026, 1, 5)))
+        self.assertFalse(rule.occurs_on(date(2026, 1, 12)))
+        self.assertTrue(rule.occurs_on(date(2026, 1, 19)))
+        self.assertFalse(rule.occurs_on(date(2026, 3, 2)))
+        self.assertFalse(rule.occurs_on(date(2025, 12, 22)))
+
+    def test_invalid_rules_rejected(self):
+        """Desteklenmeyen veya eksik kurallar reddedilir"""
+        for spec in ("FREQ=SECONDLY", "FREQ=DAILY;INTERVAL=2", "FREQ=MONTHLY;BYDAY=9MO",
+                     "FREQ=MINUTELY;UNTIL=25:00", "INTERVAL=5"):
+            with self.assertRaises(ValueError):
+                RecurrenceRule.parse(spec)
+
+
+class TestExpansion(unittest.TestCase):
+
+    def setUp(self):
+        self.day = {"dayOfWeek": 0, "enabled": True, "activities": [
+            {"id": "mesai", "name": "Mesai", "startTime": "08:00", "endTime": "17:00",
+             "announcements": [
+                 {"time": "08:00", "soundId": "isg.mp3",
+                  "recurrence": "FREQ=MINUTELY;INTERVAL=45;UNTIL=17:00"},
+                 {"time": "12:00", "soundId": "toplanti.mp3", "recurrence": "FREQ=MONTHLY;BYDAY=1MO"},
+             ]},
+            {"id": "mola", "name": "Mola", "startTime": "10:00", "endTime": "10:10",
+             "recurrence": {"freq": "hourly", "interval": 2, "until": "16:00"}},
+        ]}
+
+    def test_announcements_expanded_for_day(self):
+        """45 dakikada bir anons ve ayın ilk Pazartesisi anonsu sadece o gün açılır"""
+        timeline = DayTimeline(expand_day(self.day, date(2026, 1, 5)))
+        interim = [e.time for e in timeline.events if e.kind == "interim"]
+        self.assertEqual(len([e for e in timeline.events if e.payload and e.payload["soundId"] == "isg.mp3"]), 13)
+        self.assertIn("16:15", interim)
+        self.assertIn("17:00", interim)
+        self.assertIn("12:00", interim)
+        # İkinci Pazartesi: aylık anons yok
+        timeline = DayTimeline(expand_day(self.day, date(2026, 1, 12)))
+        self.assertNotIn("toplanti.mp3", [e.payload["soundId"] for e in timeline.events if e.kind == "interim"])
+
+    def test_repeating_activity_gets_unique_ids(self):
+        """Gün içinde tekrar eden etkinliğin her tekrarı ayrı kimlikle derlenir"""
+        activities = expand_activities(self.day["activities"], date(2026, 1, 5))
+        breaks = [(a["id"], a["startTime"], a["endTime"]) for a in activities if a["name"] == "Mola"]
+        self.assertEqual(breaks, [("mola", "10:00", "10:10"), ("mola@12:00", "12:00", "12:10"),
+                                  ("mola@14:00", "14:00", "14:10"), ("mola@16:00", "16:00", "16:10")])
+        # Saklanan program değişmez
+        self.assertEqual(len(self.day["activities"]), 2)
+        self.assertIn("recurrence", self.day["activities"][1])
+
+    def test_plain_day_not_copied(self):
+        """Kuralı olmayan gün aynı nesne olarak döner"""
+        plain = {"dayOfWeek": 1, "activities": [{"id": "a", "startTime": "09:00", "endTime": "10:00"}]}
+        self.assertIs(expand_day(plain, date(2026, 1, 6)), plain)
+
+
+if __name__ == '__main__':
+    unittest.main()
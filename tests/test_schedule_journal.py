@@ -0,0 +1,119 @@
+import sys
+import os
+import copy
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Proje yolunu ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+import config
+from core.scheduler import SchedulerService
+
+
+class TestScheduleJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        tmp_dir = Path(self.tmp.name)
+        self.patchers = [
+            patch("config.ensure_directories"),
+            patch("config.get_schedule_file", lambda zone_id=None, data_dir=None: tmp_dir / "schedule.json"),
+        ]
+        for p in self.patchers:
+            p.start()
+        self.journal = config.get_schedule_journal_file()
+        self.scheduler = SchedulerService()
+
+    def tearDown(self):
+        for p in self.patchers:
+            p.stop()
+        self.tmp.cleanup()
+
+    def _activity(self, activity_id: str, start: str, end: str):
+        return {"id": activity_id, "name": activity_id, "startTime": start, "endTime": end}
+
+    def test_edits_appended_and_replayed(self):
+        """Değişiklikler günlüğe eklenir, yeniden yüklemede aynı program oluşur"""
+        self.scheduler.add_activity(0, self._activity("b", "10:00", "10:40"))
+        self.scheduler.add_activity(0, self._activity("a", "09:00", "09:40"))
+        self.scheduler.remove_activity(0, "b")
+        self.assertFalse(config.get_schedule_file().exists())
+        self.assertEqual(len(self.journal.read_text(encoding="utf-8").splitlines()), 3)
+
+        reloaded = config.load_schedule()
+        self.assertEqual(reloaded, self.scheduler.get_schedule())
+        self.assertEqual([a["id"] for a in reloaded[0]["activities"]], ["a"])
+
+    def test_torn_last_line_and_duplicate_records_ignored(self):
+        """Yarım kalan son satır atlanır, tekrar eden kayıt sonucu değiştirmez"""
+        self.scheduler.add_activity(1, self._activity("a", "09:00", "09:40"))
+        with open(self.journal, "a", encoding="utf-8") as f:
+            f.write(self.journal.read_text(encoding="utf-8"))
+            f.write('{"op": "remove_activity", "day": 1, "i')
+        self.assertEqual(config.load_schedule(), self.scheduler.get_schedule())
+
+    def test_compaction_writes_snapshot_and_clears_journal(self):
+        """Sıkıştırma tam programı yazar ve günlüğü siler"""
+        self.scheduler.update_day(2, {"dayOfWeek": 2, "enabled": False, "activities": []})
+        self.assertTrue(self.journal.exists())
+        self.scheduler.compact_schedule()
+        self.assertFalse(self.journal.exists())
+        self.assertEqual(config.load_schedule(), self.scheduler.get_schedule())
+
+    def test_full_update_journals_only_changed_days(self):
+        """Tüm program güncellemesinde sadece değişen günler günlüğe yazılır"""
+        schedule = copy.deepcopy(self.scheduler.get_schedule())
+        schedule[3]["activities"] = [self._activity("x", "08:00", "08:40")]
+        self.scheduler.update_schedule(schedule)
+        lines = self.journal.read_text(encoding="utf-8").splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertIn('"day": 3', lines[0])
+        self.assertEqual(config.load_schedule(), schedule)
+
+    def test_journal_written_outside_schedule_lock_in_order(self):
+        """Günlük yazılırken program kilidi serbesttir; kayıtlar yayın sırasıyla diske gider"""
+        entered = threading.Event()
+        release = threading.Event()
+        original = config.append_schedule_journal
+
+        def slow_append(records, zone_id=None, data_dir=None):
+            if records[0]["day"] == 0:
+                entered.set()
+                release.wait(2)
+            return original(records, zone_id, data_dir=data_dir)
+
+        version = self.scheduler.schedule_version
+        with patch("core.scheduler.append_schedule_journal", side_effect=slow_append):
+            first = threading.Thread(target=self.scheduler.add_activity,
+                                     args=(0, self._activity("a", "09:00", "09:40")))
+            first.start()
+            self.assertTrue(entered.wait(2))
+            second = threading.Thread(target=self.scheduler.add_activity,
+                                      args=(1, self._activity("b", "09:00", "09:40")))
+            second.start()
+            # İkinci yazıcı birincinin fsync'ini beklemeden yayınlar
+            for _ in range(200):
+                if self.scheduler.schedule_version == version + 2:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(self.scheduler.schedule_version, version + 2)
+            self.assertEqual(len(self.journal.read_text(encoding="utf-8").splitlines())
+                             if self.journal.exists() else 0, 0)
+            release.set()
+            first.join(2)
+            second.join(2)
+        days = [json.loads(line)["day"] for line in self.journal.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(days, [0, 1])
+        self.assertEqual(config.load_schedule(), self.scheduler.get_schedule())
+
+
+if __name__ == '__main__':
+    unittest.main()
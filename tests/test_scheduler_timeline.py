@@ -0,0 +1,239 @@
+import sys
+import os
+import threading
+import unittest
+from datetime import datetime, date, timedelta
+from unittest.mock import patch
+
+# Proje yolunu ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from core.timeline import DayTimeline, parse_hhmm
+from core.scheduler import SchedulerService
+from core.dispatch import TriggerDispatcher
+
+
+def make_schedule():
+    """Pazartesi dolu, Salı boş, diğer günler kapalı bir test programı"""
+    monday = {
+        "dayOfWeek": 0,
+        "dayName": "Pazartesi",
+        "enabled": True,
+        "activities": [
+            {
+                "id": "a1", "name": "Ders 1", "startTime": "09:00", "endTime": "09:40",
+                "startSoundId": "bell1.mp3", "endSoundId": "bell2.mp3", "playMusic": True,
+                "announcements": [
+                    {"time": "09:20", "soundId": "isg.mp3"},
+                    {"time": "09:30", "soundId": "off.mp3", "enabled": False},
+                ]
+            },
+            {
+                "id": "a2", "name": "Ders 2", "startTime": "09:50", "endTime": "10:30",
+                "startSoundId": "bell1.mp3", "playMusic": False
+            },
+        ]
+    }
+    schedule = [monday]
+    for i in range(1, 7):
+        schedule.append({"dayOfWeek": i, "enabled": i == 1, "activities": []})
+    return schedule
+
+
+class TestDayTimeline(unittest.TestCase):
+
+    def setUp(self):
+        self.timeline = DayTimeline(make_schedule()[0])
+
+    def test_events_sorted_and_disabled_interim_skipped(self):
+        """Olaylar dakikaya göre sıralı, pasif ara anons derlenmiyor"""
+        self.assertEqual(self.timeline.minutes, sorted(self.timeline.minutes))
+        keys = [e.key for e in self.timeline.events]
+        self.assertIn("a1_interim_isg.mp3_09:20", keys)
+        self.assertNotIn("a1_interim_off.mp3_09:30", keys)
+
+    def test_events_at(self):
+        """Belirli dakikadaki olaylar bisect ile bulunur"""
+        events = self.timeline.events_at(parse_hhmm("09:40"))
+        self.assertEqual([e.key for e in events], ["a1_end"])
+        self.assertEqual(self.timeline.events_at(parse_hhmm("09:41")), [])
+
+    def test_activity_at_and_last_ended(self):
+        """Şu anki etkinlik ve son biten etkinlik"""
+        self.assertEqual(self.timeline.activity_at(parse_hhmm("09:39"))["id"], "a1")
+        self.assertIsNone(self.timeline.activity_at(parse_hhmm("09:40")))
+        self.assertEqual(self.timeline.last_ended_at(parse_hhmm("09:45"))["id"], "a1")
+        self.assertIsNone(self.timeline.last_ended_at(parse_hhmm("08:00")))
+
+    def test_next_edge_skips_interim(self):
+        """Sonraki etkinlik ara anonsları atlar"""
+        event = self.timeline.next_edge_after(parse_hhmm("09:10"))
+        self.assertEqual(event.key, "a1_end")
+
+
+class TestSchedulerTimeline(unittest.TestCase):
+
+    def setUp(self):
+        self.patcher = patch("core.scheduler.append_schedule_journal", return_value=0)
+        self.patcher.start()
+        self.scheduler = SchedulerService()
+        self.scheduler.update_schedule(make_schedule())
+        self.fired = []
+        self.scheduler.on_bell = lambda f: self.fired.append(("bell", f))
+        self.scheduler.on_announcement = lambda f: self.fired.append(("announcement", f))
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def _tick_at(self, when: datetime):
+        with patch.object(self.scheduler, "_now", return_value=when):
+            self.scheduler._tick()
+
+    def test_tick_fires_once_per_minute(self):
+        """Aynı dakikada tekrar tick atılınca olay iki kez çalmaz"""
+        self._tick_at(datetime(2026, 1, 5, 9, 20, 0))   # Pazartesi
+        self._tick_at(datetime(2026, 1, 5, 9, 20, 30))
+        self.assertEqual(self.fired, [("announcement", "isg.mp3")])
+
+    def test_gap_replays_bell_within_grace(self):
+        """Duraklama sonrası uyanınca tolerans içindeki zil yeniden çalınır"""
+        self._tick_at(datetime(2026, 1, 5, 9, 38, 0))
+        self._tick_at(datetime(2026, 1, 5, 9, 41, 30))   # 09:40 bitişi 90 sn kaçırıldı
+        self.assertEqual(self.fired, [("bell", "bell2.mp3")])
+        self.assertEqual(self.scheduler.replayed_count, 1)
+
+    def test_stale_announcement_not_replayed(self):
+        """Tolerans dışındaki ara anons çalınmaz, kaçırıldı olarak raporlanır"""
+        self._tick_at(datetime(2026, 1, 5, 9, 19, 0))
+        self._tick_at(datetime(2026, 1, 5, 9, 21, 30))
+        self.assertEqual(self.fired, [])
+        self.assertEqual(self.scheduler.missed_count, 1)
+
+    def test_backward_clock_step_does_not_double_fire(self):
+        """Saat geri alındığında aynı olay tekrar çalmaz"""
+        self._tick_at(datetime(2026, 1, 5, 9, 20, 0))
+        self._tick_at(datetime(2026, 1, 5, 9, 10, 0))
+        self._tick_at(datetime(2026, 1, 5, 9, 20, 5))
+        self.assertEqual(self.fired, [("announcement", "isg.mp3")])
+
+    def test_birthday_roster_compiled_into_timeline(self):
+        """Doğum günü listesi çizelgeye derlenir ve anons bir kez tetiklenir"""
+        announced = []
+        self.scheduler.birthday_roster = lambda day: [("09:45", ["Ayşe"])] if day == date(2026, 1, 5) else []
+        self.scheduler._trigger_birthday = lambda name, scheduled=None: announced.append(name)
+        self.scheduler.invalidate_timelines()
+        self._tick_at(datetime(2026, 1, 5, 9, 45, 0))
+        self._tick_at(datetime(2026, 1, 5, 9, 45, 40))
+        self.assertEqual(announced, ["Ayşe"])
+        self.assertEqual(self.scheduler._next_deadline(datetime(2026, 1, 5, 9, 42)),
+                         datetime(2026, 1, 5, 9, 45))
+
+    def test_firing_offset_recorded(self):
+        """Tetiklenme sapması günlük dakiklik istatistiğine yazılır"""
+        self._tick_at(datetime(2026, 1, 5, 9, 0, 0, 250000))
+        summary = self.scheduler.punctuality.summary(date(2026, 1, 5))
+        self.assertEqual(summary["count"], 1)
+        self.assertEqual(summary["max_ms"], 250.0)
+        self.assertEqual(summary["by_kind"], {"start": 1})
+
+    def test_next_event_looks_ahead_to_following_days(self):
+        """Bugün etkinlik kalmadıysa sonraki etkin güne bakılır"""
+        event = self.scheduler._find_next_event(datetime(2026, 1, 5, 11, 0))
+        # Salı boş, Çarşamba-Pazar kapalı: sonraki Pazartesi
+        self.assertEqual(event["time"], "09:00")
+        self.assertEqual(event["date"], date(2026, 1, 12).isoformat())
+        self.assertEqual(event["days_ahead"], 7)
+
+    def test_holiday_checked_per_date(self):
+        """Tatil günü çalınmaz, sonraki etkinlik aranırken tatil günleri atlanır"""
+        holidays = {date(2026, 1, 5), date(2026, 1, 12)}
+        self.scheduler.holiday_checker = lambda day: day in holidays
+        self._tick_at(datetime(2026, 1, 5, 9, 20, 0))
+        self.assertEqual(self.fired, [])
+        # Sonraki Pazartesi de tatil: 7 günlük pencerede etkinlik yok
+        self.assertIsNone(self.scheduler._find_next_event(datetime(2026, 1, 5, 11, 0)))
+
+    def test_schedule_change_invalidates_timeline(self):
+        """Program değişince derlenmiş çizelge yenilenir"""
+        day = date(2026, 1, 5)
+        before = self.scheduler._get_timeline(day)
+        self.scheduler.remove_activity(0, "a2")
+        after = self.scheduler._get_timeline(day)
+        self.assertIsNot(before, after)
+        self.assertEqual(len(after.activities), 1)
+
+    def test_next_deadline_is_next_event_or_midnight(self):
+        """Döngü bir sonraki olay dakikasına, olay yoksa gece yarısına kadar uyur"""
+        self.assertEqual(self.scheduler._next_deadline(datetime(2026, 1, 5, 9, 5, 12)),
+                         datetime(2026, 1, 5, 9, 20))
+        # Cumartesi kapalı: gün dönümüne kadar (üst sınır 30 dk)
+        self.assertEqual(self.scheduler._next_deadline(datetime(2026, 1, 10, 23, 50)),
+                         datetime(2026, 1, 11, 0, 0))
+
+    def test_upcoming_sounds_prepared_before_event(self):
+        """Olaydan birkaç saniye önce uyanılır ve sesleri ses motoruna bildirilir"""
+        prepared = []
+        self.scheduler.on_prepare = lambda channel, f: prepared.append((channel, f))
+        self.assertEqual(self.scheduler._next_deadline(datetime(2026, 1, 5, 9, 5, 12)),
+                         datetime(2026, 1, 5, 9, 19, 55))
+        self._tick_at(datetime(2026, 1, 5, 9, 19, 55))
+        self._tick_at(datetime(2026, 1, 5, 9, 19, 57))
+        self.assertEqual(prepared, [("announcement", "isg.mp3")])
+        # Hazırlık yapıldı, sıradaki uyanma olayın kendisi
+        self.assertEqual(self.scheduler._next_deadline(datetime(2026, 1, 5, 9, 19, 57)),
+                         datetime(2026, 1, 5, 9, 20))
+        self.assertEqual(self.fired, [])
+
+    def test_edits_publish_new_snapshot(self):
+        """Düzenleme yeni sürüm yayınlar, okuyucunun elindeki eski sürüm değişmez"""
+        before = self.scheduler.snapshot
+        self.scheduler.remove_activity(0, "a2")
+        after = self.scheduler.snapshot
+        self.assertEqual(after.version, before.version + 1)
+        self.assertEqual([a["id"] for a in before.get_day(0)["activities"]], ["a1", "a2"])
+        self.assertEqual([a["id"] for a in after.get_day(0)["activities"]], ["a1"])
+        # Eski sürüme göre yazan istemci reddedilir
+        self.assertIsNone(self.scheduler.update_schedule(make_schedule(), before.version))
+        self.assertEqual(self.scheduler.update_schedule(make_schedule(), after.version), after.version + 1)
+
+    def test_schedule_change_wakes_loop(self):
+        """Program değişikliği uyuyan döngüyü erken uyandırır"""
+        self.scheduler.running = True
+        self.scheduler._plan_changed = False
+        self.scheduler.update_schedule(make_schedule())
+        self.assertTrue(self.scheduler._plan_changed)
+        self.scheduler.running = False
+
+
+class TestTriggerDispatcher(unittest.TestCase):
+
+    def test_submit_does_not_block_caller(self):
+        """Çalışan işçiye iş eklemek çağıranı bloklamaz, işler sırayla çalışır"""
+        dispatcher = TriggerDispatcher("Test")
+        dispatcher.start()
+        gate = threading.Event()
+        order = []
+        dispatcher.submit("uzun anons", "interim", lambda: (gate.wait(2), order.append(1)))
+        dispatcher.submit("zil", "start", lambda: order.append(2))
+        self.assertEqual(order, [])
+        gate.set()
+        dispatcher.join()
+        dispatcher.stop()
+        self.assertEqual(order, [1, 2])
+
+    def test_late_job_is_reported_not_played(self):
+        """Son geçerlilik anı geçmiş iş çalınmaz, geç kalmış olarak raporlanır"""
+        scheduled = datetime(2026, 1, 5, 9, 0)
+        dispatcher = TriggerDispatcher("Test", clock=lambda: scheduled + timedelta(seconds=90))
+        played = []
+        dispatcher.submit("zil", "start", lambda: played.append(1), scheduled)
+        self.assertEqual(played, [])
+        status = dispatcher.get_status()
+        self.assertEqual(status["late"], 1)
+        self.assertEqual(status["late_events"][0]["late_seconds"], 90.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
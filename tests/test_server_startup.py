@@ -0,0 +1,96 @@
+import sys
+import os
+import asyncio
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# VLC kurulu olmasa da çalışsın
+sys.modules.setdefault('vlc', MagicMock())
+
+# Proje yolunu ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+try:
+    import fastapi
+    import holidays
+except ImportError:
+    fastapi = None
+
+from core.ledger import FiredLedger
+
+
+def make_schedule():
+    """Sadece Pazartesi 09:00-10:00 tek etkinlik"""
+    schedule = [{"dayOfWeek": i, "enabled": i == 0, "activities": []} for i in range(7)]
+    schedule[0]["activities"].append({
+        "id": "a1", "name": "Vardiya", "startTime": "09:00", "endTime": "10:00",
+        "startSoundId": "bell1.mp3"
+    })
+    return schedule
+
+
+@unittest.skipIf(fastapi is None, "fastapi/holidays kurulu değil")
+class TestServerStartup(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ledger_file = Path(self.tmp.name) / "schedule.fired"
+        # Kapanmadan önce 08:58 işlenmiş; 09:00 zili kapalıyken kaçırıldı
+        FiredLedger(self.ledger_file).mark_processed(datetime(2026, 1, 5, 8, 58))
+        self.patchers = [
+            patch("core.scheduler.get_fired_ledger_file", lambda zone_id=None, data_dir=None: self.ledger_file),
+            patch("core.scheduler.load_schedule", side_effect=lambda zone_id=None, data_dir=None: make_schedule()),
+            patch("core.scheduler.append_schedule_journal", return_value=0),
+        ]
+        for p in self.patchers:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patchers:
+            p.stop()
+        self.tmp.cleanup()
+
+    def _run_handlers(self, handlers):
+        for handler in handlers:
+            asyncio.run(handler())
+
+    def test_catch_up_after_restart_reaches_audio(self):
+        """Uygulama yeniden başlarken kaçırılan zil, callback'ler bağlandıktan sonra çalınır"""
+        from web import server
+
+        received = []
+        delivered = threading.Event()
+
+        def play(sounds, wait=False):
+            received.append(sounds)
+            delivered.set()
+            return True
+
+        server.scheduler.startup_delay = 0
+        with patch.object(server.scheduler, "_now", return_value=datetime(2026, 1, 5, 9, 1, 30)), \
+                patch.object(server.holiday_service, "is_holiday_on", return_value=False), \
+                patch.object(server.override_service, "resolve_day",
+                             side_effect=lambda day, weekly_day, zone_id=None: weekly_day), \
+                patch.object(server.birthday_service, "get_roster", return_value=[]), \
+                patch.object(server.audio_engine.queue, "program", side_effect=play), \
+                patch.object(server.audio_engine.queue, "bell", side_effect=play):
+            self._run_handlers(server.app.router.on_startup)
+            try:
+                self.assertTrue(delivered.wait(5))
+            finally:
+                self._run_handlers(server.app.router.on_shutdown)
+
+        self.assertEqual(len(received), 1)
+        self.assertIn("bell1.mp3", str(received[0]))
+        fired, _ = FiredLedger(self.ledger_file).load()
+        self.assertIn("a1_start", fired.get(datetime(2026, 1, 5).date(), set()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import sys
+import os
+import tempfile
+import unittest
+from datetime import datetime, date
+from pathlib import Path
+from unittest.mock import patch
+
+# Proje yolunu ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from core.scheduler import SchedulerService
+from core.simulation import simulate
+
+
+def make_schedule():
+    """Hafta içi her gün tek dersli, ders sonrası müzikli program"""
+    schedule = []
+    for i in range(7):
+        schedule.append({"dayOfWeek": i, "enabled": i < 5, "activities": []})
+        if i < 5:
+            schedule[i]["activities"].append({
+                "id": f"d{i}", "name": "Ders", "startTime": "09:00", "endTime": "09:40",
+                "startSoundId": "bell1.mp3", "startAnnouncementId": "hosgeldin.mp3",
+                "endSoundId": "bell2.mp3", "playMusic": True,
+                "announcements": [{"time": "09:20", "soundId": "isg.mp3"}]
+            })
+    return schedule
+
+
+class TestSimulation(unittest.TestCase):
+
+    def setUp(self):
+        self.patcher = patch("core.scheduler.append_schedule_journal", return_value=0)
+        self.patcher.start()
+        self.scheduler = SchedulerService()
+        self.scheduler.update_schedule(make_schedule())
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_day_is_recorded_in_order(self):
+        """Bir günün zil, anons ve müzik kararları sırayla kaydedilir"""
+        result = simulate(self.scheduler, datetime(2026, 1, 6), datetime(2026, 1, 6, 23, 59))
+        events = [(e["time"][11:], e["kind"], e["source"]) for e in result["events"]]
+        self.assertEqual(events, [
+            ("09:00:00", "bell", "bell1.mp3"),
+            ("09:00:02", "announcement", "hosgeldin.mp3"),   # Zilden 2 sn sonra
+            ("09:20:00", "announcement", "isg.mp3"),
+            ("09:40:00", "bell", "bell2.mp3"),
+            ("09:40:00", "music_start", None),
+        ])
+
+    def test_holidays_and_birthdays_included(self):
+        """Tatil günleri sessiz kalır, doğum günü anonsları kaydedilir"""
+        self.scheduler.holiday_checker = lambda day: day == date(2026, 1, 6)
+        self.scheduler.birthday_roster = lambda day: [("10:00", ["Ayşe"])] if day == date(2026, 1, 7) else []
+        result = simulate(self.scheduler, datetime(2026, 1, 6), datetime(2026, 1, 7, 23, 59))
+        self.assertFalse(any(e["time"].startswith("2026-01-06") for e in result["events"]))
+        self.assertIn({"time": "2026-01-07 10:00:00", "kind": "birthday", "source": "Ayşe"}, result["events"])
+        self.assertTrue(result["days"][0]["holiday"])
+
+    def test_full_year_and_source_untouched(self):
+        """Bir yıllık simülasyon çalışır, gerçek zamanlayıcının durumu değişmez"""
+        fired = []
+        self.scheduler.on_bell = fired.append
+        result = simulate(self.scheduler, datetime(2026, 1, 1), datetime(2026, 12, 31, 23, 59))
+        # 2026'da 261 hafta içi gün, her gün iki zil
+        self.assertEqual(result["counts"]["bell"], 2 * 261)
+        self.assertEqual(fired, [])
+        self.assertEqual(self.scheduler.fired_events, {})
+
+    def test_invalid_range(self):
+        """Ters aralık reddedilir"""
+        with self.assertRaises(ValueError):
+            simulate(self.scheduler, datetime(2026, 1, 7), datetime(2026, 1, 6))
+
+    def test_uses_source_data_dir(self):
+        """Kiracı dizinli kaynağın kopyası programı ve ayarları aynı dizinden okur"""
+        with tempfile.TemporaryDirectory() as tmp:
+            site_dir = Path(tmp)
+            source = SchedulerService("site-1", data_dir=site_dir)
+            source.update_schedule(make_schedule())
+            reads = []
+
+            def load(zone_id=None, data_dir=None):
+                reads.append((zone_id, data_dir))
+                return []
+
+            with patch("core.scheduler.load_schedule", side_effect=load):
+                result = simulate(source, datetime(2026, 1, 6), datetime(2026, 1, 6, 23, 59))
+        self.assertEqual(reads, [("site-1", site_dir)])
+        self.assertEqual(len(result["events"]), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,214 @@
+import sys
+import os
+import json
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+# Proje yolunu ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+import config
+from core.dispatch import DispatchPool, TriggerDispatcher
+from core.tenants import HeapTimer, TenantManager, AudioSink
+
+
+class FakeTenant:
+    """Sadece HeapTimer'ın kullandığı alanlar"""
+
+    def __init__(self, zone_id: str, deadline: datetime):
+        self.zone_id = zone_id
+        self.running = True
+        self.deadline = deadline
+        self.ticks = 0
+        self.wakeup_count = 0
+        self.next_wakeup = None
+        self.deadline_now = None
+        # Verilirse tick bu olay set edilene kadar sürer (yavaş kiracı)
+        self.gate: Optional[threading.Event] = None
+        self.ticked = threading.Event()
+
+    def _tick(self):
+        self.ticks += 1
+        if self.gate:
+            self.gate.wait(2)
+        self.ticked.set()
+
+    def _next_deadline(self, now: datetime) -> datetime:
+        self.deadline_now = now
+        return self.deadline
+
+
+class RecordingSink(AudioSink):
+
+    def __init__(self):
+        self.bells = []
+
+    def play_bell(self, filename: str):
+        self.bells.append(filename)
+
+
+class TestHeapTimer(unittest.TestCase):
+
+    def test_only_due_tenants_are_ticked(self):
+        """Her turda sadece uyanma anı gelen kiracılar işlenir"""
+        now = datetime(2026, 1, 5, 8, 0)
+        timer = HeapTimer()
+        tenants = [FakeTenant(f"t{i}", now + timedelta(minutes=i + 1)) for i in range(100)]
+        for tenant in tenants:
+            timer.reschedule(tenant)
+        timer._step(now)
+        self.assertTrue(all(t.ticks == 1 for t in tenants))
+        self.assertEqual(timer.get_status()["scheduled"], 100)
+
+        timer._step(now + timedelta(minutes=3))
+        self.assertEqual([t.zone_id for t in tenants if t.ticks == 2], ["t0", "t1", "t2"])
+
+    def test_reschedule_replaces_entry_and_stopped_tenant_dropped(self):
+        """Plan değişince eski kayıt geçersiz olur, durdurulan kiracı heap'ten çıkar"""
+        now = datetime(2026, 1, 5, 8, 0)
+        timer = HeapTimer()
+        tenant = FakeTenant("a", now + timedelta(minutes=5))
+        timer.reschedule(tenant)
+        timer._step(now)
+
+        tenant.deadline = now + timedelta(minutes=30)
+        timer.reschedule(tenant)
+        timer._step(now + timedelta(minutes=1))
+        # Eski (5. dakika) kayıt vadesi gelince tekrar tick üretmez
+        timer._step(now + timedelta(minutes=10))
+        self.assertEqual(tenant.ticks, 2)
+
+        tenant.running = False
+        timer.reschedule(tenant)
+        timer._step(now + timedelta(minutes=11))
+        self.assertEqual(timer.get_status()["scheduled"], 0)
+
+    def test_slow_tenant_does_not_delay_others(self):
+        """Tick'ler havuzda çalışır: yavaş kiracı sürerken diğeri işlenir, tekrar tick'lenmez"""
+        now = datetime(2026, 1, 5, 8, 0)
+        pool = DispatchPool(workers=2)
+        pool.start()
+        timer = HeapTimer(pool)
+        slow = FakeTenant("yavas", now + timedelta(minutes=5))
+        fast = FakeTenant("hizli", now + timedelta(minutes=5))
+        slow.gate = threading.Event()
+        try:
+            timer.reschedule(slow)
+            timer.reschedule(fast)
+            timer._step(now)
+            self.assertTrue(fast.ticked.wait(2))
+            for _ in range(200):
+                if slow.ticks:
+                    break
+                time.sleep(0.01)
+            # Yavaş kiracının tick'i sürerken planı değişirse ikinci tick başlatılmaz
+            timer.reschedule(slow)
+            timer._step(now)
+            self.assertEqual(slow.ticks, 1)
+            slow.gate.set()
+            self.assertTrue(slow.ticked.wait(2))
+            for _ in range(200):
+                if timer._dirty:
+                    break
+                time.sleep(0.01)
+            timer._step(now)
+            for _ in range(200):
+                if slow.ticks == 2 and not timer._ticking:
+                    break
+                time.sleep(0.01)
+        finally:
+            slow.gate.set()
+            pool.stop()
+        self.assertEqual((slow.ticks, fast.ticks), (2, 1))
+        self.assertEqual(timer.get_status()["scheduled"], 2)
+        # Uyanma anı tick bittikten sonraki saate göre hesaplanır
+        self.assertGreater(slow.deadline_now, now)
+
+
+class TestDispatchPool(unittest.TestCase):
+
+    def test_jobs_run_in_order_per_dispatcher(self):
+        """Havuzda her kuyruğun işleri sırasını korur"""
+        pool = DispatchPool(workers=2)
+        results = {"a": [], "b": []}
+        dispatchers = {name: TriggerDispatcher(name, pool=pool) for name in results}
+        for dispatcher in dispatchers.values():
+            dispatcher.start()
+        try:
+            for i in range(20):
+                for name, dispatcher in dispatchers.items():
+                    dispatcher.submit(f"{name}{i}", "start", lambda n=name, i=i: results[n].append(i))
+            for dispatcher in dispatchers.values():
+                dispatcher.join()
+        finally:
+            for dispatcher in dispatchers.values():
+                dispatcher.stop()
+            pool.stop()
+        self.assertEqual(results["a"], list(range(20)))
+        self.assertEqual(results["b"], list(range(20)))
+
+
+class TestTenantManager(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.tmp.name)
+        self.manager = TenantManager(self.base_dir, workers=2)
+
+    def tearDown(self):
+        self.manager.stop()
+        self.tmp.cleanup()
+
+    def test_tenant_uses_own_data_dir_and_settings(self):
+        """Kiracının programı ve ayarları kendi dizininde"""
+        site_dir = self.base_dir / "site-1"
+        site_dir.mkdir()
+        with open(site_dir / "config.json", "w", encoding="utf-8") as f:
+            json.dump({"scheduler": {"grace_seconds": {"bell": 5}}}, f)
+        self.manager.load()
+        other = self.manager.add_tenant("site-2")
+
+        tenant = self.manager.get("site-1")
+        self.assertEqual(tenant.grace_seconds["bell"], 5)
+        tenant.add_activity(0, {"id": "a", "name": "A", "startTime": "09:00", "endTime": "09:30"})
+        tenant.compact_schedule()
+        self.assertEqual(config.get_schedule_file("site-1", site_dir).parent, site_dir)
+        self.assertTrue(config.get_schedule_file("site-1", site_dir).exists())
+        self.assertEqual(other.get_schedule()[0]["activities"], [])
+
+        with self.assertRaises(ValueError):
+            self.manager.add_tenant("../kotu")
+
+    def test_many_tenants_share_threads_and_sinks_are_separate(self):
+        """Yüzlerce kiracı tek timer thread'i ve ortak işçilerle çalışır"""
+        sinks = {}
+
+        def factory(tenant_id, data_dir):
+            sinks[tenant_id] = RecordingSink()
+            return sinks[tenant_id]
+
+        self.manager.sink_factory = factory
+        for i in range(200):
+            self.manager.add_tenant(f"t{i}")
+        before = threading.active_count()
+        self.manager.start()
+        # 1 timer + 2 işçi
+        self.assertLessEqual(threading.active_count() - before, 3)
+
+        tenant = self.manager.get("t7")
+        tenant.dispatcher.submit("Zil", "start", lambda: tenant.on_bell("zil.mp3"))
+        tenant.dispatcher.join()
+        self.assertEqual(sinks["t7"].bells, ["zil.mp3"])
+        self.assertEqual(sinks["t8"].bells, [])
+        self.assertEqual(self.manager.get_status()["tenants"], 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
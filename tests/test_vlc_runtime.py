@@ -0,0 +1,120 @@
+import sys
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# VLC kurulu olmasa da çalışsın
+sys.modules.setdefault('vlc', MagicMock())
+
+# Proje yolunu ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from core import vlc_runtime
+from core.vlc_runtime import PlayerPool, MediaCache
+
+
+class TestPlayerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.instance = MagicMock()
+        self.instance.media_player_new.side_effect = lambda: MagicMock()
+        self.patcher = patch("core.vlc_runtime.get_instance", return_value=self.instance)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_released_player_is_reused_without_new_attach(self):
+        """Geri verilen player tekrar kullanılır; bitiş olayı yalnızca oluşturulurken bağlanır"""
+        on_end = MagicMock()
+        pool = PlayerPool("test", on_end)
+        player = pool.acquire()
+        pool.release(player)
+        self.assertIs(pool.acquire(), player)
+        self.assertEqual(self.instance.media_player_new.call_count, 1)
+        player.stop.assert_called_once()
+        player.release.assert_not_called()
+        player.event_manager.return_value.event_attach.assert_called_once()
+
+    def test_players_over_pool_size_are_released(self):
+        """Havuz doluysa fazla player serbest bırakılır"""
+        pool = PlayerPool("test", size=1)
+        first, second = pool.acquire(), pool.acquire()
+        pool.release(first)
+        pool.release(second)
+        first.release.assert_not_called()
+        second.release.assert_called_once()
+        pool.close()
+        first.release.assert_called_once()
+
+
+class TestMediaCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.instance = MagicMock()
+        self.instance.media_new_path.side_effect = lambda path: MagicMock(name=path)
+        self.patcher = patch("core.vlc_runtime.get_instance", return_value=self.instance)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmp.cleanup()
+
+    def _sound(self, name: str, content: bytes = b"1") -> str:
+        path = Path(self.tmp.name) / name
+        path.write_bytes(content)
+        return str(path)
+
+    def test_repeated_file_hits_and_change_reopens(self):
+        """Aynı dosya önbellekten gelir; içerik değişince yeniden açılır"""
+        cache = MediaCache()
+        bell = self._sound("zil.mp3")
+        media = cache.get(bell)
+        self.assertIs(cache.get(bell), media)
+        self._sound("zil.mp3", b"22")
+        self.assertIsNot(cache.get(bell), media)
+        media.release.assert_called_once()
+        self.assertEqual(cache.get_stats(), {"size": 1, "hits": 1, "misses": 2})
+        # Her get çağırana ayrı referans verir
+        self.assertEqual(media.retain.call_count, 2)
+        self.assertIsNone(cache.get(bell + "x"))
+
+    def test_new_media_parsed_and_failed_parse_reopened(self):
+        """Önbelleğe giren Media bir kez ayrıştırılır; ayrıştırılamadıysa yeniden açılır"""
+        cache = MediaCache()
+        bell = self._sound("zil.mp3")
+        media = cache.get(bell)
+        media.parse_with_options.assert_called_once_with(vlc_runtime.vlc.MediaParseFlag.local,
+                                                         vlc_runtime.MEDIA_PARSE_TIMEOUT_MS)
+        self.assertIs(cache.get(bell), media)
+        media.parse_with_options.assert_called_once()
+        media.get_parsed_status.return_value = vlc_runtime.vlc.MediaParsedStatus.failed
+        reopened = cache.get(bell)
+        self.assertIsNot(reopened, media)
+        media.release.assert_called_once()
+        reopened.parse_with_options.assert_called_once()
+
+    def test_lru_eviction_and_invalidate(self):
+        """Sınır aşılınca en eski kullanılan bırakılır; invalidate kaydı siler"""
+        cache = MediaCache(size=2)
+        a, b, c = self._sound("a.mp3"), self._sound("b.mp3"), self._sound("c.mp3")
+        media_a = cache.get(a)
+        media_b = cache.get(b)
+        cache.get(a)
+        cache.get(c)
+        media_b.release.assert_called_once()
+        media_a.release.assert_not_called()
+        cache.invalidate(a)
+        media_a.release.assert_called_once()
+        # Atılan Media'yı tutan çağıranın referansı ayrı (retain) alınmıştır
+        self.assertEqual(media_a.retain.call_count, 2)
+        self.assertEqual(cache.get_stats()["size"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
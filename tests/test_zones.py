@@ -0,0 +1,103 @@
+import sys
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+# Proje yolunu ekle
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from core.scheduler import SchedulerService
+from core.zones import ZoneManager
+
+
+def make_schedule(start: str, end: str):
+    """Sadece Pazartesi tek etkinlikli bir program"""
+    schedule = [{"dayOfWeek": i, "enabled": i == 0, "activities": []} for i in range(7)]
+    schedule[0]["activities"].append({
+        "id": "a1", "name": "Vardiya", "startTime": start, "endTime": end,
+        "startSoundId": "bell1.mp3"
+    })
+    return schedule
+
+
+class TestZoneManager(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patchers = [
+            patch("core.scheduler.get_fired_ledger_file",
+                  lambda zone_id=None, data_dir=None: Path(self.tmp.name) / f"{zone_id}.fired"),
+            patch("core.scheduler.save_schedule"),
+            patch("core.scheduler.append_schedule_journal", return_value=0),
+            patch("core.scheduler.load_schedule", side_effect=lambda zone_id=None, data_dir=None: []),
+            patch("core.zones.load_config", return_value={"zones": []}),
+            patch("core.zones.save_config"),
+        ]
+        for p in self.patchers:
+            p.start()
+        self.manager = ZoneManager(SchedulerService())
+        self.office = self.manager.get()
+        self.workshop = self.manager.add_zone("atolye", "Atölye", "hw:1,0")
+        self.office.update_schedule(make_schedule("09:00", "17:00"))
+        self.workshop.update_schedule(make_schedule("07:00", "15:00"))
+
+        self.fired = []
+        for zone in (self.office, self.workshop):
+            zone.on_bell = lambda f, z=zone.zone_id: self.fired.append((z, f))
+
+    def tearDown(self):
+        for p in self.patchers:
+            p.stop()
+        self.tmp.cleanup()
+
+    def _tick_all_at(self, when: datetime):
+        for zone in self.manager.zones.values():
+            zone.running = True
+        with patch.object(self.office, "_now", return_value=when), \
+                patch.object(self.workshop, "_now", return_value=when):
+            self.manager._tick_all()
+
+    def test_zones_keep_independent_schedules(self):
+        """Her bölge kendi programına göre çalar"""
+        self._tick_all_at(datetime(2026, 1, 5, 7, 0))   # Pazartesi
+        self.assertEqual(self.fired, [("atolye", "bell1.mp3")])
+        self.assertEqual(len(self.office.get_schedule()[0]["activities"]), 1)
+        self.assertEqual(self.office.get_schedule()[0]["activities"][0]["startTime"], "09:00")
+
+    def test_shared_deadline_is_earliest_zone_event(self):
+        """Paylaşımlı zamanlayıcı en yakın bölge olayına kadar uyur"""
+        for zone in self.manager.zones.values():
+            zone.running = True
+        self.assertEqual(self.manager._next_deadline(datetime(2026, 1, 5, 6, 30)),
+                         datetime(2026, 1, 5, 7, 0))
+        self.assertEqual(self.manager._next_deadline(datetime(2026, 1, 5, 8, 0)),
+                         datetime(2026, 1, 5, 8, 30))   # Üst sınır: 30 dk
+
+    def test_zones_do_not_start_own_threads(self):
+        """Bölge eklemek yeni zamanlayıcı thread'i açmaz"""
+        with patch.object(SchedulerService, "_check_initial_state"):
+            self.manager.start()
+            try:
+                self.assertTrue(self.workshop.running)
+                self.assertIsNone(self.office.thread)
+                self.assertIsNone(self.workshop.thread)
+            finally:
+                self.manager.stop()
+        self.assertFalse(self.workshop.running)
+
+    def test_invalid_and_default_zone(self):
+        """Geçersiz kimlik reddedilir, varsayılan bölge silinemez"""
+        with self.assertRaises(ValueError):
+            self.manager.add_zone("../etc")
+        self.assertFalse(self.manager.remove_zone("default"))
+        self.assertTrue(self.manager.remove_zone("atolye"))
+        self.assertIsNone(self.manager.get("atolye"))
+
+
+if __name__ == '__main__':
+    unittest.main()
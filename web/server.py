@@ -5,9 +5,9 @@ FastAPI tabanlı REST API ve statik dosya sunumu
 import os
 import uuid
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, date
 from typing import Optional, List, Any
-from fastapi import FastAPI, UploadFile, File, HTTPException, Response
+from fastapi import FastAPI, UploadFile, File, HTTPException, Response, Query
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse
@@ -23,12 +23,17 @@ from config import (
     load_config, save_config, load_schedule, save_schedule,
     BELLS_DIR, ANNOUNCEMENTS_DIR, MUSIC_DIR, SOUNDS_DIR, WEB_HOST, WEB_PORT
 )
-from core.audio_engine import audio_engine
+from core.audio_engine import audio_engine, AudioEngine
 from core.media_player import media_player
-from core.scheduler import scheduler
+from core import vlc_runtime
+from core.scheduler import scheduler, SchedulerService
+from core.zones import zone_manager
+from core.simulation import simulate
 from core.tts_engine import tts_engine
 from services.holidays import holiday_service
 from services.birthdays import birthday_service
+from services.overrides import override_service
+from services.ha import ha_service
 from services.backup import backup_service
 
 # FastAPI uygulaması
@@ -46,8 +51,8 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_event():
     """Uygulama başladığında"""
+    # Bölgeler callback'ler ve HA bağlandıktan sonra startup() sonunda bir kez başlatılır
     print("[Server] Başlatılıyor...")
-    scheduler.start()
 
 # Statik dosyalar
 STATIC_DIR = Path(__file__).parent / "static"
@@ -67,11 +72,16 @@ class VolumeRequest(BaseModel):
 
 class ScheduleRequest(BaseModel):
     schedule: list
+    version: Optional[int] = None
 
 class ActivityRequest(BaseModel):
     dayOfWeek: int
     activity: dict
 
+class BulkActivityRequest(BaseModel):
+    dayOfWeek: int
+    activities: List[dict]
+
 class TTSRequest(BaseModel):
     text: str
     language: Optional[str] = "tr"
@@ -95,6 +105,18 @@ class PersonRequest(BaseModel):
 class AuthRequest(BaseModel):
     password: str
 
+class OverrideRequest(BaseModel):
+    date: str
+    type: str
+    name: Optional[str] = ""
+    zone: Optional[str] = None
+    activities: Optional[list] = []
+
+class ZoneRequest(BaseModel):
+    id: str
+    name: Optional[str] = ""
+    output: Optional[str] = None
+
 
 # ===== TEMEL ENDPOINT'LER =====
 
@@ -137,8 +159,13 @@ async def get_status():
         "company_name": config.get("company_name", "NikolayCo SmartZill"),
         "current_time": datetime.now().strftime("%H:%M:%S"),
         "scheduler": scheduler.get_status(),
+        "zones": zone_manager.get_status(),
+        "ha": ha_service.get_status(),
         "audio": audio_engine.get_status(),
         "media_player": media_player.get_status(),
+        "vlc": vlc_runtime.get_stats(),
+        "mixer": audio_engine.mixer.get_status(),
+        "audio_queue": audio_engine.queue.get_status(),
         "holidays": {
             "is_holiday": holiday_service.is_holiday_today(),
             "holiday_name": holiday_service.get_holiday_name()
@@ -167,24 +194,23 @@ async def get_volumes():
 
 @app.post("/api/bell/play")
 async def play_bell(filename: str = "default.mp3"):
-    """Zil çal"""
-    def play_async():
-        audio_engine.play_bell(filename, blocking=True)
-    
-    import threading
-    threading.Thread(target=play_async, daemon=True).start()
-    return {"success": True, "playing": filename}
+    """Zil çal (ses kuyruğuna eklenir; aynı istek kısa sürede tekrar çalınmaz)"""
+    queued = audio_engine.queue.bell(filename)
+    return {"success": queued, "playing": filename}
 
 
 @app.post("/api/announcement/play")
 async def play_announcement(filename: str):
     """Anons çal"""
-    def play_async():
-        audio_engine.play_announcement(filename, blocking=True)
-    
-    import threading
-    threading.Thread(target=play_async, daemon=True).start()
-    return {"success": True, "playing": filename}
+    queued = audio_engine.queue.announcement(filename)
+    return {"success": queued, "playing": filename}
+
+
+@app.post("/api/emergency/play")
+async def play_emergency(filename: str):
+    """Acil durum anonsu: çalan zil/anonsu keser, müziği durdurur"""
+    queued = audio_engine.queue.emergency(filename)
+    return {"success": queued, "playing": filename}
 
 
 @app.post("/api/tts")
@@ -195,12 +221,8 @@ async def generate_tts(req: TTSRequest):
     
     filepath = await tts_engine.generate_async(req.text)
     if filepath:
-        def play_async():
-            audio_engine.play_announcement(filepath, blocking=True)
-        
-        import threading
-        threading.Thread(target=play_async, daemon=True).start()
-        return {"success": True, "file": filepath}
+        queued = audio_engine.queue.announcement(filepath)
+        return {"success": queued, "file": filepath}
     
     raise HTTPException(status_code=500, detail="TTS oluşturulamadı")
 
@@ -253,6 +275,8 @@ async def toggle_media():
 async def stop_media():
     """Medya durdur"""
     media_player.stop()
+    # Mola müziği manuel player yüzünden bekliyorsa hemen yeniden değerlendir
+    scheduler.reschedule()
     return {"success": True}
 
 
@@ -278,71 +302,168 @@ async def get_media_files():
 
 # ===== ZAMANLAYICI =====
 
+def _get_zone(zone: Optional[str]) -> SchedulerService:
+    """Bölgenin zamanlayıcısını döndürür (boş = varsayılan bölge)"""
+    zone_scheduler = zone_manager.get(zone)
+    if not zone_scheduler:
+        raise HTTPException(status_code=404, detail=f"Bölge bulunamadı: {zone}")
+    return zone_scheduler
+
+
 @app.get("/api/schedule")
-async def get_schedule():
-    """Haftalık programı getir"""
-    return scheduler.get_schedule()
+async def get_schedule(response: Response, zone: Optional[str] = None):
+    """Haftalık programı getir (sürüm numarası X-Schedule-Version başlığında)"""
+    snapshot = _get_zone(zone).snapshot
+    response.headers["X-Schedule-Version"] = str(snapshot.version)
+    return snapshot.days
 
 
 @app.post("/api/schedule")
-async def update_schedule(req: ScheduleRequest):
-    """Haftalık programı güncelle"""
-    scheduler.update_schedule(req.schedule)
-    return {"success": True}
+async def update_schedule(req: ScheduleRequest, zone: Optional[str] = None):
+    """Haftalık programı güncelle (version verilirse eski sürüm üzerine yazılmaz)"""
+    zone_scheduler = _get_zone(zone)
+    version = zone_scheduler.update_schedule(req.schedule, req.version)
+    if version is None:
+        raise HTTPException(status_code=409, detail={
+            "message": "Program başka bir istemci tarafından değiştirildi",
+            "version": zone_scheduler.schedule_version
+        })
+    return {"success": True, "version": version}
 
 
 @app.get("/api/schedule/today")
-async def get_today_schedule():
-    """Bugünün programını getir"""
-    day_of_week = datetime.now().weekday()
-    schedule = scheduler.get_schedule()
-    for day in schedule:
-        if day.get("dayOfWeek") == day_of_week:
-            return day
-    return {"activities": []}
+async def get_today_schedule(zone: Optional[str] = None):
+    """Bugünün programını getir (tarihe özel kayıtlar uygulanmış)"""
+    return _get_zone(zone).get_effective_day(date.today()) or {"activities": []}
 
 
 @app.get("/api/schedule/timeline")
-async def get_timeline():
+async def get_timeline(zone: Optional[str] = None):
     """Günlük zaman çizelgesi"""
-    return scheduler.get_daily_timeline()
+    return _get_zone(zone).get_daily_timeline()
+
+
+@app.get("/api/schedule/simulate")
+def simulate_schedule(start: str = Query(..., alias="from"), end: str = Query(..., alias="to"),
+                      zone: Optional[str] = None):
+    """
+    Verilen aralıkta çalınacak sesleri simüle et (ses çalınmaz)
+    Tarih (2026-01-05) veya tarih-saat (2026-01-05T09:00) kabul edilir; 'to' tarihi gün sonuna kadar kapsar
+    """
+    try:
+        start_dt = datetime.fromisoformat(start)
+        end_dt = datetime.fromisoformat(end)
+        if "T" not in end and " " not in end:
+            end_dt = end_dt.replace(hour=23, minute=59, second=59)
+        return simulate(_get_zone(zone), start_dt, end_dt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.post("/api/scheduler/start")
-async def start_scheduler():
-    """Zamanlayıcıyı başlat"""
-    scheduler.start()
+async def start_scheduler(zone: Optional[str] = None):
+    """Zamanlayıcıyı başlat (bölge verilmezse tüm bölgeler)"""
+    if zone:
+        _get_zone(zone).start()
+    else:
+        zone_manager.start()
     return {"success": True, "running": True}
 
 
 @app.post("/api/scheduler/stop")
-async def stop_scheduler():
+async def stop_scheduler(zone: Optional[str] = None):
     """Zamanlayıcıyı geçici olarak pasif yap - tüm otomatik sesleri durdur"""
-    scheduler.stop()
+    if zone:
+        _get_zone(zone).stop()
+        _get_zone_audio(zone).stop_all()
+        return {"success": True, "running": False}
+    
+    zone_manager.stop()
     # Tüm otomatik sesleri durdur
-    audio_engine.stop_all()
+    for engine in _all_zone_audio():
+        engine.stop_all()
     return {"success": True, "running": False}
 
 
 
 
 @app.post("/api/schedule/activity")
-async def add_activity(req: ActivityRequest):
+async def add_activity(req: ActivityRequest, zone: Optional[str] = None):
     """Etkinlik ekle"""
-    success = scheduler.add_activity(req.dayOfWeek, req.activity)
+    success = _get_zone(zone).add_activity(req.dayOfWeek, req.activity)
     if not success:
         raise HTTPException(status_code=400, detail="Etkinlik eklenemedi (zaman çakışması olabilir)")
     return {"success": True}
 
 
+@app.post("/api/schedule/activities")
+async def add_activities(req: BulkActivityRequest, zone: Optional[str] = None):
+    """Toplu etkinlik ekle (çakışma varsa hiçbiri eklenmez, tüm çakışmalar döner)"""
+    result = _get_zone(zone).add_activities(req.dayOfWeek, req.activities)
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result)
+    return result
+
+
 @app.delete("/api/schedule/activity/{day}/{activity_id}")
-async def remove_activity(day: int, activity_id: str):
+async def remove_activity(day: int, activity_id: str, zone: Optional[str] = None):
     """Etkinlik sil"""
-    success = scheduler.remove_activity(day, activity_id)
+    success = _get_zone(zone).remove_activity(day, activity_id)
     return {"success": success}
 
 
-# ===== SES DOSYALARI =====
+# ===== TARİHE ÖZEL PROGRAM =====
+
+@app.get("/api/overrides")
+async def get_overrides(start: Optional[str] = Query(None, alias="from"),
+                        end: Optional[str] = Query(None, alias="to")):
+    """Tarihe özel kayıtları listele (YYYY-MM-DD aralığı opsiyonel)"""
+    try:
+        start_date = date.fromisoformat(start) if start else None
+        end_date = date.fromisoformat(end) if end else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return override_service.get_overrides(start_date, end_date)
+
+
+@app.post("/api/overrides")
+async def add_override(req: OverrideRequest):
+    """Tarihe özel kayıt ekle (replace / add / silence)"""
+    try:
+        return override_service.add_override(req.dict())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.delete("/api/overrides/{override_id}")
+async def remove_override(override_id: str):
+    """Tarihe özel kaydı sil"""
+    return {"success": override_service.remove_override(override_id)}
+
+
+# ===== BÖLGELER =====
+
+@app.get("/api/zones")
+async def list_zones():
+    """Bölgeleri listele"""
+    return zone_manager.list_zones()
+
+
+@app.post("/api/zones")
+async def add_zone(req: ZoneRequest):
+    """Yeni bölge ekle (kendi programı ve ses çıkışı ile)"""
+    try:
+        zone_manager.add_zone(req.id, req.name, req.output)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True}
+
+
+@app.delete("/api/zones/{zone_id}")
+async def remove_zone(zone_id: str):
+    """Bölgeyi sil"""
+    return {"success": zone_manager.remove_zone(zone_id)}
+
 
 @app.get("/api/sounds/{category}")
 async def list_sounds(category: str):
@@ -389,6 +510,7 @@ async def upload_sound(category: str, files: List[UploadFile] = File(...)):
             filepath = dir_path / file.filename
             content = await file.read()
             filepath.write_bytes(content)
+            vlc_runtime.media_cache.invalidate(filepath)
             uploaded.append(file.filename)
     
     return {"success": True, "uploaded": uploaded}
@@ -410,6 +532,7 @@ async def delete_sound(category: str, filename: str):
     filepath = dir_path / filename
     if filepath.exists():
         filepath.unlink()
+        vlc_runtime.media_cache.invalidate(filepath)
         return {"success": True}
     
     raise HTTPException(status_code=404, detail="Dosya bulunamadı")
@@ -622,6 +745,11 @@ async def import_backup(file: UploadFile = File(...)):
     os.unlink(tmp_path)
     
     if success:
+        # Geri yüklenen program, doğum günü ve tatil ayarlarını servislere yansıt
+        scheduler.reload_schedule()
+        birthday_service.reload()
+        holiday_service.reload()
+        override_service.reload()
         return {"success": True}
     raise HTTPException(status_code=500, detail="Yedek geri yüklenemedi")
 
@@ -638,6 +766,8 @@ async def get_config():
 async def update_config(config: dict):
     """Ayarları güncelle"""
     save_config(config)
+    zone_manager.reload_settings()
+    holiday_service.reload()
     return {"success": True}
 
 
@@ -660,19 +790,26 @@ async def startup():
     # Zamanlayıcıyı başlat - hata handling ile
     def safe_bell(f):
         try:
-            audio_engine.play_bell(f, blocking=True)
+            audio_engine.queue.bell(f, wait=True)
         except Exception as e:
             print(f"[Server] Zil hatası: {e}")
     
     def safe_announcement(f):
         try:
-            audio_engine.play_announcement(f, blocking=True)
+            audio_engine.queue.announcement(f, wait=True)
         except Exception as e:
             print(f"[Server] Anons hatası: {e}")
     
+    def safe_program(steps):
+        try:
+            audio_engine.queue.program(steps, wait=True)
+        except Exception as e:
+            print(f"[Server] Program çalma hatası: {e}")
+    
     def safe_music_start():
         try:
-            _start_break_music()
+            # Zil ve anonslar bittikten sonra başlar
+            audio_engine.queue.music(_start_break_music)
         except Exception as e:
             print(f"[Server] Müzik başlatma hatası: {e}")
     
@@ -702,11 +839,17 @@ async def startup():
             print(f"[Server] Müzik fallback hatası: {e}")    
     scheduler.on_bell = safe_bell
     scheduler.on_announcement = safe_announcement
+    scheduler.on_program = safe_program
     scheduler.on_music_start = safe_music_start
     scheduler.on_music_stop = safe_music_stop
-    scheduler.holiday_checker = holiday_service.is_holiday_today
+    scheduler.on_prepare = audio_engine.prepare
+    scheduler.holiday_checker = holiday_service.is_holiday_on
+    holiday_service.on_change = zone_manager.invalidate_timelines
     scheduler.is_manual_player_active = lambda: media_player.is_playing()
-    scheduler.birthday_checker = birthday_service.should_announce_now
+    scheduler.birthday_roster = birthday_service.get_roster
+    birthday_service.on_change = scheduler.invalidate_timelines
+    scheduler.day_resolver = override_service.resolve_day
+    override_service.on_change = zone_manager.invalidate_timelines
 
     # Radyo akışı başarısız olursa yerel MP3 fallback davranışı
     try:
@@ -714,18 +857,96 @@ async def startup():
     except Exception as e:
         print(f"[Server] on_music_error bağlanamadı: {e}")
 
-    scheduler.start()
+    # Ek bölgeler: her biri kendi ses motoru ile
+    zone_manager.on_zone_created = _wire_zone
+    zone_manager.on_zone_removed = _unwire_zone
+    zone_manager.load_zones()
+    
+    # Aktif/yedek: zamanlayıcılar yedek başlar, kira alınınca lider olur
+    ha_service.schedulers = lambda: list(zone_manager.zones.values())
+    ha_service.on_role_change = _on_ha_role_change
+    ha_service.start()
+    zone_manager.start()
+
+
+def _on_ha_role_change(is_leader: bool):
+    """Yedeğe düşen düğüm çalan otomatik sesleri durdurur"""
+    if not is_leader:
+        for engine in _all_zone_audio():
+            engine.stop_all()
+
+
+# Bölge kimliği -> ses motoru (varsayılan bölge audio_engine kullanır)
+zone_audio: dict = {}
+
+
+def _get_zone_audio(zone: Optional[str]) -> AudioEngine:
+    """Bölgenin ses motorunu döndürür"""
+    return zone_audio.get(zone, audio_engine)
+
+
+def _all_zone_audio() -> list:
+    """Tüm bölgelerin ses motorları"""
+    return [audio_engine] + list(zone_audio.values())
+
+
+def _wire_zone(zone: SchedulerService, info: dict):
+    """Yeni bölgeyi kendi ses çıkışına bağlar"""
+    engine = AudioEngine(zone.zone_id, info.get("output"))
+    zone_audio[zone.zone_id] = engine
+    
+    def safe_bell(f):
+        try:
+            engine.queue.bell(f, wait=True)
+        except Exception as e:
+            print(f"[Server] Zil hatası ({zone.zone_id}): {e}")
+    
+    def safe_announcement(f):
+        try:
+            engine.queue.announcement(f, wait=True)
+        except Exception as e:
+            print(f"[Server] Anons hatası ({zone.zone_id}): {e}")
+    
+    def safe_program(steps):
+        try:
+            engine.queue.program(steps, wait=True)
+        except Exception as e:
+            print(f"[Server] Program çalma hatası ({zone.zone_id}): {e}")
+    
+    def safe_music_stop():
+        try:
+            engine.stop_music()
+        except Exception as e:
+            print(f"[Server] Müzik durdurma hatası ({zone.zone_id}): {e}")
+    
+    zone.on_bell = safe_bell
+    zone.on_announcement = safe_announcement
+    zone.on_program = safe_program
+    zone.on_music_start = lambda: engine.queue.music(lambda: _start_break_music(engine))
+    zone.on_music_stop = safe_music_stop
+    zone.on_prepare = engine.prepare
+    zone.holiday_checker = holiday_service.is_holiday_on
+    zone.day_resolver = override_service.resolve_day
+    ha_service.prepare_scheduler(zone)
+
 
+def _unwire_zone(zone_id: str):
+    """Silinen bölgenin ses motorunu durdurur"""
+    engine = zone_audio.pop(zone_id, None)
+    if engine:
+        engine.stop_all()
 
-def _start_break_music():
+
+def _start_break_music(engine: Optional[AudioEngine] = None):
     """Mola müziğini başlat (radyo veya yerel)"""
+    engine = engine or audio_engine
     try:
         config = load_config()
         radio_config = config.get("radio", {})
         
         if radio_config.get("enabled") and radio_config.get("url"):
             # Radyo dene
-            if audio_engine.play_music(radio_config["url"], is_stream=True):
+            if engine.play_music(radio_config["url"], is_stream=True):
                 print("[Server] Radyo başlatıldı")
                 return
         
@@ -735,7 +956,7 @@ def _start_break_music():
         
         if music_files:
             # Playlist olarak karışık çal (Her zaman karışık)
-            if audio_engine.play_music_playlist(music_files):
+            if engine.play_music_playlist(music_files):
                 print(f"[Server] Müzik listesi başlatıldı ({len(music_files)} dosya)")
                 return
         
@@ -747,7 +968,7 @@ def _start_break_music():
             if d.exists():
                 for f in d.iterdir():
                     if f.suffix.lower() in (".mp3", ".wav", ".ogg", ".flac", ".m4a"):
-                        if audio_engine.play_music(str(f), is_stream=False):
+                        if engine.play_music(str(f), is_stream=False):
                             print(f"[Server] Sistem sesi çalındı: {f.name}")
                             found = True
                             break
@@ -771,8 +992,10 @@ async def restart_system():
     def restart():
         import time
         time.sleep(1)
-        scheduler.stop()
-        audio_engine.stop_all()
+        zone_manager.stop()
+        ha_service.stop()
+        for engine in _all_zone_audio():
+            engine.stop_all()
         media_player.stop()
         
         # Python'u yeniden başlat
@@ -789,8 +1012,10 @@ async def shutdown_system():
     def shutdown():
         import time
         time.sleep(1)
-        scheduler.stop()
-        audio_engine.stop_all()
+        zone_manager.stop()
+        ha_service.stop()
+        for engine in _all_zone_audio():
+            engine.stop_all()
         media_player.stop()
         print("SmartZill kapatılıyor...")
         os._exit(0)
@@ -803,8 +1028,10 @@ async def shutdown_system():
 @app.on_event("shutdown")
 async def shutdown():
     """Uygulama kapanışı"""
-    scheduler.stop()
-    audio_engine.stop_all()
+    zone_manager.stop()
+    ha_service.stop()
+    for engine in _all_zone_audio():
+        engine.stop_all()
     media_player.stop()
     print("SmartZill kapatıldı.")
 